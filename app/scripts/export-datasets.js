@@ -0,0 +1,78 @@
+/**
+ * MICRO2MOVE SYDNEY - Dataset Export Script
+ *
+ * Exports the read-mostly network datasets bundled with the app
+ * (veloways, planned projects, POIs) as JSON for the backend, which serves
+ * them from its pre-serialized response cache.
+ *
+ * Usage:
+ *   node export-datasets.js
+ *
+ * Output (app/data/):
+ *   veloways.json, planned.json, pois.json
+ */
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const JS_DIR = path.join(__dirname, '..', 'js');
+const OUTPUT_DIR = path.join(__dirname, '..', 'data');
+
+// ============================================
+// LOAD BROWSER DATA FILES
+// ============================================
+
+/**
+ * Evaluate a browser data file and pull out named top-level constants.
+ * Not every data file exports via module.exports, so read them from the
+ * script's own scope instead.
+ */
+function loadConstants(filename, names) {
+  const code = fs.readFileSync(path.join(JS_DIR, filename), 'utf8');
+  const context = vm.createContext({});
+  return vm.runInContext(`${code}\n;({ ${names.join(', ')} })`, context, { filename });
+}
+
+// ============================================
+// EXPORT
+// ============================================
+
+function writeDataset(filename, data) {
+  // Write-then-rename so the backend never reads a half-written file
+  const target = path.join(OUTPUT_DIR, filename);
+  const tmp = `${target}.tmp`;
+  fs.writeFileSync(tmp, JSON.stringify(data));
+  fs.renameSync(tmp, target);
+  console.log(`💾 Saved: ${target}`);
+}
+
+function main() {
+  console.log('');
+  console.log('🚴 MICRO2MOVE SYDNEY - Dataset Export');
+  console.log('='.repeat(50));
+
+  fs.mkdirSync(OUTPUT_DIR, { recursive: true });
+
+  const veloways = loadConstants('data-veloways.js', ['VELOWAY_ROUTES', 'VELOWAY_HUBS', 'VELOWAY_DESTINATIONS']);
+  writeDataset('veloways.json', {
+    routes: veloways.VELOWAY_ROUTES,
+    hubs: veloways.VELOWAY_HUBS,
+    destinations: veloways.VELOWAY_DESTINATIONS,
+  });
+
+  const planned = loadConstants('data-planned.js', ['PLANNED_CYCLEWAYS', 'EXISTING_CYCLEWAYS', 'NETWORK_STATS']);
+  writeDataset('planned.json', {
+    planned: planned.PLANNED_CYCLEWAYS,
+    existing: planned.EXISTING_CYCLEWAYS,
+    stats: planned.NETWORK_STATS,
+  });
+
+  const { POIS } = loadConstants('data.js', ['POIS']);
+  writeDataset('pois.json', POIS);
+
+  console.log('');
+  console.log('✅ Export complete!');
+}
+
+main();
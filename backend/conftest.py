@@ -0,0 +1,109 @@
+"""
+Micro2Move Sydney - pytest fixtures
+
+    fake_supabase   scripts.fake_supabase served for the whole session, with
+                    settings pointed at it; emptied before each test.
+    api             TestClient over main.app against that fake, with fresh
+                    rate-limit buckets and an empty profile cache.
+    query_budget    services.query_budget.query_budget: fails the test when
+                    the block runs more statements on database.engine than
+                    its budget (N+1 regressions).
+    direct_db       DB_DIRECT_READS on, and a sqlite3 connection to the
+                    SQLite files database.engine uses under pytest, with
+                    empty users and v_booking_summary tables to seed.  The
+                    DB_SCHEMA tables live in a file attached under that
+                    name, as SQLite has no schemas.
+
+    def test_register_then_profile(api, fake_supabase):
+        token = api.post("/api/v1/auth/register", json={...}).json()["access_token"]
+        assert api.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    def test_bookings_query_budget(api, direct_db, query_budget):
+        direct_db.executemany("INSERT INTO v_booking_summary VALUES (...)", rows)
+        with query_budget(1):
+            api.get("/api/v1/users/me/bookings", headers=...)
+
+See tests/ for these in use.
+"""
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+os.environ.setdefault("NETWORK_RELOAD_POLL_SECONDS", "0")
+# SQLite stand-in for Postgres, so direct-read paths run without a server
+_DB_DIR = tempfile.mkdtemp(prefix="micro2move-pytest-")
+_DB_PATH = os.path.join(_DB_DIR, "direct.sqlite3")
+_SCHEMA_PATH = os.path.join(_DB_DIR, "schema.sqlite3")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_PATH}")
+
+from scripts.fake_supabase import FakeSupabase  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def _fake_supabase_server() -> FakeSupabase:
+    return FakeSupabase().install()
+
+
+@pytest.fixture
+def fake_supabase(_fake_supabase_server: FakeSupabase) -> FakeSupabase:
+    _fake_supabase_server.reset()
+    _fake_supabase_server.latency = 0.0
+    return _fake_supabase_server
+
+
+@pytest.fixture
+def api(fake_supabase: FakeSupabase, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+    from config import settings
+    from services import rate_limit
+    from services.profile_cache import profile_cache
+
+    monkeypatch.setattr(rate_limit, "rate_limiter", rate_limit.RateLimiter(
+        rate_limit.MemoryBucketStore(settings.RATE_LIMIT_MAX_BUCKETS), rate_limit.POLICIES,
+    ))
+    profile_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def query_budget():
+    from services.query_budget import query_budget
+    return query_budget
+
+
+def _attach_schema(conn) -> None:
+    from config import settings
+    cursor = conn.cursor()
+    cursor.execute(f"ATTACH DATABASE '{_SCHEMA_PATH}' AS {settings.DB_SCHEMA}")
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def _direct_engine():
+    from sqlalchemy import event
+
+    from database import engine
+
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", lambda conn, record: _attach_schema(conn))
+    return engine
+
+
+@pytest.fixture
+def direct_db(_direct_engine, monkeypatch):
+    from config import settings
+    from services.user_data import BOOKING_COLUMNS, PROFILE_COLUMNS
+
+    monkeypatch.setattr(settings, "DB_DIRECT_READS", True)
+    conn = sqlite3.connect(_DB_PATH, isolation_level=None)
+    _attach_schema(conn)
+    for name, columns in (("users", PROFILE_COLUMNS), ("v_booking_summary", (*BOOKING_COLUMNS, "renter_user_id"))):
+        conn.execute(f"DROP TABLE IF EXISTS {settings.DB_SCHEMA}.{name}")
+        conn.execute(f"CREATE TABLE {settings.DB_SCHEMA}.{name} ({', '.join(columns)})")
+    yield conn
+    conn.close()
@@ -1,17 +1,74 @@
 """
 Micro2Move Sydney - Database Configuration
+
+The pool is sized per worker by DB_POOL_SIZE + DB_MAX_OVERFLOW.  With
+asyncpg, DB_STATEMENT_CACHE_SIZE sets both asyncpg's and SQLAlchemy's
+prepared-statement caches; set it to 0 when DATABASE_URL points at a
+transaction-mode pooler (PgBouncer, Supabase's port 6543), which cannot
+keep prepared statements across transactions.
+
+The app's tables live in the DB_SCHEMA schema, not public.  Every PostgreSQL
+connection starts with search_path set to DB_SCHEMA, public (a startup
+parameter, so it holds for the connection's whole life in the pool), which
+is how the ORM models' unqualified table names resolve.  A transaction-mode
+PgBouncer must pass search_path through (track_extra_parameters, 1.20+);
+otherwise set it on the role: ALTER ROLE ... SET search_path = micro2move, public.
+
+Every statement, and on PostgreSQL every pool checkout, is timed into the
+db_* metrics at GET /metrics (services.query_metrics); statements slower
+than DB_SLOW_QUERY_SECONDS are logged.
 """
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from config import settings
+from services.query_metrics import TimedQueuePool, instrument_engine
+
+
+def _is_asyncpg(url: URL) -> bool:
+    return url.drivername == "postgresql+asyncpg"
+
+
+def _engine_url() -> URL:
+    url = make_url(settings.DATABASE_URL)
+    if _is_asyncpg(url):
+        url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    return url
+
+
+def _engine_options() -> dict:
+    """Pool and driver settings; SQLite (local runs) keeps SQLAlchemy's defaults."""
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        return {}
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    search_path = f"{settings.DB_SCHEMA}, public"
+    if _is_asyncpg(url):
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT_SECONDS,
+            "server_settings": {"search_path": search_path},
+        }
+    else:
+        # libpq drivers (psycopg) take startup parameters as options
+        options["connect_args"] = {"options": f"-csearch_path={search_path.replace(' ', '')}"}
+    return options
 
 
 # Create async engine
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    _engine_url(),
     echo=settings.DEBUG,
     future=True,
+    **_engine_options(),
 )
+instrument_engine(engine)
 
 # Session factory
 async_session = async_sessionmaker(
@@ -0,0 +1,111 @@
+"""
+Micro2Move Sydney - Ride Metrics Backfill Job
+
+Recomputes distance_km, duration_minutes, avg_speed, max_speed, co2_saved
+and calories_burned for completed RouteHistory rows from their
+actual_polyline.  Each page of rows is decoded and measured in one
+vectorized pass (services.polyline.decode_many +
+services.ride_metrics.compute_ride_metrics), so the job is bound by
+Supabase round trips rather than Python loops.
+
+elevation_gain is left untouched: encoded polylines carry no altitude.
+duration_minutes is left untouched for rides without a start or end time.
+
+Usage:
+    cd backend
+    python -m jobs.backfill_ride_metrics --days 365
+"""
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from supabase import create_client
+
+from config import settings
+from jobs.map_match_routes import fetch_tracks
+from services.polyline import decode_array, decode_many
+from services.ride_metrics import compute_ride_metrics
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = (
+    "distance_km",
+    "duration_minutes",
+    "avg_speed",
+    "max_speed",
+    "co2_saved",
+    "calories_burned",
+)
+
+
+def _duration_s(row: dict) -> float:
+    if not row.get("start_time") or not row.get("end_time"):
+        return 0.0
+    start = datetime.fromisoformat(row["start_time"])
+    end = datetime.fromisoformat(row["end_time"])
+    return max((end - start).total_seconds(), 0.0)
+
+
+def metrics_for_page(rows: list[dict]) -> list[dict]:
+    """Decode and measure a page of route_history rows; skips bad polylines."""
+    try:
+        coords, offsets = decode_many([r["actual_polyline"] for r in rows])
+    except ValueError:
+        # Drop the malformed tracks and decode the rest as one batch
+        good = []
+        for r in rows:
+            try:
+                decode_array(r["actual_polyline"])
+                good.append(r)
+            except ValueError:
+                logger.warning("Skipping route_history %s: malformed polyline", r["id"])
+        rows = good
+        coords, offsets = decode_many([r["actual_polyline"] for r in rows])
+
+    metrics = compute_ride_metrics(
+        coords, offsets, np.array([_duration_s(r) for r in rows], dtype=np.float64)
+    )
+    columns = {name: metrics[name].tolist() for name in METRIC_COLUMNS}
+    updates = []
+    for i, row in enumerate(rows):
+        update = {"id": row["id"], "start_time": row["start_time"]}
+        update.update({name: columns[name][i] for name in METRIC_COLUMNS})
+        if not (row.get("start_time") and row.get("end_time")):
+            del update["duration_minutes"]      # untimed ride: keep the stored value
+        updates.append(update)
+    return updates
+
+
+def upsert_updates(sb, updates: list[dict]) -> None:
+    """Upsert a page, one request per column set: PostgREST nulls missing keys."""
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for update in updates:
+        groups.setdefault(tuple(update), []).append(update)
+    for group in groups.values():
+        sb.table("route_history").upsert(group).execute()
+
+
+def run(days: int) -> None:
+    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    n_rows = 0
+    started = time.perf_counter()
+    for page in fetch_tracks(sb, since):
+        updates = metrics_for_page(page)
+        upsert_updates(sb, updates)
+        n_rows += len(updates)
+        logger.info("Backfilled %d rides (%.1fs)", n_rows, time.perf_counter() - started)
+
+    logger.info("Done: %d rides in %.1fs", n_rows, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill RouteHistory ride metrics")
+    parser.add_argument("--days", type=int, default=365, help="backfill window in days")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run(args.days)
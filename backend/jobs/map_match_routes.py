@@ -0,0 +1,198 @@
+"""
+Micro2Move Sydney - Batch Map-Matching Job
+
+Matches completed RouteHistory GPS tracks onto network segments across a
+process pool and replaces the `segment_usage` table with the window's
+per-segment traversal counts and speeds, in one transaction
+(replace_segment_usage(), migration 004), so segments no longer ridden drop
+out.  A segment_usage.json snapshot is also written next to segments.json;
+the segment store folds it into popularity_score and daily_bike_trips on its
+next load.
+
+Usage:
+    cd backend
+    python -m jobs.map_match_routes --days 90 --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from supabase import create_client
+
+from config import settings
+from services.map_matching import MapMatcher
+from services.polyline import decode_array
+from services.segment_store import SEGMENTS_FILE, USAGE_FILE, load_segment_store
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+BATCH_SIZE = 200
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_matcher: MapMatcher | None = None
+
+
+def _init_worker(data_dir: str) -> None:
+    """Build one matcher (segment store + edge index) per worker process."""
+    global _matcher
+    _matcher = MapMatcher(load_segment_store(Path(data_dir) / SEGMENTS_FILE))
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def match_batch(rows: list[dict]) -> dict[str, list[float]]:
+    """
+    Match a batch of route_history rows.  Returns partial aggregates
+    {segment_id: [traversals, timed_metres, timed_seconds]}.
+
+    Tracks carry only start/end times, so fixes are assumed evenly spaced in
+    time between them (GPS loggers sample at a fixed interval).
+    """
+    partial: dict[str, list[float]] = {}
+    for row in rows:
+        try:
+            points = decode_array(row["actual_polyline"])
+        except ValueError:
+            continue
+        if len(points) < 2:
+            continue
+
+        start, end = _parse_time(row.get("start_time")), _parse_time(row.get("end_time"))
+        duration = (end - start).total_seconds() if start and end else 0.0
+        step = max(duration, 0.0) / (len(points) - 1)
+        times = [i * step for i in range(len(points))]
+
+        for run in _matcher.match(points[:, 0], points[:, 1], times):
+            agg = partial.setdefault(run.segment_id, [0, 0.0, 0.0])
+            agg[0] += 1
+            if run.seconds > 0:
+                agg[1] += run.distance_m
+                agg[2] += run.seconds
+    return partial
+
+
+# ---------------------------------------------------------------------------
+# Coordinator side
+# ---------------------------------------------------------------------------
+
+
+def fetch_tracks(sb, since: datetime):
+    """Yield pages of completed route_history rows with a GPS track."""
+    offset = 0
+    while True:
+        rows = (
+            sb.table("route_history")
+            .select("id, actual_polyline, start_time, end_time")
+            .eq("is_completed", True)
+            .gte("start_time", since.isoformat())
+            .order("id")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        tracks = [r for r in rows if r.get("actual_polyline")]
+        if tracks:
+            yield tracks
+        if len(rows) < PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+
+
+def build_usage_rows(
+    totals: dict[str, list[float]],
+    window_start: datetime,
+    window_end: datetime,
+) -> list[dict]:
+    days = max((window_end - window_start).total_seconds() / 86400, 1.0)
+    rows = []
+    for segment_id, (traversals, metres, seconds) in totals.items():
+        rows.append({
+            "segment_id": segment_id,
+            "traversals": int(traversals),
+            "daily_trips": round(traversals / days, 3),
+            "avg_speed_kmh": round(metres / seconds * 3.6, 2) if seconds > 0 else None,
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+        })
+    return rows
+
+
+def write_snapshot(rows: list[dict], data_dir: Path) -> Path:
+    """Write segment_usage.json atomically for the segment store to pick up."""
+    snapshot = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "segments": {
+            r["segment_id"]: {
+                "traversals": r["traversals"],
+                "daily_trips": r["daily_trips"],
+                "avg_speed_kmh": r["avg_speed_kmh"],
+            }
+            for r in rows
+        },
+    }
+    path = data_dir / USAGE_FILE
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def run(days: int, workers: int) -> None:
+    data_dir = Path(settings.NETWORK_DATA_DIR)
+    window_end = datetime.now(timezone.utc)
+    window_start = window_end - timedelta(days=days)
+    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+
+    totals: dict[str, list[float]] = {}
+    n_tracks = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(data_dir),),
+    ) as pool:
+        futures = []
+        for page in fetch_tracks(sb, window_start):
+            n_tracks += len(page)
+            for i in range(0, len(page), BATCH_SIZE):
+                futures.append(pool.submit(match_batch, page[i:i + BATCH_SIZE]))
+
+        for future in as_completed(futures):
+            for segment_id, (count, metres, seconds) in future.result().items():
+                agg = totals.setdefault(segment_id, [0, 0.0, 0.0])
+                agg[0] += count
+                agg[1] += metres
+                agg[2] += seconds
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Matched %d tracks onto %d segments in %.1fs (%.0f tracks/min)",
+        n_tracks, len(totals), elapsed, n_tracks / elapsed * 60 if elapsed else 0,
+    )
+
+    rows = build_usage_rows(totals, window_start, window_end)
+    # One call, one transaction: segments no longer traversed lose their row
+    sb.rpc("replace_segment_usage", {"p_rows": rows}).execute()
+    logger.info("Replaced segment_usage with %d rows; wrote %s", len(rows), write_snapshot(rows, data_dir))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map-match RouteHistory tracks to segments")
+    parser.add_argument("--days", type=int, default=90, help="matching window in days")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run(args.days, args.workers)
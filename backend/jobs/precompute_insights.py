@@ -0,0 +1,206 @@
+"""
+Micro2Move Sydney - AI Insight Precomputation Job
+
+Generates route insights ahead of time for the routes riders ask about over
+and over, and stores them in the AI route cache so those requests never wait
+on the model:
+
+- every veloway corridor in the veloways dataset (also served by
+  GET /api/v1/routes/veloways/{id}/insight);
+- Route rows with source="veloway";
+- the AI_PRECOMPUTE_TOP_N most requested /routes/generate requests.
+
+Calls go through a small worker pool limited to
+AI_PRECOMPUTE_REQUESTS_PER_MINUTE and stop once a run has used
+AI_PRECOMPUTE_TOKEN_BUDGET tokens.  Entries are written with a TTL of three
+refresh intervals, and each run only regenerates those that would expire
+before the run after next, so a missed run never leaves them cold.
+
+Usage:
+    cd backend
+    python -m jobs.precompute_insights           # one pass
+    python -m jobs.precompute_insights --loop    # refresh every AI_PRECOMPUTE_INTERVAL_HOURS
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import NamedTuple
+
+from supabase import create_client
+
+from config import settings
+from services.ai_cache import ai_cache, generate_key, veloway_key, veloway_params
+from services.network_loader import get_dataset, load_network, reload_network
+from services.vertex_ai import ModelTimeoutError, generate_route_insight, init_gemini, tokens_used
+
+logger = logging.getLogger(__name__)
+
+
+class Target(NamedTuple):
+    label: str
+    params: dict                # generate_route_insight() arguments
+    keys: tuple[str, ...]       # cache keys the result is stored under
+
+
+def veloway_targets() -> list[Target]:
+    veloways = get_dataset("veloways")
+    targets = []
+    for veloway in veloways.data.get("routes", []) if veloways else []:
+        params = veloway_params(veloway)
+        targets.append(Target(veloway["name"], params, (veloway_key(veloway["id"]), generate_key(**params))))
+    return targets
+
+
+def route_row_targets() -> list[Target]:
+    """Route rows with source="veloway"; skipped if Supabase is unreachable."""
+    try:
+        sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        rows = (
+            sb.table("routes")
+            .select("id, name, description, start_location, distance_km, veloway_id")
+            .eq("source", "veloway")
+            .execute()
+            .data
+        )
+    except Exception:
+        logger.exception("Could not read veloway Route rows; skipping them this run")
+        return []
+    targets = []
+    for row in rows:
+        start = row.get("start_location") or {}
+        params = veloway_params({
+            "name": row["name"],
+            "description": row.get("description"),
+            "length_km": row.get("distance_km"),
+            "local_areas": [start["address"]] if start.get("address") else [],
+        })
+        keys = (veloway_key(row["veloway_id"]),) if row.get("veloway_id") else ()
+        targets.append(Target(row["name"], params, keys + (generate_key(**params),)))
+    return targets
+
+
+def popular_targets(limit: int) -> list[Target]:
+    return [
+        Target(params["start_location"], params, (generate_key(**params),))
+        for params in ai_cache.top_requests("generate", limit)
+    ]
+
+
+def due(targets: list[Target], refresh_within: float) -> list[Target]:
+    """Drop duplicates and targets whose entries outlive refresh_within seconds."""
+    seen: set[str] = set()
+    pending = []
+    for target in targets:
+        if target.keys[-1] in seen:
+            continue
+        seen.add(target.keys[-1])
+        remaining = [ai_cache.expires_in(key) for key in target.keys]
+        if any(r is None or r < refresh_within for r in remaining):
+            pending.append(target)
+    return pending
+
+
+class RateLimiter:
+    """Spaces call starts at least 60/per_minute seconds apart."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+async def precompute(
+    targets: list[Target],
+    workers: int,
+    per_minute: int,
+    token_budget: int,
+    ttl_seconds: float,
+) -> dict[str, int]:
+    queue: asyncio.Queue[Target] = asyncio.Queue()
+    for target in targets:
+        queue.put_nowait(target)
+    limiter = RateLimiter(per_minute)
+    baseline = tokens_used()
+    stats = {"stored": 0, "failed": 0, "skipped": 0}
+
+    async def worker() -> None:
+        while not queue.empty():
+            target = queue.get_nowait()
+            if tokens_used() - baseline >= token_budget:
+                stats["skipped"] += 1
+                continue
+            await limiter.wait()
+            started = time.perf_counter()
+            try:
+                result = await generate_route_insight(**target.params)
+            except ModelTimeoutError:
+                logger.warning("Timed out generating %s", target.label)
+                stats["failed"] += 1
+                continue
+            except Exception:
+                logger.exception("Failed generating %s", target.label)
+                stats["failed"] += 1
+                continue
+            if not result.get("segments"):
+                stats["failed"] += 1
+                continue
+            for key in target.keys:
+                ai_cache.put(key, result, time.perf_counter() - started, ttl_seconds=ttl_seconds)
+            stats["stored"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    stats["tokens"] = int(tokens_used() - baseline)
+    return stats
+
+
+async def run(top_n: int, workers: int, per_minute: int, token_budget: int, interval_hours: float) -> None:
+    interval = interval_hours * 3600
+    started = time.perf_counter()
+    targets = veloway_targets() + route_row_targets() + popular_targets(top_n)
+    pending = due(targets, refresh_within=2 * interval)
+    logger.info("%d of %d precomputed insights due for refresh", len(pending), len(targets))
+
+    stats = await precompute(pending, workers, per_minute, token_budget, ttl_seconds=3 * interval)
+    if stats["skipped"]:
+        logger.warning(
+            "Token budget of %d reached; %d insights left for the next run", token_budget, stats["skipped"]
+        )
+    logger.info(
+        "Stored %d insights (%d failed) using %d tokens in %.1fs",
+        stats["stored"], stats["failed"], stats["tokens"], time.perf_counter() - started,
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # One event loop for every run: the model client and its semaphore are bound to it
+    while True:
+        # Pick up new network data first: cache keys carry its version
+        await reload_network()
+        await run(args.top, args.workers, args.per_minute, args.token_budget, args.interval_hours)
+        if not args.loop:
+            return
+        await asyncio.sleep(args.interval_hours * 3600)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute AI insights for veloway and popular routes")
+    parser.add_argument("--top", type=int, default=settings.AI_PRECOMPUTE_TOP_N, help="most requested routes")
+    parser.add_argument("--workers", type=int, default=settings.AI_PRECOMPUTE_WORKERS)
+    parser.add_argument("--per-minute", type=int, default=settings.AI_PRECOMPUTE_REQUESTS_PER_MINUTE)
+    parser.add_argument("--token-budget", type=int, default=settings.AI_PRECOMPUTE_TOKEN_BUDGET)
+    parser.add_argument("--interval-hours", type=float, default=settings.AI_PRECOMPUTE_INTERVAL_HOURS)
+    parser.add_argument("--loop", action="store_true", help="keep running, refreshing every interval")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_gemini()
+    load_network()
+    asyncio.run(main(args))
@@ -0,0 +1,79 @@
+"""
+Micro2Move Sydney - Profile Reconciliation Job
+
+register() provisions the users row in the background (services.provisioning)
+and gives up after PROVISION_RETRY_ATTEMPTS.  This job pages through every
+Supabase Auth user and creates the row for any account that still has none,
+through the same idempotent provision_profiles() RPC (welcome credits and
+their ledger entry included), so it is safe to run at any time and as often
+as wanted.
+
+Usage:
+    cd backend
+    python -m jobs.reconcile_profiles
+    python -m jobs.reconcile_profiles --dry-run
+"""
+import argparse
+import logging
+import time
+
+from supabase import create_client
+
+from config import settings
+from services.provisioning import profile_row
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500
+
+
+def auth_users(sb):
+    """Yield pages of Supabase Auth users."""
+    page = 1
+    while True:
+        users = sb.auth.admin.list_users(page=page, per_page=PAGE_SIZE)
+        if users:
+            yield users
+        if len(users) < PAGE_SIZE:
+            return
+        page += 1
+
+
+def missing_profiles(sb, users) -> list:
+    ids = [user.id for user in users]
+    rows = sb.table("users").select("user_id").in_("user_id", ids).execute().data or []
+    existing = {row["user_id"] for row in rows}
+    return [user for user in users if user.id not in existing and user.email]
+
+
+def run(dry_run: bool) -> None:
+    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    started = time.perf_counter()
+    checked = created = 0
+
+    for page in auth_users(sb):
+        checked += len(page)
+        missing = missing_profiles(sb, page)
+        for user in missing:
+            logger.info("%s profile for %s", "Would create" if dry_run else "Creating", user.id)
+        if missing and not dry_run:
+            result = sb.rpc("provision_profiles", {
+                "p_rows": [profile_row(u.id, u.email, (u.user_metadata or {}).get("full_name")) for u in missing],
+            }).execute()
+            created += result.data or 0
+        else:
+            created += len(missing)
+
+    logger.info(
+        "Checked %d auth users, %s %d missing profiles in %.1fs",
+        checked, "found" if dry_run else "created", created, time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create users rows for auth accounts that have none")
+    parser.add_argument("--dry-run", action="store_true", help="only report missing profiles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run(args.dry_run)
@@ -2,14 +2,42 @@
 Micro2Move Sydney — FastAPI Backend
 """
 
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from config import settings
-from routers import auth, users
-from services.vertex_ai import init_gemini, generate_route_insight, refine_route
+from database import close_db
+from routers import admin, auth, bikes, network, segments, users
+from services.ai_cache import (
+    ai_cache,
+    generate_key,
+    refine_key,
+    start_ai_cache_flusher,
+    stop_ai_cache_flusher,
+    veloway_key,
+    veloway_params,
+)
+from services.metrics import registry
+from services.provisioning import drain_provisioning
+from services.rate_limit import close_rate_limiter
+from services.singleflight import SingleFlight
+from services.supabase_clients import close_supabase, init_supabase
+from services.network_loader import get_dataset, load_network, start_network_watcher, stop_network_watcher
+from services.vertex_ai import (
+    ModelTimeoutError,
+    init_gemini,
+    generate_route_insight,
+    generate_route_locally,
+    refine_locally,
+    refine_route,
+    stream_route_insight,
+)
 from pydantic import BaseModel
 from typing import Optional
 
@@ -49,6 +77,10 @@ app.add_middleware(
 
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(bikes.router)
+app.include_router(segments.router)
+app.include_router(network.router)
+app.include_router(admin.router)
 
 # ---------------------------------------------------------------------------
 # Legacy / existing routes (kept from original main.py)
@@ -74,48 +106,176 @@ class RefineRequest(BaseModel):
     shade_vs_speed: int = 30
 
 
+# Identical concurrent requests (same normalised key) share one model call
+route_flights = SingleFlight("routes")
+
+
 @app.on_event("startup")
 async def startup() -> None:
     if settings.GEMINI_API_KEY:
         init_gemini()
         logger.info("Gemini AI initialised")
+    init_supabase()
+    load_network()
+    start_network_watcher()
+    start_ai_cache_flusher()
     logger.info("Micro2Move backend started — %s", settings.APP_NAME)
 
 
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await stop_network_watcher()
+    await stop_ai_cache_flusher()
+    await drain_provisioning()
+    await close_supabase()
+    await close_db()
+    await close_rate_limiter()
+
+
 @app.get("/api/health", tags=["system"])
 async def health() -> dict:
     return {"status": "ok", "app": settings.APP_NAME, "version": settings.APP_VERSION}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/v1/routes/generate", tags=["routes"])
 async def generate_route(request: RouteRequest):
     from fastapi import HTTPException
     if not settings.GEMINI_API_KEY:
         raise HTTPException(status_code=503, detail="Gemini API not configured")
-    return await generate_route_insight(
-        start_location=request.start_location,
-        description=request.description,
-        scenery=request.scenery,
-        utilities=request.utilities,
-        distance_km=request.distance_km,
-        ride_type=request.ride_type,
-        safety_priority=request.safety_priority,
-        shade_priority=request.shade_priority,
-        hills_avoid=request.hills_avoid,
+    params = request.model_dump()
+    key = generate_key(**params)
+    if settings.AI_CACHE_ENABLED:
+        ai_cache.record_request("generate", key, params)
+        cached = await ai_cache.aget(key)
+        if cached is not None:
+            return cached
+
+    async def generate() -> dict:
+        started = time.perf_counter()
+        result = await generate_route_insight(**params)
+        # Fallback results (unparseable model output) have no segments; don't keep them
+        if settings.AI_CACHE_ENABLED and result.get("segments"):
+            await ai_cache.aput(key, result, time.perf_counter() - started)
+        return result
+
+    try:
+        return await route_flights.do(key, generate)
+    except ModelTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _route_events(path: tuple, value) -> list[str]:
+    """SSE events for one completed part of the route JSON."""
+    if path == ("insight",):
+        return [_sse("insight", {"insight": value})]
+    if path == ("route_name",):
+        return [_sse("route_name", {"route_name": value})]
+    if len(path) == 2 and path[0] == "segments":
+        return [_sse("segment", {"index": path[1], "segment": value})]
+    if path == ():
+        return [_sse("route", value)]
+    return []
+
+
+@app.post("/api/v1/routes/generate/stream", tags=["routes"])
+async def generate_route_stream(request: RouteRequest):
+    """
+    Same as /routes/generate, as Server-Sent Events: `insight`, `route_name`
+    and each `segment` are sent as soon as the model has written them, then
+    the complete `route`.  A timeout ends the stream with an `error` event.
+    """
+    from fastapi import HTTPException
+    if not settings.GEMINI_API_KEY:
+        raise HTTPException(status_code=503, detail="Gemini API not configured")
+    params = request.model_dump()
+    key = generate_key(**params)
+
+    def from_cache(route: dict) -> str:
+        parts = _route_events(("insight",), route.get("insight", ""))
+        parts += _route_events(("route_name",), route.get("route_name", ""))
+        for i, segment in enumerate(route.get("segments", [])):
+            parts += _route_events(("segments", i), segment)
+        return "".join(parts + _route_events((), route))
+
+    async def events() -> AsyncIterator[str]:
+        cached = None
+        if settings.AI_CACHE_ENABLED:
+            ai_cache.record_request("generate", key, params)
+            cached = await ai_cache.aget(key)
+        if cached is not None:
+            yield from_cache(cached)
+            return
+
+        started = time.perf_counter()
+        try:
+            async for path, value in stream_route_insight(**params):
+                for event in _route_events(path, value):
+                    yield event
+                if path == () and settings.AI_CACHE_ENABLED and value.get("segments"):
+                    await ai_cache.aput(key, value, time.perf_counter() - started)
+        except ModelTimeoutError as exc:
+            yield _sse("error", {"detail": str(exc)})
+        except Exception:
+            # Headers are already sent, so the failure can only be reported in-stream
+            logger.exception("Streamed route generation failed")
+            yield _sse("error", {"detail": "Route generation failed"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+@app.get("/api/v1/routes/veloways/{veloway_id}/insight", tags=["routes"])
+async def veloway_insight(veloway_id: str):
+    """
+    Insight for a veloway corridor, precomputed by jobs.precompute_insights.
+    Never waits on the model: until the job has run, the route is planned
+    locally with a template insight.
+    """
+    from fastapi import HTTPException
+    cached = await ai_cache.aget(veloway_key(veloway_id)) if settings.AI_CACHE_ENABLED else None
+    if cached is not None:
+        return cached
+    veloways = get_dataset("veloways")
+    corridors = veloways.data.get("routes", []) if veloways else []
+    veloway = next((v for v in corridors if v.get("id") == veloway_id), None)
+    if veloway is None:
+        raise HTTPException(status_code=404, detail="Veloway not found")
+    route = await generate_route_locally(**veloway_params(veloway))
+    if route is None:
+        raise HTTPException(status_code=503, detail="Network data not loaded")
+    return route
+
+
 @app.post("/api/v1/routes/refine", tags=["routes"])
 async def refine_route_endpoint(request: RefineRequest):
+    """
+    Slider moves and simple requests ("flatter", "shorter") on a locally
+    computed route are re-planned in-process; anything else goes to the
+    model.  `refine_path` in the response says which ("local" or "llm").
+    """
     from fastapi import HTTPException
+    params = request.model_dump()
+    refined = await refine_locally(**params)
+    if refined is not None:
+        return refined
     if not settings.GEMINI_API_KEY:
         raise HTTPException(status_code=503, detail="Gemini API not configured")
-    return await refine_route(
-        current_route=request.current_route,
-        refinement_prompt=request.refinement_prompt,
-        safety_vs_direct=request.safety_vs_direct,
-        shade_vs_speed=request.shade_vs_speed,
-    )
+    try:
+        return await route_flights.do(refine_key(**params), lambda: refine_route(**params))
+    except ModelTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
 
 
 # ---------------------------------------------------------------------------
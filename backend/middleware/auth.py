@@ -2,6 +2,12 @@
 Micro2Move — JWT Authentication Middleware
 Verifies Supabase-issued JWTs on protected routes.
 
+Verified tokens are kept in a per-worker LRU (SUPABASE_JWT_CACHE_SIZE),
+keyed by their SHA-256 digest, until their exp claim: a client repeating
+the same token skips signature verification and payload parsing.  Entries
+are checked against exp on every lookup, so an expired token is never
+served from the cache.
+
 Usage:
     from middleware.auth import get_current_user, CurrentUser
 
@@ -10,6 +16,10 @@ Usage:
         return {"user_id": user.id}
 """
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
@@ -18,9 +28,15 @@ from jose import ExpiredSignatureError, JWTError, jwt
 from pydantic import BaseModel
 
 from config import settings
+from services.metrics import counter, gauge
 
 _bearer = HTTPBearer(auto_error=False)
 
+cache_hits = counter("auth_token_cache_hits_total", "Requests whose JWT was already verified")
+cache_misses = counter(
+    "auth_token_cache_misses_total", "Requests whose JWT had to be verified", ["reason"]
+)
+
 
 class TokenPayload(BaseModel):
     """Decoded Supabase JWT payload fields we care about."""
@@ -28,6 +44,48 @@ class TokenPayload(BaseModel):
     sub: str          # Supabase user UUID
     email: str | None = None
     role: str | None = None
+    user_metadata: dict = {}   # sign-up data, e.g. full_name
+
+
+class _TokenCache:
+    """LRU of verified tokens: digest → (exp, payload)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, TokenPayload]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: bytes) -> TokenPayload | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                cache_misses.inc(reason="new")
+                return None
+            if entry[0] <= time.time():
+                del self._entries[digest]
+                cache_misses.inc(reason="expired")
+                return None
+            self._entries.move_to_end(digest)
+        cache_hits.inc()
+        return entry[1]
+
+    def put(self, digest: bytes, exp: float, payload: TokenPayload) -> None:
+        with self._lock:
+            self._entries[digest] = (exp, payload)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache = _TokenCache(settings.SUPABASE_JWT_CACHE_SIZE)
+gauge("auth_token_cache_entries", "Verified JWTs held in the cache", lambda: len(_token_cache))
 
 
 def _decode_token(token: str) -> TokenPayload:
@@ -37,6 +95,20 @@ def _decode_token(token: str) -> TokenPayload:
     Supabase signs JWTs with a symmetric HS256 key (SUPABASE_JWT_SECRET),
     found at: Supabase Dashboard → Project Settings → API → JWT Secret.
     """
+    if _token_cache.max_entries <= 0:
+        return _verify_token(token)[1]
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(digest)
+    if cached is not None:
+        return cached
+    exp, payload = _verify_token(token)
+    if exp is not None:   # tokens without exp are verified every time
+        _token_cache.put(digest, exp, payload)
+    return payload
+
+
+def _verify_token(token: str) -> tuple[float | None, TokenPayload]:
+    """Full signature check; returns the exp claim alongside the payload."""
     try:
         payload = jwt.decode(
             token,
@@ -44,7 +116,8 @@ def _decode_token(token: str) -> TokenPayload:
             algorithms=["HS256"],
             options={"verify_aud": False},  # Supabase JWTs have no aud claim
         )
-        return TokenPayload(**payload)
+        exp = payload.get("exp")
+        return (float(exp) if exp is not None else None), TokenPayload(**payload)
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
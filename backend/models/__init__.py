@@ -1,5 +1,10 @@
 """
 Micro2Move - Database Models (BCNF Normalized Schema)
+
+Table names are unqualified.  They live in the micro2move schema and resolve
+through the search_path every connection of database.engine starts with
+(DB_SCHEMA, public), not through the SET in schema.sql, which only lasts for
+the session running that script.
 """
 # User & Authorization
 from models.user import User, Authorization, UserAuthorization, Supplier
@@ -19,6 +24,21 @@ from models.geo_location import GeoLocation, GeoLocationType
 # Financial
 from models.accounts import Accounts, AccountsType
 
+# Rides & Routes
+from models.route import Route, FavoriteRoute, RouteHistory, SegmentUsage
+
+# Stores
+from models.store import EbikeStore, StoreReview, DemoBooking
+
+# Community
+from models.community import Community, CommunityMember, CommunityRide, RideRSVP, Comment, Report
+
+# Education
+from models.education import Module, Quiz, QuizQuestion, UserModuleProgress, UserQuizAttempt
+
+# Rewards
+from models.reward import Points, Badge, UserBadge, Reward, RedeemedReward
+
 __all__ = [
     # User & Authorization
     "User",
@@ -49,4 +69,32 @@ __all__ = [
     # Financial
     "Accounts",
     "AccountsType",
+    # Rides & Routes
+    "Route",
+    "FavoriteRoute",
+    "RouteHistory",
+    "SegmentUsage",
+    # Stores
+    "EbikeStore",
+    "StoreReview",
+    "DemoBooking",
+    # Community
+    "Community",
+    "CommunityMember",
+    "CommunityRide",
+    "RideRSVP",
+    "Comment",
+    "Report",
+    # Education
+    "Module",
+    "Quiz",
+    "QuizQuestion",
+    "UserModuleProgress",
+    "UserQuizAttempt",
+    # Rewards
+    "Points",
+    "Badge",
+    "UserBadge",
+    "Reward",
+    "RedeemedReward",
 ]
@@ -11,7 +11,6 @@ import uuid
 class AccountsType(Base):
     """Accounts type master table."""
     __tablename__ = "accounts_type"
-    __table_args__ = {"schema": "micro2move"}
 
     accounts_type_id = Column(SmallInteger, primary_key=True, autoincrement=True)
     accounts_type_name = Column(Text, unique=True, nullable=False)
@@ -23,12 +22,11 @@ class AccountsType(Base):
 class Accounts(Base):
     """Financial ledger entries (tied to booking)."""
     __tablename__ = "accounts"
-    __table_args__ = {"schema": "micro2move"}
 
     accounts_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    booking_id = Column(String, ForeignKey("micro2move.booking.booking_id", ondelete="CASCADE"), nullable=False)
+    booking_id = Column(String, ForeignKey("booking.booking_id", ondelete="CASCADE"), nullable=False)
     amount_credit = Column(Numeric(12, 2), nullable=False)
-    accounts_type_id = Column(SmallInteger, ForeignKey("micro2move.accounts_type.accounts_type_id", ondelete="RESTRICT"), nullable=False)
+    accounts_type_id = Column(SmallInteger, ForeignKey("accounts_type.accounts_type_id", ondelete="RESTRICT"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     note = Column(Text, nullable=True)
 
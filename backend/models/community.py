@@ -78,7 +78,7 @@ class CommunityMember(Base):
 
     id = Column(String, primary_key=True)
     community_id = Column(String, ForeignKey("communities.id", ondelete="CASCADE"))
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     role = Column(SQLEnum(MemberRole), default=MemberRole.MEMBER)
     is_approved = Column(Boolean, default=True)
@@ -101,7 +101,7 @@ class CommunityRide(Base):
 
     id = Column(String, primary_key=True)
     community_id = Column(String, ForeignKey("communities.id", ondelete="CASCADE"))
-    organizer_id = Column(String, ForeignKey("users.id"))
+    organizer_id = Column(String, ForeignKey("users.user_id"))
 
     # Ride details
     title = Column(String, nullable=False)
@@ -158,7 +158,7 @@ class RideRSVP(Base):
 
     id = Column(String, primary_key=True)
     ride_id = Column(String, ForeignKey("community_rides.id", ondelete="CASCADE"))
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     status = Column(SQLEnum(RSVPStatus), default=RSVPStatus.GOING)
     attended = Column(Boolean, default=False)
@@ -177,7 +177,7 @@ class Comment(Base):
     __tablename__ = "comments"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     # Target
     target_type = Column(String, nullable=False)  # ride, route, store, report
@@ -207,7 +207,7 @@ class Report(Base):
     __tablename__ = "reports"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     # Report type
     report_type = Column(String, nullable=False)  # hazard, pothole, debris, lighting, theft, other
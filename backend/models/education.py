@@ -101,7 +101,7 @@ class UserModuleProgress(Base):
     __tablename__ = "user_module_progress"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     module_id = Column(String, ForeignKey("modules.id", ondelete="CASCADE"))
 
     # Progress
@@ -127,7 +127,7 @@ class UserQuizAttempt(Base):
     __tablename__ = "user_quiz_attempts"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     quiz_id = Column(String, ForeignKey("quizzes.id", ondelete="CASCADE"))
 
     # Results
@@ -10,7 +10,6 @@ import uuid
 class GeoLocationType(Base):
     """Geo location type master table."""
     __tablename__ = "geo_location_type"
-    __table_args__ = {"schema": "micro2move"}
 
     geo_location_type_id = Column(SmallInteger, primary_key=True, autoincrement=True)
     geo_location_type_name = Column(Text, unique=True, nullable=False)
@@ -22,13 +21,12 @@ class GeoLocationType(Base):
 class GeoLocation(Base):
     """Geo location (charging stations, bike stations, pickup/return points)."""
     __tablename__ = "geo_location"
-    __table_args__ = {"schema": "micro2move"}
 
     geo_location_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     geo_location_name = Column(Text, nullable=False)
     geo_location_details = Column(Text, nullable=True)
     geo_location_postal_address = Column(Text, nullable=False)
-    geo_location_type_id = Column(SmallInteger, ForeignKey("micro2move.geo_location_type.geo_location_type_id", ondelete="RESTRICT"), nullable=False)
+    geo_location_type_id = Column(SmallInteger, ForeignKey("geo_location_type.geo_location_type_id", ondelete="RESTRICT"), nullable=False)
     latitude = Column(Numeric(9, 6), nullable=True)
     longitude = Column(Numeric(9, 6), nullable=True)
     geo_location_start_date = Column(Date, nullable=True)
@@ -12,7 +12,7 @@ class Points(Base):
     __tablename__ = "points"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     amount = Column(Integer, nullable=False)  # Can be negative for redemptions
     reason = Column(String, nullable=False)
@@ -59,7 +59,7 @@ class UserBadge(Base):
     __tablename__ = "user_badges"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     badge_id = Column(String, ForeignKey("badges.id", ondelete="CASCADE"))
 
     # When earned
@@ -114,7 +114,7 @@ class RedeemedReward(Base):
     __tablename__ = "redeemed_rewards"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     reward_id = Column(String, ForeignKey("rewards.id", ondelete="CASCADE"))
 
     # Discount code
@@ -1,5 +1,5 @@
 """
-Route Models - Routes, Favorites, History
+Route Models - Routes, Favorites, History, Segment Usage
 """
 from sqlalchemy import Column, String, Boolean, DateTime, Integer, Float, ForeignKey, JSON, Text
 from sqlalchemy.orm import relationship
@@ -56,7 +56,7 @@ class FavoriteRoute(Base):
     __tablename__ = "favorite_routes"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     route_id = Column(String, ForeignKey("routes.id", ondelete="CASCADE"))
 
     # Custom name
@@ -76,7 +76,7 @@ class RouteHistory(Base):
     __tablename__ = "route_history"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
     route_id = Column(String, ForeignKey("routes.id", ondelete="CASCADE"), nullable=True)
 
     # Ride data
@@ -105,3 +105,20 @@ class RouteHistory(Base):
     # Relationships
     user = relationship("User", back_populates="route_history")
     route = relationship("Route", back_populates="history")
+
+
+class SegmentUsage(Base):
+    """Per-segment ride aggregates from map-matched RouteHistory tracks."""
+    __tablename__ = "segment_usage"
+
+    segment_id = Column(String, primary_key=True)
+
+    # Aggregates over [window_start, window_end)
+    traversals = Column(Integer, default=0, nullable=False)
+    daily_trips = Column(Float, default=0.0, nullable=False)
+    avg_speed_kmh = Column(Float, nullable=True)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
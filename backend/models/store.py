@@ -69,7 +69,7 @@ class StoreReview(Base):
 
     id = Column(String, primary_key=True)
     store_id = Column(String, ForeignKey("ebike_stores.id", ondelete="CASCADE"))
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     # Review
     rating = Column(Integer, nullable=False)  # 1-5
@@ -98,7 +98,7 @@ class DemoBooking(Base):
 
     id = Column(String, primary_key=True)
     store_id = Column(String, ForeignKey("ebike_stores.id", ondelete="CASCADE"))
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"))
 
     # Booking details
     bike_type = Column(String, nullable=False)  # Which demo bike
@@ -0,0 +1,61 @@
+"""
+Micro2Move — Admin Router
+Operational endpoints, restricted to service-role tokens.
+
+Endpoints:
+    POST /api/v1/admin/network/reload
+"""
+
+import time
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from middleware.auth import CurrentUser
+from services.network_loader import reload_network
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+def _require_service_role(user: CurrentUser) -> None:
+    if user.role != "service_role":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Service role required",
+        )
+
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+
+
+class ReloadResponse(BaseModel):
+    version: str
+    reloaded: bool
+    duration_ms: float
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+
+@router.post(
+    "/network/reload",
+    response_model=ReloadResponse,
+    summary="Reload network data from NETWORK_DATA_DIR",
+)
+async def reload_network_data(user: CurrentUser) -> ReloadResponse:
+    """
+    Rebuild segments, spatial index and datasets in the background and swap
+    them in.  In-flight requests finish on the previous version.
+    """
+    _require_service_role(user)
+    started = time.perf_counter()
+    snapshot, reloaded = await reload_network(force=True)
+    return ReloadResponse(
+        version=snapshot.version,
+        reloaded=reloaded,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
@@ -9,21 +9,16 @@ Endpoints:
     GET  /api/v1/auth/me
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr
-from supabase import Client, create_client
-
-from config import settings
 from middleware.auth import CurrentUser
+from services.provisioning import schedule as schedule_provisioning
+from services.rate_limit import charge_failure, enforce
+from services.supabase_clients import anon_client
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 
-def _supabase() -> Client:
-    """Create a Supabase client using the anon key (for auth operations)."""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-
-
 # ---------------------------------------------------------------------------
 # Request / Response schemas
 # ---------------------------------------------------------------------------
@@ -71,18 +66,21 @@ class MeResponse(BaseModel):
     status_code=status.HTTP_201_CREATED,
     summary="Create a new user account",
 )
-async def register(body: RegisterRequest) -> AuthResponse:
+async def register(body: RegisterRequest, request: Request) -> AuthResponse:
     """
     Register a new Micro2Move user.
 
-    Creates a Supabase Auth account and inserts a row in the `users` table
-    with the supplied full_name.  Returns a JWT on success.
+    Creates a Supabase Auth account and returns a JWT as soon as it exists.
+    The `users` row (full_name, welcome credits) is provisioned in the
+    background; see services.provisioning.
+    Rate limited per client IP and per email address.
     """
-    sb = _supabase()
+    await enforce(request, "register", user=body.email)
+    sb = anon_client()
 
     # 1. Create auth account
     try:
-        result = sb.auth.sign_up({
+        result = await sb.auth.sign_up({
             "email": body.email,
             "password": body.password,
             "options": {"data": {"full_name": body.full_name}},
@@ -99,15 +97,8 @@ async def register(body: RegisterRequest) -> AuthResponse:
             detail="Registration failed — check your email and password.",
         )
 
-    # 2. Insert profile row (Supabase trigger could handle this, but explicit is safer)
-    service_sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-    service_sb.table("users").upsert({
-        "user_id": result.user.id,
-        "full_name": body.full_name,
-        "email": body.email,
-        "hashed_password": "supabase_auth",   # managed by Supabase Auth
-        "tnc_accepted": True,
-    }).execute()
+    # 2. Provision the profile row without making the user wait for it
+    schedule_provisioning(result.user.id, body.email, body.full_name)
 
     return AuthResponse(
         access_token=result.session.access_token,
@@ -122,22 +113,29 @@ async def register(body: RegisterRequest) -> AuthResponse:
     response_model=AuthResponse,
     summary="Sign in with email and password",
 )
-async def login(body: LoginRequest) -> AuthResponse:
-    """Sign in and receive a JWT access token."""
-    sb = _supabase()
+async def login(body: LoginRequest, request: Request) -> AuthResponse:
+    """
+    Sign in and receive a JWT access token.  Rate limited per client IP; only
+    failed sign-ins count against the email address, so nobody can lock an
+    account out by flooding it.
+    """
+    await enforce(request, "login", user=body.email, charge_user=False)
+    sb = anon_client()
 
     try:
-        result = sb.auth.sign_in_with_password({
+        result = await sb.auth.sign_in_with_password({
             "email": body.email,
             "password": body.password,
         })
     except Exception as exc:
+        await charge_failure("login", body.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
     if not result.user or not result.session:
+        await charge_failure("login", body.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -0,0 +1,55 @@
+"""
+Micro2Move — Bikes Router
+E-bike availability for the rental screens.
+
+Endpoints:
+    GET  /api/v1/bikes/available
+"""
+
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel
+
+from services.user_data import get_available_bikes
+
+router = APIRouter(prefix="/api/v1/bikes", tags=["bikes"])
+
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+
+
+class AvailableBike(BaseModel):
+    e_bike_id: str
+    e_bike_name: str
+    price_per_week: float
+    available_from_date: date
+    available_to_date: date | None
+    e_bike_category_name: str
+    pick_up_geo_location_id: str | None
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/available",
+    response_model=list[AvailableBike],
+    summary="List bikes available for a date range",
+)
+async def list_available_bikes(
+    start: date,
+    end: date,
+    limit: int = Query(50, ge=1, le=200),
+) -> list[dict]:
+    """Listed bikes whose availability window covers start..end, cheapest first."""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="end must not be before start",
+        )
+    return await get_available_bikes(start, end, limit)
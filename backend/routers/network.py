@@ -0,0 +1,97 @@
+"""
+Micro2Move — Network Router
+Read-mostly network datasets exported by the ETL, served from the
+pre-serialized response cache.
+
+Endpoints:
+    GET  /api/v1/veloways
+    GET  /api/v1/planned-projects
+    GET  /api/v1/pois
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from config import settings
+from services.geo import format_bbox, parse_lga_bbox, snap_bbox
+from services.network_loader import get_dataset
+from services.response_cache import (
+    cached_json_response,
+    is_not_modified,
+    not_modified_response,
+    response_cache,
+)
+
+router = APIRouter(prefix="/api/v1", tags=["network"])
+
+
+def _serve(request: Request, dataset: str, key: str, build) -> Response:
+    """304 on a matching ETag, else the cached (or freshly built) payload."""
+    loaded = get_dataset(dataset)
+    if loaded is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{dataset} data not loaded",
+        )
+
+    etag = response_cache.etag(dataset, loaded.version, key)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    return cached_json_response(
+        request,
+        response_cache.get_or_build(dataset, loaded.version, key, lambda: build(loaded.data)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/veloways",
+    summary="Eastern Sydney veloway corridors, hubs and destinations",
+)
+async def list_veloways(request: Request) -> Response:
+    return _serve(request, "veloways", "all", lambda data: data)
+
+
+@router.get(
+    "/planned-projects",
+    summary="Planned, under-construction and existing cycleway projects",
+)
+async def list_planned_projects(request: Request) -> Response:
+    return _serve(request, "planned", "all", lambda data: data)
+
+
+@router.get(
+    "/pois",
+    summary="Get points of interest within a bounding box",
+)
+async def list_pois(
+    request: Request,
+    bbox: str = Query(..., description="west,south,east,north"),
+    type: str | None = None,
+    local_area: str | None = None,
+    is_secure: bool | None = None,
+) -> Response:
+    try:
+        box = parse_lga_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    box = snap_bbox(box, settings.NETWORK_BBOX_GRID_DEGREES)   # nearby viewports share a cache entry
+    west, south, east, north = box
+
+    def build(pois: list[dict]) -> dict:
+        matches = [
+            p for p in pois
+            if west <= p["location"]["lng"] <= east
+            and south <= p["location"]["lat"] <= north
+            and (type is None or p.get("type") == type)
+            and (local_area is None or p.get("local_area") == local_area)
+            and (is_secure is None or bool(p.get("is_secure")) == is_secure)
+        ]
+        return {"pois": matches, "meta": {"total": len(matches), "bbox": format_bbox(box)}}
+
+    key = f"{format_bbox(box)}|{type}|{local_area}|{is_secure}"
+    return _serve(request, "pois", key, build)
@@ -0,0 +1,89 @@
+"""
+Micro2Move — Segments Router
+Bounding-box queries over the in-memory cycle network segment store.
+
+Endpoints:
+    GET  /api/v1/segments
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from config import settings
+from services.geo import format_bbox, parse_lga_bbox, snap_bbox
+from services.network_loader import get_segment_store
+from services.response_cache import (
+    cached_json_response,
+    is_not_modified,
+    not_modified_response,
+    response_cache,
+)
+
+router = APIRouter(prefix="/api/v1/segments", tags=["segments"])
+
+FacilityType = Literal["separated_cycleway", "shared_path", "painted_lane", "mixed_traffic"]
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "",
+    summary="Get segments within a bounding box",
+)
+async def list_segments(
+    request: Request,
+    bbox: str = Query(..., description="west,south,east,north — within the City of Sydney LGA",
+                      examples=["151.19,-33.90,151.23,-33.86"]),
+    facility_type: FacilityType | None = None,
+    local_area: str | None = None,
+    min_comfort: float | None = Query(None, ge=0, le=1),
+    max_risk: float | None = Query(None, ge=0, le=1),
+) -> Response:
+    """
+    Returns every segment intersecting the bbox that passes the attribute
+    filters, in the SegmentsResponse shape from api-spec.yaml.
+
+    The bbox is widened to the NETWORK_BBOX_GRID_DEGREES grid (meta.bbox
+    reports the widened box), so panning clients share cache entries.
+    Responses are cached pre-serialized per query for the current segment
+    data version; a matching If-None-Match gets a 304.
+    """
+    try:
+        box = parse_lga_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    box = snap_bbox(box, settings.NETWORK_BBOX_GRID_DEGREES)
+
+    # Pin one data version for the whole request, even across a hot reload
+    store = get_segment_store()
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Segment data not loaded",
+        )
+
+    key = f"{format_bbox(box)}|{facility_type}|{local_area}|{min_comfort}|{max_risk}"
+    etag = response_cache.etag("segments", store.version, key)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    def build() -> dict:
+        idx = store.query(
+            box,
+            facility_type=facility_type,
+            local_area=local_area,
+            min_comfort=min_comfort,
+            max_risk=max_risk,
+        )
+        return {
+            "segments": store.rows(idx),
+            "meta": {"total": len(idx), "bbox": format_bbox(box)},
+        }
+
+    return cached_json_response(
+        request, response_cache.get_or_build("segments", store.version, key, build)
+    )
@@ -5,23 +5,24 @@ Read and update the authenticated user's profile.
 Endpoints:
     GET  /api/v1/users/me
     PUT  /api/v1/users/me
+    GET  /api/v1/users/me/bookings
 """
 
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel, HttpUrl
-from supabase import create_client
+import time
+from datetime import date, datetime
 
-from config import settings
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, HttpUrl
 from middleware.auth import CurrentUser
+from services.profile_cache import not_modified, profile_cache, profile_etag
+from services.provisioning import ensure_profile
+from services.response_cache import is_not_modified
+from services.supabase_clients import service_client
+from services.user_data import PROFILE_COLUMNS, get_bookings, get_profile
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 
-def _service_sb():
-    """Supabase client with service-role key for privileged DB access."""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-
-
 # ---------------------------------------------------------------------------
 # Schemas
 # ---------------------------------------------------------------------------
@@ -38,6 +39,17 @@ class UserProfile(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class BookingSummary(BaseModel):
+    booking_id: str
+    booking_date_time: datetime
+    start_date: date
+    end_date: date
+    booking_status_name: str
+    total_amount: float
+    e_bike_id: str
+    e_bike_name: str
+
+
 class UpdateProfileRequest(BaseModel):
     full_name: str | None = None
     phone: str | None = None
@@ -55,27 +67,10 @@ class UpdateProfileRequest(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-@router.get(
-    "/me",
-    response_model=UserProfile,
-    summary="Get the authenticated user's profile",
-)
-async def get_my_profile(user: CurrentUser) -> UserProfile:
-    """
-    Returns the current user's name, credit balance, and ID-verification status.
-    """
-    sb = _service_sb()
-    result = sb.table("users").select(
-        "user_id, full_name, email, profile_image_link, credits, verified_id"
-    ).eq("user_id", user.sub).maybe_single().execute()
+PROFILE_CACHE_CONTROL = "private, no-cache"   # clients always revalidate with If-None-Match
 
-    if not result.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User profile not found",
-        )
 
-    row = result.data
+def _profile(row: dict) -> UserProfile:
     return UserProfile(
         user_id=row["user_id"],
         full_name=row.get("full_name"),
@@ -86,6 +81,47 @@ async def get_my_profile(user: CurrentUser) -> UserProfile:
     )
 
 
+def _set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = f'"{etag}"'
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
+
+
+@router.get(
+    "/me",
+    response_model=UserProfile,
+    summary="Get the authenticated user's profile",
+)
+async def get_my_profile(user: CurrentUser, request: Request, response: Response):
+    """
+    Returns the current user's name, credit balance, and ID-verification status.
+
+    Read through the profile cache; a matching If-None-Match gets a 304.
+    """
+    row = profile_cache.get(user.sub)
+    if row is None:
+        read_started = time.time()
+        row = await get_profile(user.sub)
+        # Registered moments ago: provisioning may still be in flight, or may have failed
+        if not row and await ensure_profile(user.sub, user.email, user.user_metadata.get("full_name")):
+            row = await get_profile(user.sub)
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User profile not found",
+            )
+        profile_cache.fill(user.sub, row, read_started)
+
+    etag = profile_etag(row)
+    if is_not_modified(request, etag):
+        not_modified.inc()
+        reply = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        _set_validators(reply, etag)
+        return reply
+
+    _set_validators(response, etag)
+    return _profile(row)
+
+
 @router.put(
     "/me",
     response_model=UserProfile,
@@ -94,12 +130,14 @@ async def get_my_profile(user: CurrentUser) -> UserProfile:
 async def update_my_profile(
     body: UpdateProfileRequest,
     user: CurrentUser,
+    response: Response,
 ) -> UserProfile:
     """
     Update full_name, phone, or avatar_url.
     Only fields that are explicitly provided (non-null) are updated.
+    The updated row replaces the cached profile.
     """
-    sb = _service_sb()
+    sb = service_client()
 
     updates: dict = {}
     if body.full_name is not None:
@@ -113,26 +151,30 @@ async def update_my_profile(
             detail="No fields provided to update",
         )
 
-    result = (
-        sb.table("users")
-        .update(updates)
-        .eq("user_id", user.sub)
-        .select("user_id, full_name, email, profile_image_link, credits, verified_id")
-        .execute()
-    )
+    # PostgREST returns the updated rows (Prefer: return=representation)
+    result = await sb.table("users").update(updates).eq("user_id", user.sub).execute()
 
     if not result.data:
+        profile_cache.invalidate(user.sub)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found",
         )
 
-    row = result.data[0]
-    return UserProfile(
-        user_id=row["user_id"],
-        full_name=row.get("full_name"),
-        email=row.get("email"),
-        avatar_url=row.get("profile_image_link"),
-        credits=row.get("credits", 0),
-        verified_id=row.get("verified_id", False),
-    )
+    row = {column: result.data[0][column] for column in PROFILE_COLUMNS if column in result.data[0]}
+    profile_cache.put(user.sub, row)
+    _set_validators(response, profile_etag(row))
+    return _profile(row)
+
+
+@router.get(
+    "/me/bookings",
+    response_model=list[BookingSummary],
+    summary="List the authenticated user's bookings",
+)
+async def list_my_bookings(
+    user: CurrentUser,
+    limit: int = Query(20, ge=1, le=100),
+) -> list[dict]:
+    """Most recent start date first."""
+    return await get_bookings(user.sub, limit)
@@ -0,0 +1,193 @@
+"""
+Micro2Move Sydney - Auth and User Endpoint Benchmark
+
+Serves the app with uvicorn on a local port, backed by scripts.fake_supabase
+(with --latency added to every Supabase call), and measures each auth and
+user endpoint in turn: --requests requests with --concurrency in flight.
+Reports throughput, p50/p95/p99 latency and status codes per endpoint, and
+how many Supabase calls each request made.
+
+The run registers --requests accounts and then reuses their tokens.  It
+seeds bookings for each account and --bikes available bikes.  Every request
+comes from 127.0.0.1, so rate limiting is off unless --rate-limit is given.
+The app, the fake and this driver share one process, each on its own thread
+and event loop, so absolute numbers are a floor.  Compare runs, not
+machines.
+
+Usage:
+    cd backend
+    python -m scripts.bench_api_endpoints --requests 500 --concurrency 20 --latency 0.02
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+os.environ.setdefault("NETWORK_RELOAD_POLL_SECONDS", "0")
+
+from config import settings  # noqa: E402
+from scripts.bench_supabase_clients import serve  # noqa: E402
+from scripts.fake_supabase import FakeSupabase  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+class Account:
+    def __init__(self, email: str):
+        self.email = email
+        self.token: str | None = None
+        self.etag: str | None = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+# Request builders: the httpx kwargs for the i-th request, made by account
+def _register(account: Account, i: int) -> dict:
+    return {"json": {"full_name": f"Bench Rider {i}", "email": account.email, "password": PASSWORD}}
+
+
+def _login(account: Account, i: int) -> dict:
+    return {"json": {"email": account.email, "password": PASSWORD}}
+
+
+def _authorised(account: Account, i: int) -> dict:
+    return {"headers": account.headers}
+
+
+def _revalidate(account: Account, i: int) -> dict:
+    return {"headers": {**account.headers, "If-None-Match": account.etag or ""}}
+
+
+def _rename(account: Account, i: int) -> dict:
+    return {"headers": account.headers, "json": {"full_name": f"Renamed Rider {i}"}}
+
+
+def _availability(account: Account, i: int) -> dict:
+    start = date.today() + timedelta(days=7 + i % 14)
+    end = start + timedelta(days=7)
+    return {"headers": account.headers, "params": {"start": start.isoformat(), "end": end.isoformat()}}
+
+
+# name → (method, path, request builder), measured in this order
+ENDPOINTS = {
+    "register": ("POST", "/api/v1/auth/register", _register),
+    "login": ("POST", "/api/v1/auth/login", _login),
+    "auth/me": ("GET", "/api/v1/auth/me", _authorised),
+    "users/me": ("GET", "/api/v1/users/me", _authorised),
+    "users/me 304": ("GET", "/api/v1/users/me", _revalidate),
+    "users/me PUT": ("PUT", "/api/v1/users/me", _rename),
+    "bookings": ("GET", "/api/v1/users/me/bookings", _authorised),
+    "bikes": ("GET", "/api/v1/bikes/available", _availability),
+}
+
+
+def seed_bikes(fake: FakeSupabase, n: int, rng: random.Random) -> None:
+    today = date.today()
+    fake.seed("v_available_bikes", [{
+        "e_bike_id": str(uuid.uuid4()),
+        "e_bike_name": f"Bench Bike {i}",
+        "price_per_week": rng.randrange(40, 120),
+        "available_from_date": (today - timedelta(days=rng.randrange(30))).isoformat(),
+        "available_to_date": None if i % 3 else (today + timedelta(days=rng.randrange(20, 90))).isoformat(),
+        "e_bike_category_name": rng.choice(["commuter", "cargo", "folding"]),
+        "e_bike_status_name": "is_listed",
+        "pick_up_geo_location_id": None,
+    } for i in range(n)])
+
+
+def seed_bookings(fake: FakeSupabase, user_ids: list[str], per_user: int) -> None:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for user_id in user_ids:
+        for i in range(per_user):
+            start = now.date() - timedelta(days=14 * i)
+            rows.append({
+                "booking_id": str(uuid.uuid4()),
+                "booking_date_time": (now - timedelta(days=14 * i + 3)).isoformat(),
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=7)).isoformat(),
+                "booking_status_name": "completed" if i else "confirmed",
+                "total_amount": 79.0,
+                "renter_user_id": user_id,
+                "e_bike_id": str(uuid.uuid4()),
+                "e_bike_name": "Bench Bike",
+            })
+    fake.seed("v_booking_summary", rows)
+
+
+def summary(timings: list[float]) -> str:
+    q = statistics.quantiles(timings, n=100, method="inclusive")
+    return f"p50={q[49]:7.1f} ms  p95={q[94]:7.1f} ms  p99={q[98]:7.1f} ms"
+
+
+async def measure(client, name: str, accounts: list[Account], concurrency: int, fake: FakeSupabase) -> None:
+    method, path, build = ENDPOINTS[name]
+    slots = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+    codes: Counter[int] = Counter()
+    upstream_before = sum(fake.calls.values())
+
+    async def one(i: int, account: Account) -> None:
+        async with slots:
+            started = time.perf_counter()
+            response = await client.request(method, path, **build(account, i))
+            timings.append((time.perf_counter() - started) * 1000)
+            codes[response.status_code] += 1
+            if response.is_success and name in ("register", "login"):
+                account.token = response.json()["access_token"]
+            if "etag" in response.headers:
+                account.etag = response.headers["etag"]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, account) for i, account in enumerate(accounts)))
+    elapsed = time.perf_counter() - started
+    upstream = (sum(fake.calls.values()) - upstream_before) / len(accounts)
+    statuses = ", ".join(f"{code}×{n}" for code, n in sorted(codes.items()))
+    print(f"  {name:<13} {len(accounts) / elapsed:7.1f} req/s  {summary(timings)}  "
+          f"{upstream:4.1f} Supabase calls/req  [{statuses}]")
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per request otherwise
+    rng = random.Random(args.seed)
+    fake = FakeSupabase(latency=args.latency).install()
+    settings.RATE_LIMIT_ENABLED = args.rate_limit
+    seed_bikes(fake, args.bikes, rng)
+
+    import main
+    base_url = serve(main.app)
+
+    run_id = uuid.uuid4().hex[:8]
+    accounts = [Account(f"bench-{run_id}-{i}@example.com") for i in range(args.requests)]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        print(f"{args.requests} requests per endpoint, {args.concurrency} in flight, "
+              f"Supabase latency {args.latency * 1000:.0f} ms")
+        await measure(client, "register", accounts, args.concurrency, fake)
+        await asyncio.sleep(args.latency * 2 + 0.1)   # let background provisioning land
+        seed_bookings(fake, [u["id"] for u in fake.rows("auth.users")], args.bookings)
+        for name in ENDPOINTS:
+            if name != "register":
+                await measure(client, name, accounts, args.concurrency, fake)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark auth and user endpoints against a local Supabase stand-in")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint (and accounts registered)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every Supabase call")
+    parser.add_argument("--bikes", type=int, default=200, help="available bikes to seed")
+    parser.add_argument("--bookings", type=int, default=5, help="bookings to seed per account")
+    parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting on")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
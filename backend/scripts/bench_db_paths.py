@@ -0,0 +1,85 @@
+"""
+Micro2Move Sydney - REST vs Direct Database Benchmark
+
+Runs the hot reads in services.user_data (profile, bookings, available bikes)
+through both paths against the same database, sequentially and then with
+--concurrency requests in flight, and reports latency per query and path.
+Both paths must point at the same project: SUPABASE_URL and
+SUPABASE_SERVICE_KEY for REST, DATABASE_URL (its direct or pooler
+connection string) for asyncpg.
+
+Usage:
+    cd backend
+    python -m scripts.bench_db_paths --user-id <uuid> --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from database import close_db
+from services import user_data
+from services.supabase_clients import close_supabase
+
+PATHS = {
+    "profile": (user_data.rest_profile, user_data.direct_profile),
+    "bookings": (user_data.rest_bookings, user_data.direct_bookings),
+    "available": (user_data.rest_available_bikes, user_data.direct_available_bikes),
+}
+
+
+def summary(timings: list[float]) -> str:
+    q = statistics.quantiles(timings, n=100, method="inclusive")
+    return f"mean={statistics.fmean(timings):7.2f} ms  p50={q[49]:7.2f} ms  p95={q[94]:7.2f} ms"
+
+
+async def measure(fetch, args: tuple, n: int, concurrency: int) -> tuple[list[float], float]:
+    timings: list[float] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with slots:
+            started = time.perf_counter()
+            await fetch(*args)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return timings, time.perf_counter() - started
+
+
+def rows(result) -> int:
+    if result is None:
+        return 0
+    return len(result) if isinstance(result, list) else 1
+
+
+async def run(user_id: str, n: int, concurrency: int) -> None:
+    start = date.today() + timedelta(days=7)
+    arguments = {
+        "profile": (user_id,),
+        "bookings": (user_id, 20),
+        "available": (start, start + timedelta(days=7), 50),
+    }
+    try:
+        for name, (rest, direct) in PATHS.items():
+            args = arguments[name]
+            rest_rows, direct_rows = rows(await rest(*args)), rows(await direct(*args))   # also warms both pools
+            print(f"{name}: {rest_rows} row(s) over REST, {direct_rows} direct")
+            for label, fetch in (("rest", rest), ("direct", direct)):
+                for width in (1, concurrency):
+                    timings, elapsed = await measure(fetch, args, n, width)
+                    print(f"  {label:<6} x{width:<3} {summary(timings)}  {n / elapsed:7.1f} req/s")
+    finally:
+        await close_supabase()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare REST and direct Postgres reads")
+    parser.add_argument("--user-id", required=True, help="an existing users.user_id")
+    parser.add_argument("--requests", type=int, default=200, help="requests per path and concurrency level")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.user_id, args.requests, args.concurrency))
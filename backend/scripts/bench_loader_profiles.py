@@ -0,0 +1,186 @@
+"""
+Micro2Move Sydney - Eager-Loading Profile Benchmark
+
+Seeds an in-memory SQLite database from the model metadata, with --rows rows
+in each lookup table and --fanout times that in each table with a foreign
+key.  Every profile in services.eager_loading then loads --parents rows of
+its entity in two ways:
+
+- eager: loader_query(), held to the profile's query budget;
+- lazy: the same rows without loader options, with the relationships the
+  profile covers touched one by one, as a sync session would (N+1).
+
+Reports statements and time for each.  It exits non-zero if a profile goes
+over its budget, so it can run in CI.
+
+Usage:
+    cd backend
+    python -m scripts.bench_loader_profiles --parents 50
+"""
+import argparse
+import asyncio
+import datetime
+import decimal
+import random
+import sys
+import time
+
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registers every mapper)
+from database import Base
+from services.eager_loading import LOADER_PROFILES, loader_query
+from services.query_budget import QueryBudgetExceeded, QueryCounter, query_budget
+
+
+def _value(column, i: int, rng: random.Random):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = str
+    if getattr(column.type, "enum_class", None):
+        return rng.choice(list(column.type.enum_class))
+    if python_type is bool:
+        return bool(i % 2)
+    if python_type is int:
+        return i
+    if python_type is float:
+        return float(i)
+    if python_type is decimal.Decimal:
+        return decimal.Decimal(i % 500)
+    if python_type is datetime.datetime:
+        return datetime.datetime(2025, 1, 1) + datetime.timedelta(hours=i)
+    if python_type is datetime.date:
+        return datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365)
+    if python_type in (dict, list):
+        return python_type()
+    return f"{column.table.name}-{column.name}-{i}"
+
+
+def _generate(table, n: int, keys: dict, rng: random.Random) -> list[dict]:
+    """n rows with every column filled; foreign keys point at existing rows."""
+    pools = {}
+    for column in table.columns:
+        for fk in column.foreign_keys:
+            parents = keys.get((fk.column.table.name, fk.column.name), [])
+            pools[column.name] = rng.sample(parents, len(parents)) if column.unique or column.primary_key else parents
+    if any(not pool for pool in pools.values()):
+        return []
+    unique_fks = [c.name for c in table.columns if c.name in pools and (c.unique or c.primary_key)]
+    if len(unique_fks) == 1:      # one row per parent at most (1:1 tables)
+        n = min(n, len(pools[unique_fks[0]]))
+
+    rows, seen_pks = [], set()
+    for i in range(n):
+        row = {}
+        for column in table.columns:
+            if column.name in pools:
+                pool = pools[column.name]
+                row[column.name] = pool[i] if column.name in unique_fks and len(unique_fks) == 1 else rng.choice(pool)
+            else:
+                row[column.name] = _value(column, i, rng)
+        pk = tuple(row[c.name] for c in table.primary_key.columns)
+        if pk not in seen_pks:
+            seen_pks.add(pk)
+            rows.append(row)
+    return rows
+
+
+async def seed(session, rows: int, fanout: int, rng: random.Random) -> None:
+    keys: dict[tuple[str, str], list] = {}
+    for table in Base.metadata.sorted_tables:
+        has_parent = any(column.foreign_keys for column in table.columns)
+        data = _generate(table, rows * fanout if has_parent else rows, keys, rng)
+        if data:
+            await session.execute(insert(table), data)
+        for column in table.columns:
+            keys[(table.name, column.name)] = [row[column.name] for row in data]
+    await session.commit()
+
+
+def loaded_paths(objects, prefix: tuple = (), seen: set | None = None) -> set[tuple[str, ...]]:
+    """Relationship paths (as attribute names) already loaded on objects."""
+    seen = set() if seen is None else seen
+    paths = set()
+    for obj in objects:
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        state = inspect(obj)
+        for relationship in state.mapper.relationships:
+            if relationship.key in state.unloaded:
+                continue
+            value = state.attrs[relationship.key].loaded_value
+            children = value if relationship.uselist else [value] if value is not None else []
+            paths.add(prefix + (relationship.key,))
+            paths |= loaded_paths(children, prefix + (relationship.key,), seen)
+    return paths
+
+
+def touch(objects: list, paths: set[tuple[str, ...]]) -> None:
+    """Read every path on every object, lazy-loading whatever isn't there."""
+    for path in sorted(paths, key=len):
+        level = objects
+        for key in path:
+            next_level = []
+            for obj in level:
+                value = getattr(obj, key)
+                next_level.extend(value if isinstance(value, list) else [value] if value is not None else [])
+            level = next_level
+
+
+async def run(args: argparse.Namespace) -> int:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    try:
+        return await compare(engine, args)
+    finally:
+        await engine.dispose()
+
+
+async def compare(engine, args: argparse.Namespace) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        await seed(session, args.rows, args.fanout, random.Random(args.seed))
+
+    failed = False
+    print(f"{args.parents} parents per profile, {args.rows} lookup rows, fanout {args.fanout}")
+    for name, profile in LOADER_PROFILES.items():
+        pk = inspect(profile.entity).primary_key[0]
+        async with sessions() as session:
+            ids = (await session.execute(select(pk).limit(args.parents))).scalars().all()
+
+        async with sessions() as session:
+            started = time.perf_counter()
+            try:
+                with query_budget(profile.queries, engine) as eager:
+                    parents = (await session.execute(loader_query(name, pk.in_(ids)))).unique().scalars().all()
+            except QueryBudgetExceeded as exc:
+                print(f"  {name}: over budget\n{exc}")
+                failed = True
+                continue
+            eager_ms = (time.perf_counter() - started) * 1000
+            paths = loaded_paths(parents)
+
+        async with sessions() as session:
+            started = time.perf_counter()
+            with QueryCounter(engine) as lazy:
+                parents = (await session.execute(select(profile.entity).where(pk.in_(ids)))).scalars().all()
+                await session.run_sync(lambda _: touch(parents, paths))
+            lazy_ms = (time.perf_counter() - started) * 1000
+
+        print(f"  {name:<18} {len(parents):4d} rows  eager {eager.count:3d} queries {eager_ms:7.1f} ms "
+              f"(budget {profile.queries})  lazy {lazy.count:5d} queries {lazy_ms:8.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare eager-loading profiles with lazy loading")
+    parser.add_argument("--parents", type=int, default=50, help="rows of each profile's entity to load")
+    parser.add_argument("--rows", type=int, default=100, help="rows per lookup table")
+    parser.add_argument("--fanout", type=int, default=5, help="rows per table with a foreign key, times --rows")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,156 @@
+"""
+Micro2Move Sydney - Supabase Client Reuse Benchmark
+
+Measures GET /api/v1/users/me with a new Supabase client per request (the
+old behaviour) against the shared, pooled service client.  PostgREST is
+stood in for by a local HTTPS server with a self-signed certificate, so each
+new client pays a real TCP + TLS handshake; over the internet each handshake
+also costs one to two extra round trips to the Supabase region, which this
+local number does not include.
+
+Usage:
+    cd backend
+    python -m scripts.bench_supabase_clients --requests 300
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from starlette.responses import JSONResponse
+
+PROFILE = {
+    "user_id": "00000000-0000-0000-0000-000000000001",
+    "full_name": "Bench User",
+    "email": "bench@example.com",
+    "profile_image_link": None,
+    "credits": 120,
+    "verified_id": True,
+}
+BENCH_KEY = "bench.service.key"   # JWT-shaped, as supabase-py requires
+
+
+def self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return cert_path, key_path
+
+
+def postgrest_stub(latency: float = 0.0) -> FastAPI:
+    """Answers the profile query after latency seconds (Supabase's round trip)."""
+    app = FastAPI()
+
+    @app.get("/rest/v1/users")
+    async def users() -> JSONResponse:
+        if latency:
+            await asyncio.sleep(latency)
+        return JSONResponse(PROFILE)
+
+    return app
+
+
+def serve(app: FastAPI, cert: Path | None = None, key: Path | None = None) -> str:
+    """Start app on its own thread and event loop; returns its base URL."""
+    config = uvicorn.Config(
+        app,
+        host="127.0.0.1",
+        port=0,
+        log_level="warning",
+        ssl_certfile=str(cert) if cert else None,
+        ssl_keyfile=str(key) if key else None,
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"{'https' if cert else 'http'}://127.0.0.1:{port}"
+
+
+def measure(client: TestClient, token: str, n: int) -> list[float]:
+    timings = []
+    for _ in range(n):
+        started = time.perf_counter()
+        response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    q = statistics.quantiles(timings, n=100, method="inclusive")
+    return f"mean={statistics.fmean(timings):6.2f} ms  p50={q[49]:6.2f} ms  p95={q[94]:6.2f} ms"
+
+
+def run(n: int) -> None:
+    cert, key = self_signed_cert(Path(tempfile.mkdtemp(prefix="m2m-bench-")))
+    os.environ["SSL_CERT_FILE"] = str(cert)   # httpx trusts the stub's certificate
+    base_url = serve(postgrest_stub(), cert, key)
+
+    from config import settings
+    settings.SUPABASE_URL = base_url
+    settings.SUPABASE_SERVICE_KEY = BENCH_KEY
+
+    from routers import users
+    from services import supabase_clients
+    from supabase._async.client import AsyncClient
+
+    app = FastAPI()
+    app.include_router(users.router)
+    app.add_event_handler("shutdown", supabase_clients.close_supabase)
+    token = jwt.encode({"sub": PROFILE["user_id"], "role": "authenticated"}, settings.SUPABASE_JWT_SECRET)
+
+    with TestClient(app) as client:
+        pooled = users.service_client
+        users.service_client = lambda: AsyncClient(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        measure(client, token, 10)
+        per_request = measure(client, token, n)
+
+        users.service_client = pooled
+        measure(client, token, 10)
+        shared = measure(client, token, n)
+
+    saved = statistics.fmean(per_request) - statistics.fmean(shared)
+    print(f"GET /api/v1/users/me, {n} sequential requests against local HTTPS PostgREST stub")
+    print(f"  client per request: {summary(per_request)}")
+    print(f"  shared pooled client: {summary(shared)}")
+    print(f"  saved per request: {saved:.2f} ms (plus handshake round trips to Supabase in production)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Supabase client reuse on /users/me")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,111 @@
+"""
+Micro2Move Sydney - /users/me Concurrency Benchmark
+
+Drives GET /api/v1/users/me with N concurrent users against two versions of
+the endpoint served from one uvicorn worker:
+
+- blocking: the previous handler, calling the synchronous supabase client
+  from inside the async endpoint, so every PostgREST round trip stalls the
+  event loop and requests are served one at a time;
+- async: the current router, awaiting the shared async client.
+
+PostgREST is a local HTTPS stub that answers after --latency-ms, standing in
+for the round trip to the Supabase region.  Reports throughput and latency
+percentiles for each.  The stub, the app and the load generator share one
+process, so the async numbers are capped by CPU well below what a dedicated
+worker reaches.
+
+Usage:
+    cd backend
+    python -m scripts.bench_users_me_concurrency --users 50 --duration 10 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from jose import jwt
+
+from scripts.bench_supabase_clients import BENCH_KEY, PROFILE, postgrest_stub, self_signed_cert, serve
+
+PROFILE_COLUMNS = "user_id, full_name, email, profile_image_link, credits, verified_id"
+
+
+def blocking_router() -> APIRouter:
+    """GET /blocking/users/me, as the endpoint was before the async client."""
+    from config import settings
+    from middleware.auth import TokenPayload, get_current_user
+    from supabase import create_client
+
+    router = APIRouter()
+    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+
+    @router.get("/blocking/users/me")
+    async def get_my_profile(user: TokenPayload = Depends(get_current_user)) -> dict:
+        result = sb.table("users").select(PROFILE_COLUMNS).eq("user_id", user.sub).maybe_single().execute()
+        return result.data
+
+    return router
+
+
+async def drive(base_url: str, path: str, token: str, users: int, duration: float) -> tuple[list[float], float]:
+    timings: list[float] = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.get(path, headers=headers)
+
+        async def user(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(started + duration) for _ in range(users)))
+        return timings, time.perf_counter() - started
+
+
+def summary(timings: list[float], elapsed: float) -> str:
+    q = statistics.quantiles(timings, n=100, method="inclusive")
+    return (f"{len(timings) / elapsed:7.1f} req/s  "
+            f"p50={q[49]:7.1f} ms  p95={q[94]:7.1f} ms  p99={q[98]:7.1f} ms")
+
+
+def run(users: int, duration: float, latency_ms: float) -> None:
+    cert, key = self_signed_cert(Path(tempfile.mkdtemp(prefix="m2m-bench-")))
+    os.environ["SSL_CERT_FILE"] = str(cert)   # httpx trusts the stub's certificate
+    stub_url = serve(postgrest_stub(latency_ms / 1000), cert, key)
+
+    from config import settings
+    settings.SUPABASE_URL = stub_url
+    settings.SUPABASE_SERVICE_KEY = BENCH_KEY
+
+    from routers import users as users_router
+
+    app = FastAPI()
+    app.include_router(users_router.router)
+    app.include_router(blocking_router())
+    base_url = serve(app)
+    token = jwt.encode({"sub": PROFILE["user_id"], "role": "authenticated"}, settings.SUPABASE_JWT_SECRET)
+
+    print(f"GET /users/me, {users} concurrent users for {duration:.0f}s, "
+          f"PostgREST round trip {latency_ms:.0f} ms, one worker")
+    for label, path in (("blocking", "/blocking/users/me"), ("async", "/api/v1/users/me")):
+        timings, elapsed = asyncio.run(drive(base_url, path, token, users, duration))
+        print(f"  {label:<9} {summary(timings, elapsed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /users/me throughput under concurrent load")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per variant")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated PostgREST round trip")
+    args = parser.parse_args()
+    run(args.users, args.duration, args.latency_ms)
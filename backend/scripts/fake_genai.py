@@ -0,0 +1,149 @@
+"""
+Micro2Move Sydney - Fake Gemini Client
+
+Stands in for google.genai.Client in load tests and local runs without an API
+key or network access.  It answers client.aio.models.generate_content() and
+generate_content_stream() with plausible JSON for the prompt it is given
+(route narration, full route or refinement) after a latency drawn from a
+configurable distribution, and can be told to return malformed JSON or raise
+errors at a given rate.
+
+Latency specs:
+    fixed:2            every call takes 2 s
+    uniform:0.5,3      uniformly between 0.5 and 3 s
+    lognormal:1.5,0.5  median 1.5 s, sigma 0.5 (long tail, like the real API)
+
+Usage:
+    from scripts.fake_genai import FakeGenAI, install
+    install(FakeGenAI(latency="lognormal:1.5,0.5", malformed_rate=0.05))
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Callable
+from types import SimpleNamespace
+
+
+class FakeModelError(Exception):
+    """Injected failure, standing in for a 429/500 from the API."""
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler for a latency spec (see module docstring)."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"bad latency spec {spec!r}; use fixed:S, uniform:A,B or lognormal:MEDIAN,SIGMA")
+
+
+def _answer(prompt: str) -> dict:
+    if "The route is fixed" in prompt:
+        start = re.search(r"loop from (.+?)\. ", prompt)
+        name = start.group(1) if start else "Sydney"
+        return {
+            "insight": f"A relaxed loop from {name} on mostly protected paths.",
+            "route_name": f"{name} Loop",
+            "badges": ["Fake Model"],
+            "warnings": [],
+        }
+    distance = re.search(r"distance: ([\d.]+) ?km", prompt, re.IGNORECASE)
+    km = float(distance.group(1)) if distance else 10.0
+    return {
+        "insight": "A fake route through the inner city for load testing.",
+        "route_name": "Fake Route",
+        "distance_km": km,
+        "estimated_minutes": round(km * 4),
+        "elevation_gain_m": 30,
+        "safety_score": 85,
+        "segments": [
+            {"name": f"Street {i}", "distance_km": round(km / 5, 1), "type": "protected", "note": ""}
+            for i in range(5)
+        ],
+        "badges": ["Fake Model"],
+        "warnings": [],
+    }
+
+
+class FakeGenAI:
+    def __init__(
+        self,
+        latency: str = "fixed:1",
+        malformed_rate: float = 0.0,
+        error_rate: float = 0.0,
+        chunk_chars: int = 40,
+        blocking: bool = False,
+        seed: int | None = None,
+    ):
+        """
+        blocking=True sleeps the thread instead of awaiting, which is what a
+        synchronous SDK call inside an async endpoint does.
+        """
+        self.sample_latency = parse_latency(latency)
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self.chunk_chars = chunk_chars
+        self.blocking = blocking
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(
+            generate_content=self.generate_content,
+            generate_content_stream=self.generate_content_stream,
+        ))
+
+    async def _wait(self, seconds: float) -> None:
+        if self.blocking:
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _reply(self, prompt: str) -> str:
+        self.calls += 1
+        if self.rng.random() < self.error_rate:
+            raise FakeModelError("injected model failure")
+        text = json.dumps(_answer(prompt))
+        if self.rng.random() < self.malformed_rate:
+            # Truncated mid-object, the usual way real answers go wrong
+            text = "```json\n" + text[: self.rng.randint(1, len(text) - 1)]
+        return text
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> SimpleNamespace:
+        return SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+
+    async def generate_content(self, model: str, contents: str, **kwargs) -> SimpleNamespace:
+        await self._wait(self.sample_latency(self.rng))
+        text = self._reply(contents)
+        return SimpleNamespace(text=text, usage_metadata=self._usage(contents, text))
+
+    async def generate_content_stream(self, model: str, contents: str, **kwargs) -> AsyncIterator[SimpleNamespace]:
+        total = self.sample_latency(self.rng)
+        text = self._reply(contents)
+        chunks = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        # A third of the latency before the first token, the rest spread over the chunks
+        first, per_chunk = total / 3, total * 2 / 3 / max(len(chunks), 1)
+
+        async def stream() -> AsyncIterator[SimpleNamespace]:
+            await self._wait(first)
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await self._wait(per_chunk)
+                last = i == len(chunks) - 1
+                yield SimpleNamespace(text=chunk, usage_metadata=self._usage(contents, text) if last else None)
+
+        return stream()
+
+
+def install(fake: FakeGenAI) -> FakeGenAI:
+    """Make services.vertex_ai use fake instead of the real client."""
+    from services import vertex_ai
+
+    vertex_ai.client = fake
+    return fake
@@ -0,0 +1,40 @@
+"""
+Micro2Move Sydney - Local Redis Stand-in
+
+Serves an in-memory Redis-compatible server (fakeredis, with Lua scripting
+through lupa) so several local uvicorn workers can share rate-limit buckets
+without installing Redis.  Point RATE_LIMIT_REDIS_URL at it.  Not for
+production: state is lost on exit and throughput is far below Redis.
+
+Usage:
+    pip install "fakeredis[lua]"
+    cd backend
+    python -m scripts.fake_redis --port 6379
+    RATE_LIMIT_REDIS_URL=redis://127.0.0.1:6379/0 uvicorn main:app --workers 4
+"""
+import argparse
+import threading
+
+from fakeredis import TcpFakeServer
+
+
+def start(host: str = "127.0.0.1", port: int = 0) -> tuple[TcpFakeServer, str]:
+    """Serve on a background thread; returns the server and its redis:// URL."""
+    server = TcpFakeServer((host, port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"redis://{bound_host}:{bound_port}/0"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Redis-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = TcpFakeServer((args.host, args.port), server_type="redis")
+    print(f"Serving redis://{args.host}:{args.port}/0 (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
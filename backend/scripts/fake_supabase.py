@@ -0,0 +1,666 @@
+"""
+Micro2Move Sydney - Local Supabase Stand-in
+
+Serves the parts of Supabase that the routers and jobs use, so auth and
+user flows can be exercised, profiled and load-tested without a project:
+
+- Auth (/auth/v1): signup, token?grant_type=password, user, logout and
+  admin/users.  Access tokens are HS256 JWTs signed with
+  SUPABASE_JWT_SECRET and carry GoTrue's claims, so middleware.auth
+  verifies them exactly as it verifies real ones.  Sign-up confirms the
+  account at once and returns a session.
+- PostgREST (/rest/v1/<table>): column lists, eq/neq/gt/gte/lt/lte/like/
+  ilike/is/in filters, not. and or=(...), order, limit/offset, single-object
+  responses and count=exact on reads.  Writes cover insert and upsert
+  (merge or ignore duplicates, on_conflict), update and delete, with
+  return=minimal or return=representation.
+- RPC (/rest/v1/rpc/<function>): the functions the migrations add that the
+  backend calls (RPCS), reimplemented over the same rows.
+
+Rows are kept in SQLite (in memory, or --db FILE) as JSON documents.  Each
+relation gets one table, created the first time it is touched, with a unique
+index on its key; KEYS and DEFAULTS stand in for the schema.  There are no
+joins, RLS or column types.  Views such as v_booking_summary are plain tables
+seeded with their rows.
+
+The anon and service-role keys are JWTs signed with the same secret.  Any
+other apikey gets 401.  --latency delays every request, standing in for the
+round trip to the Supabase region and for GoTrue's password hashing.
+
+Usage:
+    cd backend
+    python -m scripts.fake_supabase --port 54321 --latency 0.02
+
+    from scripts.fake_supabase import FakeSupabase
+    fake = FakeSupabase(latency=0.02)
+    fake.install()          # serves it and points settings at it
+
+pytest uses the fake_supabase and api fixtures in conftest.py.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from jose import JWTError, jwt
+from starlette.datastructures import QueryParams
+
+from config import settings
+
+# Conflict target of inserts and upserts without on_conflict: the primary key
+KEYS = {
+    "auth.users": ("id",),
+    "users": ("user_id",),
+    "booking": ("booking_id",),
+    "e_bike": ("e_bike_id",),
+    "segment_usage": ("segment_id",),
+    "v_booking_summary": ("booking_id",),
+    "v_available_bikes": ("e_bike_id",),
+}
+DEFAULT_KEY = ("id",)
+
+# Column defaults the database would fill in on insert
+DEFAULTS = {
+    "users": {"credits": 0, "verified_id": False, "tnc_accepted": False, "is_active": True,
+              "profile_image_link": None},
+}
+
+# Functions served at /rest/v1/rpc/<name>: FakeSupabase method of the same name
+RPCS = {"provision_profiles", "replace_segment_usage"}
+
+ACCESS_TOKEN_SECONDS = 3600
+OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+COMPARISONS = {"neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class PostgrestError(Exception):
+    """Answered as PostgREST's JSON error body."""
+
+    def __init__(self, status: int, code: str, message: str, details: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "details": details, "hint": None, "message": message}
+
+
+class AuthError(Exception):
+    """Answered as GoTrue's JSON error body."""
+
+    def __init__(self, status: int, error_code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": status, "error_code": error_code, "msg": message}
+
+
+# ---------------------------------------------------------------------------
+# Filters
+# ---------------------------------------------------------------------------
+
+
+def _identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise PostgrestError(400, "PGRST100", f"unsupported column or table name {name!r}")
+    return name
+
+
+def _field(column: str) -> str:
+    return f"json_extract(doc, '$.{_identifier(column)}')"
+
+
+def _candidates(value: str) -> list:
+    """A filter value as text and, where it parses, as the number or boolean it spells."""
+    values: list = [value]
+    # Any case, as in Postgres (postgrest-py sends True); json_extract reads JSON booleans as 1 / 0
+    if value.lower() in ("true", "false"):
+        values.append(int(value.lower() == "true"))
+        return values
+    for parse in (int, float):
+        try:
+            values.append(parse(value))
+            break
+        except ValueError:
+            pass
+    return values
+
+
+def _split(text: str) -> list[str]:
+    """Split on top-level commas, honouring parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts]
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def _condition(column: str, spec: str) -> tuple[str, list]:
+    """column=op.value → SQL over the JSON document."""
+    negate = spec.startswith("not.")
+    if negate:
+        spec = spec[4:]
+    op, _, value = spec.partition(".")
+    value = _unquote(value)
+    field = _field(column)
+
+    if op == "eq":
+        values = _candidates(value)
+        sql, args = f"{field} IN ({', '.join('?' * len(values))})", values
+    elif op in COMPARISONS:
+        sql, args = f"{field} {COMPARISONS[op]} ?", [_candidates(value)[-1]]
+    elif op == "like":
+        sql, args = f"{field} GLOB ?", [value]                         # PostgREST's * wildcard is GLOB's
+    elif op == "ilike":
+        sql, args = f"lower({field}) LIKE lower(?)", [value.replace("*", "%")]
+    elif op == "is":
+        if value == "null":
+            sql, args = f"{field} IS NULL", []
+        elif value.lower() in ("true", "false"):
+            sql, args = f"{field} = ?", [int(value.lower() == "true")]
+        else:
+            raise PostgrestError(400, "PGRST100", f"is.{value} is not supported")
+    elif op == "in":
+        values = [c for item in _split(value.strip("()")) for c in _candidates(_unquote(item))]
+        sql, args = f"{field} IN ({', '.join('?' * len(values)) or 'NULL'})", values
+    else:
+        raise PostgrestError(400, "PGRST100", f"operator {op!r} is not supported")
+    return (f"NOT ({sql})" if negate else sql), args
+
+
+def _logic(operator: str, body: str) -> tuple[str, list]:
+    """or=(...) / and=(...), which may nest."""
+    negate = operator.startswith("not.")
+    joiner = " OR " if operator.removeprefix("not.") == "or" else " AND "
+    clauses, args = [], []
+    for term in _split(body):
+        match = re.match(r"^((?:not\.)?(?:and|or))\((.*)\)$", term)
+        if match:
+            sql, term_args = _logic(match.group(1), match.group(2))
+        else:
+            column, _, spec = term.partition(".")
+            sql, term_args = _condition(column, spec)
+        clauses.append(f"({sql})")
+        args.extend(term_args)
+    sql = joiner.join(clauses) or "1"
+    return (f"NOT ({sql})" if negate else sql), args
+
+
+def _where(params) -> tuple[str, list]:
+    clauses, args = [], []
+    for key, value in params.multi_items():
+        if key in RESERVED_PARAMS:
+            continue
+        if key in ("or", "and", "not.or", "not.and"):
+            sql, term_args = _logic(key, value.strip()[1:-1])
+        else:
+            sql, term_args = _condition(key, value)
+        clauses.append(f"({sql})")
+        args.extend(term_args)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+def _order(spec: str | None) -> str:
+    if not spec:
+        return ""
+    terms = []
+    for item in _split(spec):
+        column, *modifiers = item.split(".")
+        descending = "desc" in modifiers
+        nulls = "FIRST" if "nullsfirst" in modifiers else "LAST" if "nullslast" in modifiers else None
+        nulls = nulls or ("FIRST" if descending else "LAST")     # Postgres's defaults
+        terms.append(f"{_field(column)} {'DESC' if descending else 'ASC'} NULLS {nulls}")
+    return " ORDER BY " + ", ".join(terms)
+
+
+def _projection(spec: str | None):
+    """select=a,b,alias:c,d::text → function from document to response row."""
+    if not spec or spec.strip() == "*":
+        return lambda doc: doc
+    columns = []
+    for item in _split(spec):
+        if "(" in item:
+            raise PostgrestError(400, "PGRST100", f"embedded resources are not supported: {item}")
+        alias, _, source = item.split("::")[0].rpartition(":")
+        columns.append(((alias or source).strip(), _identifier(source.strip())))
+    return lambda doc: {name: doc.get(source) for name, source in columns}
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class Store:
+    """JSON documents in SQLite, one table per relation."""
+
+    def __init__(self, path: str = ":memory:"):
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._indexes: set[tuple[str, tuple[str, ...]]] = set()
+
+    @staticmethod
+    def _quote(table: str) -> str:
+        if not all(_IDENTIFIER.match(part) for part in table.split(".")):
+            raise PostgrestError(404, "42P01", f'relation "{table}" does not exist')
+        return f'"{table}"'
+
+    def _ensure(self, table: str, key: tuple[str, ...] | None = None) -> str:
+        """Create the table and a unique index on key (the table's primary key by default)."""
+        key = key or KEYS.get(table, DEFAULT_KEY)
+        quoted = self._quote(table)
+        if (table, key) not in self._indexes:
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {quoted} (doc TEXT NOT NULL)")
+            self.db.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "{table}.{"+".join(key)}" '
+                f"ON {quoted} ({', '.join(_field(c) for c in key)})"
+            )
+            self._indexes.add((table, key))
+        return quoted
+
+    def select(self, table: str, params, count: bool = False) -> tuple[list[dict], int | None]:
+        """Matching documents (after order/limit/offset) and, if count, how many matched in all."""
+        where, args = _where(params)
+        order = _order(params.get("order"))
+        page = ""
+        if "limit" in params or "offset" in params:
+            page = f" LIMIT {int(params.get('limit', -1))} OFFSET {int(params.get('offset', 0))}"
+        with self._lock:
+            quoted = self._ensure(table)
+            rows = self.db.execute(f"SELECT doc FROM {quoted}{where}{order}{page}", args).fetchall()
+            total = self.db.execute(f"SELECT count(*) FROM {quoted}{where}", args).fetchone()[0] if count else None
+        return [json.loads(doc) for doc, in rows], total
+
+    def insert(self, table: str, rows: list[dict], on_conflict: tuple[str, ...] | None, resolution: str | None) -> list[dict]:
+        """Insert rows atomically; resolution "merge" or "ignore" makes it an upsert on on_conflict."""
+        key = on_conflict or KEYS.get(table, DEFAULT_KEY)
+        conflict = ", ".join(_field(c) for c in key)
+        action = {
+            "merge": f" ON CONFLICT ({conflict}) DO UPDATE SET doc = json_patch(doc, excluded.doc)",
+            "ignore": f" ON CONFLICT ({conflict}) DO NOTHING",
+        }.get(resolution, "")
+        written = []
+        with self._lock:
+            quoted = self._ensure(table, key)
+            self._ensure(table)
+            self.db.execute("BEGIN")
+            try:
+                for row in rows:
+                    document = {**DEFAULTS.get(table, {}), **row}
+                    if len(key) == 1 and document.get(key[0]) is None:
+                        document[key[0]] = str(uuid.uuid4())
+                    written += self.db.execute(
+                        f"INSERT INTO {quoted} (doc) VALUES (?){action} RETURNING doc",
+                        [json.dumps(document, default=str)],
+                    ).fetchall()
+            except sqlite3.IntegrityError as exc:
+                self.db.execute("ROLLBACK")
+                raise PostgrestError(
+                    409, "23505", f'duplicate key value violates unique constraint "{table}_pkey"', str(exc)
+                )
+            self.db.execute("COMMIT")
+        return [json.loads(doc) for doc, in written]
+
+    def update(self, table: str, changes: dict, params) -> list[dict]:
+        where, args = _where(params)
+        with self._lock:
+            quoted = self._ensure(table)
+            try:
+                rows = self.db.execute(
+                    f"UPDATE {quoted} SET doc = json_patch(doc, ?){where} RETURNING doc",
+                    [json.dumps(changes, default=str), *args],
+                ).fetchall()
+            except sqlite3.IntegrityError as exc:
+                raise PostgrestError(
+                    409, "23505", f'duplicate key value violates unique constraint "{table}_pkey"', str(exc)
+                )
+        return [json.loads(doc) for doc, in rows]
+
+    def delete(self, table: str, params) -> list[dict]:
+        where, args = _where(params)
+        with self._lock:
+            rows = self.db.execute(f"DELETE FROM {self._ensure(table)}{where} RETURNING doc", args).fetchall()
+        return [json.loads(doc) for doc, in rows]
+
+    def clear(self) -> None:
+        with self._lock:
+            tables = self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+            for name, in tables:
+                self.db.execute(f'DROP TABLE "{name}"')
+            self._indexes.clear()
+
+
+# ---------------------------------------------------------------------------
+# Auth
+# ---------------------------------------------------------------------------
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _password_hash(password: str, salt: str | None = None) -> str:
+    # Deliberately cheap; --latency stands in for GoTrue's bcrypt cost
+    salt = salt or secrets.token_hex(8)
+    return f"{salt}${hashlib.sha256((salt + password).encode()).hexdigest()}"
+
+
+def _public_user(user: dict) -> dict:
+    return {k: v for k, v in user.items() if k != "encrypted_password"}
+
+
+class FakeSupabase:
+    def __init__(self, latency: float = 0.0, db: str = ":memory:", jwt_secret: str | None = None):
+        self.latency = latency
+        self.jwt_secret = jwt_secret or settings.SUPABASE_JWT_SECRET
+        self.anon_key = self._api_key("anon")
+        self.service_key = self._api_key("service_role")
+        self.store = Store(db)
+        self.calls: Counter[str] = Counter()   # "POST /auth/v1/signup" → requests served
+        self.url: str | None = None
+        self.app = self._build_app()
+
+    def _api_key(self, role: str) -> str:
+        return jwt.encode({"iss": "supabase-fake", "role": role, "iat": int(time.time())}, self.jwt_secret, "HS256")
+
+    # -- direct access, for fixtures and seeding ----------------------------
+
+    def seed(self, table: str, rows: list[dict]) -> list[dict]:
+        return self.store.insert(table, rows, None, "merge")
+
+    def rows(self, table: str, **filters: str) -> list[dict]:
+        """Rows of table, optionally narrowed by column=value equality."""
+        return self.store.select(table, QueryParams({c: f"eq.{v}" for c, v in filters.items()}))[0]
+
+    def create_user(self, email: str, password: str, metadata: dict | None = None) -> dict:
+        """A confirmed Auth user; AuthError if the email is taken."""
+        if len(password) < 6:
+            raise AuthError(422, "weak_password", "Password should be at least 6 characters.")
+        now = _now()
+        user = {
+            "id": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email.lower(),
+            "phone": "",
+            "encrypted_password": _password_hash(password),
+            "email_confirmed_at": now,
+            "confirmed_at": now,
+            "last_sign_in_at": now,
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": metadata or {},
+            "identities": [],
+            "created_at": now,
+            "updated_at": now,
+            "is_anonymous": False,
+        }
+        try:
+            self.store.insert("auth.users", [user], ("email",), None)
+        except PostgrestError:
+            raise AuthError(422, "user_already_exists", "User already registered")
+        return user
+
+    def sign_in(self, email: str, password: str) -> dict:
+        """A session for email and password; AuthError if they don't match."""
+        users = self.rows("auth.users", email=email.lower())
+        if users:
+            salt = users[0]["encrypted_password"].split("$")[0]
+            if secrets.compare_digest(_password_hash(password, salt), users[0]["encrypted_password"]):
+                return self.session(users[0])
+        raise AuthError(400, "invalid_credentials", "Invalid login credentials")
+
+    def access_token(self, user: dict, expires_in: int = ACCESS_TOKEN_SECONDS) -> str:
+        now = int(time.time())
+        claims = {
+            "aud": "authenticated",
+            "exp": now + expires_in,
+            "iat": now,
+            "iss": f"{self.url or 'http://localhost'}/auth/v1",
+            "sub": user["id"],
+            "email": user["email"],
+            "phone": user.get("phone", ""),
+            "app_metadata": user["app_metadata"],
+            "user_metadata": user["user_metadata"],
+            "role": "authenticated",
+            "aal": "aal1",
+            "amr": [{"method": "password", "timestamp": now}],
+            "session_id": str(uuid.uuid4()),
+            "is_anonymous": False,
+        }
+        return jwt.encode(claims, self.jwt_secret, "HS256")
+
+    def session(self, user: dict) -> dict:
+        return {
+            "access_token": self.access_token(user),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_SECONDS,
+            "expires_at": int(time.time()) + ACCESS_TOKEN_SECONDS,
+            "refresh_token": secrets.token_urlsafe(16),
+            "user": _public_user(user),
+        }
+
+    def reset(self) -> None:
+        self.store.clear()
+        self.calls.clear()
+
+    # -- RPC functions (see supabase/migrations) ---------------------------
+
+    def provision_profiles(self, p_rows: list[dict], p_max_age_seconds: float | None = None) -> int:
+        """Migration 005: create missing users rows, recording welcome credits in the ledger."""
+        created = 0
+        with self.store._lock:
+            for row in p_rows:
+                if p_max_age_seconds is not None:
+                    users = self.rows("auth.users", id=row["user_id"])
+                    age = (datetime.now(timezone.utc) - datetime.fromisoformat(users[0]["created_at"])
+                           if users else None)
+                    if age is None or age.total_seconds() > p_max_age_seconds:
+                        continue
+                credits = row.get("credits") or 0
+                if not self.store.insert("users", [{**row, "credits": credits}], ("user_id",), "ignore"):
+                    continue
+                if credits > 0:
+                    self.store.insert("credit_transactions", [{
+                        "user_id": row["user_id"], "amount": credits, "reason": "welcome credits",
+                        "created_at": _now(),
+                    }], None, None)
+                created += 1
+        return created
+
+    def replace_segment_usage(self, p_rows: list[dict]) -> int:
+        """Migration 004: replace every segment_usage row."""
+        with self.store._lock:
+            self.store.delete("segment_usage", QueryParams())
+            now = _now()
+            return len(self.store.insert("segment_usage", [{**row, "updated_at": now} for row in p_rows], None, None))
+
+    # -- serving ------------------------------------------------------------
+
+    def start(self) -> str:
+        """Serve on a free local port on a background thread; returns the base URL."""
+        from scripts.bench_supabase_clients import serve
+        if self.url is None:
+            self.url = serve(self.app)
+        return self.url
+
+    def install(self) -> "FakeSupabase":
+        """Start serving and point settings (URL, keys, JWT secret) at this fake."""
+        settings.SUPABASE_URL = self.start()
+        settings.SUPABASE_ANON_KEY = self.anon_key
+        settings.SUPABASE_SERVICE_KEY = self.service_key
+        settings.SUPABASE_JWT_SECRET = self.jwt_secret
+        return self
+
+    def _claims(self, token: str | None) -> dict | None:
+        if not token:
+            return None
+        try:
+            return jwt.decode(token, self.jwt_secret, algorithms=["HS256"], options={"verify_aud": False})
+        except JWTError:
+            return None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+        fake = self
+
+        @app.middleware("http")
+        async def gateway(request: Request, call_next):
+            fake.calls[f"{request.method} {request.url.path}"] += 1
+            if fake.latency:
+                await asyncio.sleep(fake.latency)
+            if (fake._claims(request.headers.get("apikey")) or {}).get("role") not in ("anon", "service_role"):
+                return JSONResponse({"message": "Invalid API key"}, status_code=401)
+            return await call_next(request)
+
+        @app.exception_handler(PostgrestError)
+        @app.exception_handler(AuthError)
+        async def error_body(request: Request, exc: PostgrestError | AuthError) -> JSONResponse:
+            return JSONResponse(exc.body, status_code=exc.status)
+
+        def bearer(request: Request) -> dict | None:
+            authorization = request.headers.get("authorization", "")
+            return fake._claims(authorization.removeprefix("Bearer ").strip())
+
+        # -- Auth -----------------------------------------------------------
+
+        @app.post("/auth/v1/signup")
+        async def signup(request: Request):
+            body = await request.json()
+            if not body.get("email") or not body.get("password"):
+                raise AuthError(422, "validation_failed", "Signup requires a valid password")
+            user = fake.create_user(body["email"], body["password"], body.get("data") or {})
+            return fake.session(user)
+
+        @app.post("/auth/v1/token")
+        async def token(request: Request):
+            if request.query_params.get("grant_type") != "password":
+                raise AuthError(400, "unsupported_grant_type", "Only the password grant is supported")
+            body = await request.json()
+            return fake.sign_in(body.get("email") or "", body.get("password") or "")
+
+        @app.get("/auth/v1/user")
+        async def current_user(request: Request):
+            claims = bearer(request)
+            users = fake.rows("auth.users", id=claims["sub"]) if claims and "sub" in claims else []
+            if not users:
+                raise AuthError(401, "bad_jwt", "invalid JWT")
+            return _public_user(users[0])
+
+        @app.post("/auth/v1/logout")
+        async def logout() -> Response:
+            return Response(status_code=204)
+
+        @app.get("/auth/v1/admin/users")
+        async def list_users(request: Request):
+            if (bearer(request) or {}).get("role") != "service_role":
+                raise AuthError(403, "not_admin", "User not allowed")
+            page = int(request.query_params.get("page") or 1)
+            per_page = int(request.query_params.get("per_page") or 50)
+            params = QueryParams({"order": "created_at", "limit": per_page, "offset": (page - 1) * per_page})
+            users, total = fake.store.select("auth.users", params, count=True)
+            return JSONResponse(
+                {"aud": "authenticated", "users": [_public_user(u) for u in users]},
+                headers={"x-total-count": str(total)},
+            )
+
+        # -- PostgREST ------------------------------------------------------
+
+        def respond(request: Request, rows: list[dict], status: int, total: int | None = None) -> Response:
+            prefer = request.headers.get("prefer", "")
+            if request.method != "GET" and "return=representation" not in prefer:
+                return Response(status_code=201 if request.method == "POST" else 204)
+            project = _projection(request.query_params.get("select"))
+            data: list | dict = [project(row) for row in rows]
+            if OBJECT_MEDIA_TYPE in request.headers.get("accept", ""):
+                if len(rows) != 1:
+                    raise PostgrestError(
+                        406, "PGRST116",
+                        "JSON object requested, multiple (or no) rows returned",
+                        f"The result contains {len(rows)} rows",
+                    )
+                data = data[0]
+            headers = {}
+            if "count=" in prefer:
+                start = int(request.query_params.get("offset", 0))
+                span = f"{start}-{start + len(rows) - 1}" if rows else "*"
+                headers["content-range"] = f"{span}/{total if total is not None else len(rows)}"
+            return JSONResponse(data, status_code=status, headers=headers)
+
+        @app.post("/rest/v1/rpc/{function}")
+        async def rpc(function: str, request: Request):
+            if function not in RPCS:
+                raise PostgrestError(404, "PGRST202", f"Could not find the function {function}")
+            return JSONResponse(getattr(fake, function)(**await request.json()))
+
+        @app.get("/rest/v1/{table}")
+        async def read(table: str, request: Request):
+            counted = "count=" in request.headers.get("prefer", "")
+            rows, total = fake.store.select(table, request.query_params, count=counted)
+            return respond(request, rows, 200, total)
+
+        @app.post("/rest/v1/{table}")
+        async def create(table: str, request: Request):
+            body = await request.json()
+            prefer = request.headers.get("prefer", "")
+            resolution = "merge" if "resolution=merge-duplicates" in prefer else (
+                "ignore" if "resolution=ignore-duplicates" in prefer else None
+            )
+            on_conflict = request.query_params.get("on_conflict")
+            key = tuple(_identifier(c.strip()) for c in on_conflict.split(",")) if on_conflict else None
+            rows = fake.store.insert(table, body if isinstance(body, list) else [body], key, resolution)
+            return respond(request, rows, 201)
+
+        @app.patch("/rest/v1/{table}")
+        async def modify(table: str, request: Request):
+            rows = fake.store.update(table, await request.json(), request.query_params)
+            return respond(request, rows, 200)
+
+        @app.delete("/rest/v1/{table}")
+        async def remove(table: str, request: Request):
+            rows = fake.store.delete(table, request.query_params)
+            return respond(request, rows, 200)
+
+        return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local Supabase stand-in (Auth + PostgREST)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--db", default=":memory:", help="SQLite file to keep rows in")
+    args = parser.parse_args()
+
+    fake = FakeSupabase(latency=args.latency, db=args.db)
+    fake.url = f"http://{args.host}:{args.port}"
+    print(f"SUPABASE_URL={fake.url}")
+    print(f"SUPABASE_ANON_KEY={fake.anon_key}")
+    print(f"SUPABASE_SERVICE_KEY={fake.service_key}")
+    print(f"SUPABASE_JWT_SECRET={fake.jwt_secret}")
+    uvicorn.run(fake.app, host=args.host, port=args.port, log_level="warning")
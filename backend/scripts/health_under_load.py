@@ -0,0 +1,87 @@
+"""
+Micro2Move Sydney - Health Latency Under AI Load
+
+Fires N concurrent POST /api/v1/routes/generate calls at the app in-process
+(httpx ASGITransport) while polling GET /api/health, and reports health
+latency percentiles idle vs under load.  The Gemini client is replaced by
+scripts.fake_genai answering in --model-seconds; --blocking makes the fake
+block the thread instead, which is what a synchronous SDK call inside an
+async endpoint does.  For throughput and endpoint latency, see
+scripts.load_test.
+
+Usage:
+    cd backend
+    python -m scripts.health_under_load --generations 16 --model-seconds 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("GEMINI_API_KEY", "load-test")
+os.environ.setdefault("NETWORK_RELOAD_POLL_SECONDS", "0")
+os.environ["AI_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="m2m-health-"), "ai_routes.sqlite3")
+
+import main  # noqa: E402
+from scripts.fake_genai import FakeGenAI, install  # noqa: E402
+
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """Latency of each health check measured from when it was due, so time
+    spent waiting for a blocked event loop counts."""
+    latencies = []
+    while not stop.is_set():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        await client.get("/api/health")
+        latencies.append((time.perf_counter() - due) * 1000)
+    return latencies
+
+
+def summary(latencies: list[float]) -> str:
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return f"n={len(latencies):<4} p50={q[49]:7.1f} ms  p99={q[98]:7.1f} ms  max={max(latencies):7.1f} ms"
+
+
+async def run(generations: int, model_seconds: float, blocking: bool) -> None:
+    install(FakeGenAI(latency=f"fixed:{model_seconds}", blocking=blocking))
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/health")
+
+        stop = asyncio.Event()
+        idle = asyncio.create_task(poll_health(client, stop, 0.01))
+        await asyncio.sleep(1.0)
+        stop.set()
+        idle_latencies = await idle
+
+        stop = asyncio.Event()
+        loaded = asyncio.create_task(poll_health(client, stop, 0.01))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/routes/generate", json={"start_location": f"Stop {i}"}, timeout=None)
+            for i in range(generations)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        loaded_latencies = await loaded
+
+    codes = sorted({r.status_code for r in responses})
+    print(f"{generations} generations ({'blocking' if blocking else 'async'} model, "
+          f"{model_seconds:g}s each) finished in {elapsed:.1f}s, status {codes}")
+    print(f"  /api/health idle:      {summary(idle_latencies)}")
+    print(f"  /api/health under load: {summary(loaded_latencies)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /api/health latency during AI generations")
+    parser.add_argument("--generations", type=int, default=16)
+    parser.add_argument("--model-seconds", type=float, default=2.0)
+    parser.add_argument("--blocking", action="store_true", help="simulate a synchronous SDK call")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.generations, args.model_seconds, args.blocking))
@@ -0,0 +1,215 @@
+"""
+Micro2Move Sydney - AI Endpoint Load Test
+
+Serves the app with uvicorn on a local port inside this process and drives
+it with N concurrent simulated users against /api/v1/routes/generate,
+/generate/stream and /refine, with Gemini replaced by scripts.fake_genai.
+Reports throughput, p50/p95/p99 latency and status codes per endpoint, time
+to first event for streams, and event-loop lag (how late a 10 ms timer fires
+on the server's loop while the test runs).  --transport asgi skips the
+socket (httpx ASGITransport), but buffers streamed responses.
+
+Requests are drawn from --distinct variants, so the AI cache and single-flight
+coalescing can be exercised (small --distinct) or defeated (large
+--distinct, or --no-cache).  The cache writes to a temporary file, never the
+real AI_CACHE_PATH.
+
+Usage:
+    cd backend
+    python -m scripts.load_test --users 50 --duration 20 --latency lognormal:1.5,0.5
+    python -m scripts.load_test --endpoint refine --malformed-rate 0.1 --no-cache
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+import uvicorn
+
+os.environ.setdefault("GEMINI_API_KEY", "load-test")
+os.environ.setdefault("NETWORK_RELOAD_POLL_SECONDS", "0")
+os.environ["AI_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="m2m-load-"), "ai_routes.sqlite3")
+
+import main  # noqa: E402
+from config import settings  # noqa: E402
+from scripts.fake_genai import FakeGenAI, install  # noqa: E402
+
+STARTS = ["Circular Quay", "Central", "Newtown", "Surry Hills", "Glebe", "Redfern", "Pyrmont", "Moore Park"]
+ENDPOINTS = ("generate", "stream", "refine")
+LAG_INTERVAL = 0.01
+
+
+class Results:
+    def __init__(self):
+        self.latency: dict[str, list[float]] = defaultdict(list)
+        self.first_event: list[float] = []
+        self.status: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.loop_lag: list[float] = []
+
+
+def route_request(rng: random.Random, distinct: int) -> dict:
+    variant = rng.randrange(distinct)
+    return {
+        "start_location": STARTS[variant % len(STARTS)],
+        "distance_km": 5 + variant // len(STARTS) % 30,
+        "safety_priority": 90,
+    }
+
+
+def refine_request(rng: random.Random, distinct: int) -> dict:
+    variant = rng.randrange(distinct)
+    return {
+        "current_route": {"distance_km": 10, "safety_score": 80, "segments": []},
+        "refinement_prompt": f"go past cafe number {variant}",
+        "safety_vs_direct": 75,
+    }
+
+
+async def call(client: httpx.AsyncClient, endpoint: str, rng: random.Random, distinct: int, results: Results):
+    started = time.perf_counter()
+    try:
+        status = await request(client, endpoint, rng, distinct, results, started)
+    except httpx.HTTPError:
+        status = 0   # connection dropped mid-response
+    results.latency[endpoint].append((time.perf_counter() - started) * 1000)
+    results.status[endpoint][status] += 1
+
+
+async def request(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    rng: random.Random,
+    distinct: int,
+    results: Results,
+    started: float,
+) -> int:
+    if endpoint == "generate":
+        response = await client.post("/api/v1/routes/generate", json=route_request(rng, distinct))
+    elif endpoint == "refine":
+        response = await client.post("/api/v1/routes/refine", json=refine_request(rng, distinct))
+    else:
+        async with client.stream(
+            "POST", "/api/v1/routes/generate/stream", json=route_request(rng, distinct)
+        ) as response:
+            first = None
+            async for _ in response.aiter_bytes():
+                if first is None:
+                    first = time.perf_counter() - started
+            if first is not None:
+                results.first_event.append(first * 1000)
+    return response.status_code
+
+
+async def user(
+    client: httpx.AsyncClient,
+    endpoints: list[str],
+    deadline: float,
+    seed: int,
+    distinct: int,
+    think: float,
+    results: Results,
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        await call(client, rng.choice(endpoints), rng, distinct, results)
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def watch_loop(stop: asyncio.Event, results: Results) -> None:
+    """How late a LAG_INTERVAL timer fires: the event loop's responsiveness."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        results.loop_lag.append((time.perf_counter() - started - LAG_INTERVAL) * 1000)
+
+
+def percentiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50={q[49]:8.1f} ms  p95={q[94]:8.1f} ms  p99={q[98]:8.1f} ms  max={max(values):8.1f} ms"
+
+
+async def serve() -> tuple[uvicorn.Server, asyncio.Task, str]:
+    """Run the app on a free local port in this event loop."""
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings.AI_CACHE_ENABLED = not args.no_cache
+    endpoints = list(ENDPOINTS) if args.endpoint == "mix" else [args.endpoint]
+
+    if args.transport == "http":
+        server, serving, base_url = await serve()
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=None))
+    else:
+        await main.startup()   # ASGITransport doesn't run lifespan events
+        transport, base_url = httpx.ASGITransport(app=main.app, raise_app_exceptions=False), "http://test"
+
+    results = Results()
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=None) as client:
+        fake = install(FakeGenAI(
+            latency=args.latency,
+            malformed_rate=args.malformed_rate,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        ))
+        await client.get("/api/health")
+
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(watch_loop(stop, results))
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            user(client, endpoints, deadline, args.seed + i, args.distinct, args.think, results)
+            for i in range(args.users)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await watcher
+
+    if args.transport == "http":
+        server.should_exit = True
+        await serving
+    else:
+        await main.shutdown()
+
+    total = sum(len(v) for v in results.latency.values())
+    print(f"{args.users} users for {elapsed:.1f}s, model {args.latency}, "
+          f"cache {'off' if args.no_cache else 'on'}, {args.distinct} distinct requests")
+    print(f"  throughput: {total / elapsed:.1f} req/s ({total} requests, {fake.calls} model calls)")
+    for endpoint in endpoints:
+        codes = ", ".join(f"{code}×{n}" for code, n in sorted(results.status[endpoint].items()))
+        print(f"  {endpoint:<9} {percentiles(results.latency[endpoint])}  [{codes}]")
+    if results.first_event:
+        print(f"  {'1st event':<9} {percentiles(results.first_event)}")
+    print(f"  loop lag  {percentiles(results.loop_lag)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the AI route endpoints against a fake model")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--endpoint", choices=(*ENDPOINTS, "mix"), default="mix")
+    parser.add_argument("--latency", default="lognormal:1.5,0.5", help="fake model latency spec")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated JSON answers")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls that raise")
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct request variants")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a user's requests (s)")
+    parser.add_argument("--no-cache", action="store_true", help="disable the AI route cache")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--transport", choices=("http", "asgi"), default="http")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,100 @@
+"""
+Micro2Move Sydney - Worker Memory Measurement
+
+Starts N independent worker processes (spawned, like `uvicorn --workers N`),
+loads the network snapshot in each, touches every segment and the routing
+graph so all pages are resident, and reports RSS / PSS / private memory per worker from
+/proc/<pid>/smaps_rollup.  Runs once with NETWORK_SHARED_MEMORY off (every
+worker parses its own copy) and once with it on (workers map one copy).
+
+Linux only.
+
+Usage:
+    cd backend
+    python -m scripts.measure_worker_memory --workers 4
+"""
+import argparse
+import gc
+import multiprocessing as mp
+import os
+import shutil
+from pathlib import Path
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty")
+EVERYWHERE = (-180.0, -90.0, 180.0, 90.0)
+
+
+def smaps_rollup(pid: int) -> dict[str, int]:
+    """Memory totals for a process, in kB."""
+    totals = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                totals[name] = int(rest.split()[0])
+    return totals
+
+
+def _worker(shared: bool, ready, done) -> None:
+    os.environ["NETWORK_SHARED_MEMORY"] = "true" if shared else "false"
+    from services.network_loader import get_routing_graph, get_segment_store, load_network
+    from services.routing import RouteWeights
+
+    load_network()
+    store = get_segment_store()
+    if store is not None:
+        # Fault in every column, tree level and record once
+        idx = store.query(EVERYWHERE, min_comfort=0.0, max_risk=1.0)
+        store.rows(idx)
+    graph = get_routing_graph()
+    if graph is not None and graph.n_nodes:
+        # ...and every routing array, through one full Dijkstra
+        graph.shortest_paths(0, graph.costs(RouteWeights()).tolist())
+    gc.collect()
+
+    ready.set()
+    done.wait()
+
+
+def measure(workers: int, shared: bool) -> list[dict[str, int]]:
+    ctx = mp.get_context("spawn")
+    done = ctx.Event()
+    procs = []
+    for _ in range(workers):
+        ready = ctx.Event()
+        proc = ctx.Process(target=_worker, args=(shared, ready, done))
+        proc.start()
+        procs.append((proc, ready))
+
+    for proc, ready in procs:
+        ready.wait()
+    stats = [smaps_rollup(proc.pid) for proc, _ in procs]
+
+    done.set()
+    for proc, _ in procs:
+        proc.join()
+    return stats
+
+
+def report(label: str, stats: list[dict[str, int]]) -> None:
+    print(f"\n{label}")
+    print("  worker " + "".join(f"{name:>15}" for name in FIELDS))
+    for i, row in enumerate(stats):
+        print(f"  {i:>6} " + "".join(f"{row[name] / 1024:>12.1f} MB" for name in FIELDS))
+    total_pss = sum(row["Pss"] for row in stats) / 1024
+    print(f"  total PSS {total_pss:.1f} MB across {len(stats)} workers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-worker RSS/PSS of the network data")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from config import settings
+    from services.network_loader import SHARED_DIR
+
+    # Start from a cold shared directory so the first worker builds it
+    shutil.rmtree(Path(settings.NETWORK_DATA_DIR) / SHARED_DIR, ignore_errors=True)
+
+    report("Private copies (NETWORK_SHARED_MEMORY=false)", measure(args.workers, shared=False))
+    report("Memory-mapped (NETWORK_SHARED_MEMORY=true)", measure(args.workers, shared=True))
@@ -0,0 +1,400 @@
+"""
+Micro2Move Sydney - AI Route Response Cache
+
+Most /api/v1/routes/generate requests are near-duplicates: the same start
+location written slightly differently, sliders a few points apart.  Requests
+are normalised into a key (canonical location, bucketed priorities, trimmed
+free text) and model results are cached under it:
+
+- an in-process LRU of decoded results answers repeat hits in microseconds;
+- a SQLite file (WAL) behind it survives restarts and is shared by workers.
+
+Keys include the network snapshot version (see publish_network), so routes
+and insights built on the old network are never served after a reload.
+Entries expire after AI_CACHE_TTL_SECONDS; the file is capped at
+AI_CACHE_MAX_ENTRIES, evicting least recently used rows.  Request keys are
+also counted so jobs.precompute_insights can warm the most popular ones.
+
+Request handlers never touch SQLite on the event loop: lookups that miss
+memory and stores run in a thread, and request counts and last-used times
+are buffered and flushed in batches by a background task.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from config import settings
+from services.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# Trailing address parts users add (or leave off) without changing the place
+_LOCATION_NOISE = {"sydney", "nsw", "new", "south", "wales", "australia", "au"}
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+_network_version = ""         # set by services.network_loader on every snapshot swap
+
+hits = counter("ai_cache_hits_total", "AI route cache hits", ["tier"])
+misses = counter("ai_cache_misses_total", "AI route cache misses")
+saved_seconds = counter(
+    "ai_cache_saved_seconds_total", "Model latency avoided by AI route cache hits"
+)
+
+
+def normalise_text(value: str | None) -> str:
+    """Lower-case, strip punctuation and collapse whitespace."""
+    return _SPACE.sub(" ", _NON_WORD.sub(" ", (value or "").lower())).strip()
+
+
+def normalise_location(value: str | None) -> str:
+    """'Circular Quay, Sydney NSW 2000' and 'circular quay' → 'circular quay'."""
+    parts = [normalise_text(part) for part in (value or "").split(",")]
+    while len(parts) > 1 and all(w in _LOCATION_NOISE or w.isdigit() for w in parts[-1].split()):
+        parts.pop()
+    return " ".join(part for part in parts if part)
+
+
+def bucket(value: int | float, step: int) -> int:
+    """Snap a 0-100 slider value to the nearest multiple of step."""
+    return int(round(value / step) * step)
+
+
+def publish_network(version: str) -> None:
+    """Make `version` the network every key is computed against from now on."""
+    global _network_version
+    _network_version = version
+
+
+def route_key(kind: str, params: dict) -> str:
+    """Stable digest of a normalised request against the current network."""
+    canonical = json.dumps(
+        {"kind": kind, "network": _network_version, **params}, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def generate_key(
+    start_location: str,
+    description: str,
+    scenery: str,
+    utilities: str,
+    distance_km: int,
+    ride_type: str,
+    safety_priority: int,
+    shade_priority: int,
+    hills_avoid: int,
+) -> str:
+    step = settings.AI_CACHE_PRIORITY_BUCKET
+    return route_key("generate", {
+        "start": normalise_location(start_location),
+        "description": normalise_text(description),
+        "scenery": normalise_text(scenery),
+        "utilities": normalise_text(utilities),
+        "distance_km": int(distance_km),
+        "ride_type": normalise_text(ride_type),
+        "safety": bucket(safety_priority, step),
+        "shade": bucket(shade_priority, step),
+        "hills": bucket(hills_avoid, step),
+    })
+
+
+def refine_key(
+    current_route: dict,
+    refinement_prompt: str,
+    safety_vs_direct: int,
+    shade_vs_speed: int,
+) -> str:
+    step = settings.AI_CACHE_PRIORITY_BUCKET
+    return route_key("refine", {
+        "route": current_route,
+        "prompt": normalise_text(refinement_prompt),
+        "safety_vs_direct": bucket(safety_vs_direct, step),
+        "shade_vs_speed": bucket(shade_vs_speed, step),
+    })
+
+
+def veloway_params(veloway: dict) -> dict:
+    """generate_route_insight() arguments for riding a veloway corridor."""
+    areas = veloway.get("local_areas") or []
+    start = areas[0] if areas else veloway["name"].split(" - ")[0]
+    return {
+        "start_location": start,
+        "description": f"Ride the {veloway['name']}. {veloway.get('description') or ''}".strip(),
+        "scenery": "",
+        "utilities": "",
+        "distance_km": max(5, round(float(veloway.get("length_km") or 0) * 2)),
+        "ride_type": "commute",
+        "safety_priority": 90,
+        "shade_priority": 50,
+        "hills_avoid": 20,
+    }
+
+
+def veloway_key(veloway_id: str) -> str:
+    return route_key("veloway", {"id": veloway_id})
+
+
+class AICache:
+    """
+    Two-tier (memory LRU → SQLite) TTL cache of JSON-serialisable results.
+
+    get/put block on SQLite and are for jobs; request handlers use aget/aput,
+    which answer memory hits inline and run the SQLite tier in a thread.
+    Request counts and last-used times are only buffered in memory; flush()
+    writes them in one transaction, every AI_CACHE_FLUSH_SECONDS while
+    start_ai_cache_flusher()'s task runs.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, memory_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, tuple[float, float, dict]] = OrderedDict()
+        self._requests: dict[str, list] = {}     # key → [kind, params, count, last_requested]
+        self._touched: dict[str, float] = {}     # key → last_used, for SQLite's LRU eviction
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()            # memory tier and buffers; never held across I/O
+        self._db_lock = threading.Lock()
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " cost_seconds REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ai_cache_last_used ON ai_cache (last_used)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_requests ("
+                " key TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " params TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " last_requested REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, cost_seconds: float, value: dict) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, cost_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key: str, now: float) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            self._memory.move_to_end(key)
+            self._touched[key] = now
+        hits.inc(tier="memory")
+        saved_seconds.inc(entry[1])
+        return entry[2]
+
+    def _from_sqlite(self, key: str, now: float) -> dict | None:
+        try:
+            with self._db_lock:
+                row = self._db().execute(
+                    "SELECT value, expires_at, cost_seconds FROM ai_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        except sqlite3.Error:
+            logger.exception("AI cache read failed")
+            row = None
+
+        if row is None:
+            with self._lock:
+                self._memory.pop(key, None)
+            misses.inc()
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, row[1], row[2], value)
+        with self._lock:
+            self._touched[key] = now
+        hits.inc(tier="sqlite")
+        saved_seconds.inc(row[2])
+        return value
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        value = self._from_memory(key, now)
+        return value if value is not None else self._from_sqlite(key, now)
+
+    async def aget(self, key: str) -> dict | None:
+        """get() without blocking the event loop on SQLite."""
+        now = time.time()
+        value = self._from_memory(key, now)
+        return value if value is not None else await asyncio.to_thread(self._from_sqlite, key, now)
+
+    def _store(self, key: str, value: dict, cost_seconds: float, expires_at: float, now: float) -> None:
+        try:
+            with self._db_lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, last_used, cost_seconds)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(value), expires_at, now, cost_seconds),
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict(db, now)
+        except sqlite3.Error:
+            logger.exception("AI cache write failed")
+
+    def put(self, key: str, value: dict, cost_seconds: float, ttl_seconds: float | None = None) -> None:
+        """Store value; cost_seconds is what producing it took."""
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._remember(key, expires_at, cost_seconds, value)
+        self._store(key, value, cost_seconds, expires_at, now)
+
+    async def aput(self, key: str, value: dict, cost_seconds: float, ttl_seconds: float | None = None) -> None:
+        """put() with the SQLite write in a thread; memory hits see it at once."""
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._remember(key, expires_at, cost_seconds, value)
+        await asyncio.to_thread(self._store, key, value, cost_seconds, expires_at, now)
+
+    def expires_in(self, key: str) -> float | None:
+        """Seconds until key expires, None if absent; not counted as a hit or miss."""
+        try:
+            with self._db_lock:
+                row = self._db().execute("SELECT expires_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            logger.exception("AI cache read failed")
+            return None
+        return None if row is None else row[0] - time.time()
+
+    def record_request(self, kind: str, key: str, params: dict) -> None:
+        """Count a request for key so popular ones can be precomputed (buffered until flush())."""
+        now = time.time()
+        with self._lock:
+            pending = self._requests.get(key)
+            if pending is None:
+                self._requests[key] = [kind, params, 1, now]
+            else:
+                pending[2] += 1
+                pending[3] = now
+
+    def flush(self) -> None:
+        """Write buffered request counts and last-used times in one transaction."""
+        with self._lock:
+            requests, self._requests = self._requests, {}
+            touched, self._touched = self._touched, {}
+        if not requests and not touched:
+            return
+        try:
+            with self._db_lock:
+                db = self._db()
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    db.executemany(
+                        "INSERT INTO ai_requests (key, kind, params, count, last_requested) VALUES (?, ?, ?, ?, ?)"
+                        " ON CONFLICT (key) DO UPDATE SET count = count + excluded.count,"
+                        " last_requested = excluded.last_requested",
+                        [(key, kind, json.dumps(params), count, last)
+                         for key, (kind, params, count, last) in requests.items()],
+                    )
+                    db.executemany(
+                        "UPDATE ai_cache SET last_used = max(last_used, ?) WHERE key = ?",
+                        [(last_used, key) for key, last_used in touched.items()],
+                    )
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            logger.exception("AI cache flush failed; dropped %d request counts", len(requests))
+
+    def top_requests(self, kind: str, limit: int) -> list[dict]:
+        """Params of the most requested keys of a kind, most popular first."""
+        self.flush()
+        with self._db_lock:
+            rows = self._db().execute(
+                "SELECT params FROM ai_requests WHERE kind = ? ORDER BY count DESC, last_requested DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (now,))
+        db.execute(
+            "DELETE FROM ai_cache WHERE key IN ("
+            " SELECT key FROM ai_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        db.execute(
+            "DELETE FROM ai_requests WHERE key IN ("
+            " SELECT key FROM ai_requests ORDER BY last_requested DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        with self._db_lock:
+            self._db().execute("DELETE FROM ai_cache")
+
+    def hit_ratio(self) -> float:
+        n_hits = hits.value(tier="memory") + hits.value(tier="sqlite")
+        total = n_hits + misses.value()
+        return n_hits / total if total else 0.0
+
+
+ai_cache = AICache(
+    path=settings.AI_CACHE_PATH,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    memory_entries=settings.AI_CACHE_MEMORY_ENTRIES,
+)
+
+gauge("ai_cache_hit_ratio", "AI route cache hit ratio since start", ai_cache.hit_ratio)
+
+
+_flusher: asyncio.Task | None = None
+
+
+async def _flush_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(ai_cache.flush)
+
+
+def start_ai_cache_flusher() -> None:
+    global _flusher
+    if settings.AI_CACHE_ENABLED and _flusher is None:
+        _flusher = asyncio.create_task(_flush_periodically(settings.AI_CACHE_FLUSH_SECONDS))
+
+
+async def stop_ai_cache_flusher() -> None:
+    """Cancel the flusher and write whatever it hadn't yet."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    await asyncio.to_thread(ai_cache.flush)
@@ -0,0 +1,101 @@
+"""
+Micro2Move Sydney - Eager-Loading Profiles
+
+Every relationship on the models is lazy.  Under the async engine, touching
+one that wasn't loaded raises MissingGreenlet.  Under a sync session it
+quietly issues one query per parent row: the N+1 pattern.  A screen that
+reads an object graph should therefore load it through one of these
+profiles, which name everything the screen needs up front:
+
+- selectinload for collections: one extra SELECT ... WHERE fk IN (...) per
+  collection, however many parents there are;
+- joinedload for many-to-one and one-to-one: folded into the parent query.
+
+Each profile ends in raiseload("*").  Reading a relationship of the loaded
+entity that the profile does not cover then raises InvalidRequestError at
+once, instead of emitting a hidden query.  To read more, extend the
+profile.
+
+LoaderProfile.queries is how many statements a profile costs, whatever the
+number of rows.  conftest's query_budget fixture and
+scripts.bench_loader_profiles hold each profile to it.
+
+Usage:
+    from services.eager_loading import loader_query
+
+    user = (await session.execute(
+        loader_query("profile_dashboard", User.user_id == user_id)
+    )).unique().scalar_one_or_none()
+"""
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from models import (
+    Booking, Community, CommunityMember, CommunityRide, EBike, FavoriteRoute, Incident, User,
+    UserAuthorization, UserBadge,
+)
+
+
+class LoaderProfile(NamedTuple):
+    entity: type
+    options: tuple
+    queries: int       # statements emitted when loading, independent of row counts
+
+
+LOADER_PROFILES = {
+    # GET /users/me-style dashboard: roles, supplier flag, badges, communities, saved routes
+    "profile_dashboard": LoaderProfile(User, (
+        joinedload(User.supplier),
+        selectinload(User.authorizations).joinedload(UserAuthorization.authorization),
+        selectinload(User.badges).joinedload(UserBadge.badge),
+        selectinload(User.community_memberships).joinedload(CommunityMember.community),
+        selectinload(User.favorite_routes).joinedload(FavoriteRoute.route),
+        selectinload(User.module_progress),
+        raiseload("*"),
+    ), queries=6),
+    # A rider's booking list: bike and status per row
+    "booking_list": LoaderProfile(Booking, (
+        joinedload(Booking.e_bike),
+        joinedload(Booking.status),
+        raiseload("*"),
+    ), queries=1),
+    # One booking with everything the detail and support screens show
+    "booking_detail": LoaderProfile(Booking, (
+        joinedload(Booking.status),
+        joinedload(Booking.e_bike).joinedload(EBike.category),
+        joinedload(Booking.pick_up_location),
+        joinedload(Booking.return_location),
+        joinedload(Booking.handover),
+        joinedload(Booking.bike_return),
+        joinedload(Booking.cancellation),
+        selectinload(Booking.incidents).joinedload(Incident.insurance_claim),
+        selectinload(Booking.accounts),
+        raiseload("*"),
+    ), queries=3),
+    # Bike listing cards: category, status, pick-up point and ratings
+    "bike_listing": LoaderProfile(EBike, (
+        joinedload(EBike.category),
+        joinedload(EBike.status),
+        joinedload(EBike.pick_up_location),
+        selectinload(EBike.ratings),
+        raiseload("*"),
+    ), queries=2),
+    # Community page: members with their user, rides with their RSVPs
+    "community_page": LoaderProfile(Community, (
+        selectinload(Community.members).joinedload(CommunityMember.user),
+        selectinload(Community.rides).selectinload(CommunityRide.rsvps),
+        raiseload("*"),
+    ), queries=4),
+}
+
+
+def loader_options(profile: str) -> tuple:
+    return LOADER_PROFILES[profile].options
+
+
+def loader_query(profile: str, *criteria):
+    """SELECT of the profile's entity with its loader options, filtered by criteria."""
+    entity, options, _ = LOADER_PROFILES[profile]
+    return select(entity).where(*criteria).options(*options)
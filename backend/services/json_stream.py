@@ -0,0 +1,129 @@
+"""
+Micro2Move Sydney - Incremental JSON Parser
+
+Parses a JSON object as it streams in from the model and reports values the
+moment they are complete, without waiting for the closing brace:
+
+- every top-level member, as path (key,);
+- every element of a top-level array, as path (key, index);
+- the whole object, as path ().
+
+Anything before the first '{' (such as a ```json fence) and anything after
+the matching '}' is ignored.
+"""
+import json
+from dataclasses import dataclass
+from typing import Any
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+@dataclass
+class _Frame:
+    kind: str                   # "object" | "array"
+    expect: str                 # "key" | "colon" | "value" | "comma"
+    key: str | None = None      # current member name (objects)
+    index: int = 0              # current element index (arrays)
+    opened: int = 0             # buffer offset of this container's bracket
+    start: int = 0              # buffer offset where the current child value began
+
+
+class JSONStreamParser:
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._in_scalar = False
+        self.started = False
+        self.done = False
+
+    def feed(self, text: str) -> list[tuple[tuple, Any]]:
+        """Consume the next chunk; return (path, value) for each value completed."""
+        self._buf += text
+        events: list[tuple[tuple, Any]] = []
+        buf = self._buf
+
+        while self._pos < len(buf) and not self.done:
+            ch = buf[self._pos]
+
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self._stack.append(_Frame("object", "key", opened=self._pos))
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame.kind == "object" and frame.expect == "key":
+                        frame.key = json.loads(buf[self._string_start:self._pos + 1])
+                        frame.expect = "colon"
+                    else:
+                        self._end_value(self._pos + 1, events)
+                self._pos += 1
+                continue
+
+            if self._in_scalar:
+                if ch not in _SCALAR_END:
+                    self._pos += 1
+                    continue
+                self._in_scalar = False
+                self._end_value(self._pos, events)
+                # fall through: the delimiter still needs handling
+
+            frame = self._stack[-1]
+            if ch in _WHITESPACE:
+                pass
+            elif ch == '"':
+                if frame.expect == "value":
+                    frame.start = self._pos
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch == ":":
+                frame.expect = "value"
+            elif ch == ",":
+                if frame.kind == "object":
+                    frame.expect = "key"
+                else:
+                    frame.index += 1
+                    frame.expect = "value"
+            elif ch in "{[":
+                frame.start = self._pos
+                kind = "object" if ch == "{" else "array"
+                self._stack.append(_Frame(kind, "key" if kind == "object" else "value", opened=self._pos))
+            elif ch in "}]":
+                closed = self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    events.append(((), json.loads(buf[closed.opened:self._pos + 1])))
+                else:
+                    self._end_value(self._pos + 1, events)
+            elif frame.expect == "value":
+                frame.start = self._pos
+                self._in_scalar = True
+            self._pos += 1
+
+        return events
+
+    def _end_value(self, end: int, events: list) -> None:
+        """A value inside the current frame finished at buffer offset end."""
+        frame = self._stack[-1]
+        frame.expect = "comma"
+        depth = len(self._stack)
+        if depth == 1:
+            path = (frame.key,)
+        elif depth == 2 and frame.kind == "array" and self._stack[0].kind == "object":
+            path = (self._stack[0].key, frame.index)
+        else:
+            return
+        events.append((path, json.loads(self._buf[frame.start:end])))
@@ -0,0 +1,198 @@
+"""
+Micro2Move Sydney - HMM Map Matching
+
+Snaps raw GPS tracks (RouteHistory.actual_polyline) onto network segments
+with a Hidden-Markov model decoded by Viterbi, after Newson & Krumm (2009):
+
+- hidden states are candidate positions on nearby segments, found through an
+  STR-tree over every segment edge;
+- emissions are Gaussian in the GPS-to-edge distance;
+- transitions are exponential in |GPS step - network step|, so paths that
+  hop between parallel streets are penalised.
+
+The network step between two candidates is the straight-line distance
+between their snapped positions, not a route through
+services.routing.RoutingGraph.  Kept fixes are at most a few seconds and
+tens of metres apart, so between two plausible candidates the route is
+nearly straight.  Where it isn't (a hop to a parallel street with no junction
+nearby), SWITCH_PENALTY discourages the hop.  Routed steps would need a
+bounded Dijkstra for each of up to MAX_CANDIDATES² candidate pairs per fix,
+in pure Python, and the job would have to build the graph as well as the
+segment store.  That would multiply the job's run time for little change in
+the matches.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from services.geo import to_local_metres
+from services.segment_store import SegmentStore, STRTree
+
+SIGMA_M = 8.0                 # GPS position noise (std-dev)
+BETA_M = 25.0                 # transition tolerance for GPS vs network step
+SEARCH_RADIUS_M = 40.0        # candidate search radius around each fix
+MAX_CANDIDATES = 6            # best edge per segment, nearest N segments
+MIN_STEP_M = 8.0              # drop fixes closer than this to the last kept one
+SWITCH_PENALTY = 0.5          # log-prob cost of changing segment
+MIN_COVERED_FRACTION = 0.5    # share of a segment a run must cover to count
+MIN_COVERED_M = 50.0          # ...or this many metres, for long segments
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentTraversal:
+    """One contiguous run of a track along a single segment."""
+
+    segment_id: str
+    distance_m: float
+    seconds: float
+
+
+@dataclass(slots=True)
+class _Candidates:
+    segment: np.ndarray   # segment index per candidate
+    offset: np.ndarray    # metres along the segment
+    x: np.ndarray         # snapped position
+    y: np.ndarray
+    log_emission: np.ndarray
+
+
+class MapMatcher:
+    """Map matcher bound to one segment store version."""
+
+    def __init__(self, store: SegmentStore):
+        self.store = store
+
+        ax, ay, bx, by, seg, start = [], [], [], [], [], []
+        self.segment_length = np.zeros(len(store), dtype=np.float64)
+        for i, record in enumerate(store.records):
+            points = record.get("coordinates") or []
+            if len(points) < 2:
+                continue
+            x, y = to_local_metres([p["lat"] for p in points], [p["lng"] for p in points])
+            lengths = np.hypot(np.diff(x), np.diff(y))
+            ax.append(x[:-1]), ay.append(y[:-1]), bx.append(x[1:]), by.append(y[1:])
+            seg.append(np.full(len(lengths), i, dtype=np.intp))
+            start.append(np.concatenate([[0.0], np.cumsum(lengths)[:-1]]))
+            self.segment_length[i] = lengths.sum()
+
+        def stack(parts, dtype=np.float64):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        self.ax, self.ay, self.bx, self.by = stack(ax), stack(ay), stack(bx), stack(by)
+        self.edge_segment = stack(seg, np.intp)
+        self.edge_start = stack(start)
+        self.dx, self.dy = self.bx - self.ax, self.by - self.ay
+        self.len2 = np.maximum(self.dx ** 2 + self.dy ** 2, 1e-9)
+
+        self.tree = STRTree(np.column_stack([
+            np.minimum(self.ax, self.bx), np.minimum(self.ay, self.by),
+            np.maximum(self.ax, self.bx), np.maximum(self.ay, self.by),
+        ]))
+
+    def candidates(self, x: float, y: float) -> _Candidates | None:
+        r = SEARCH_RADIUS_M
+        edges = self.tree.query(x - r, y - r, x + r, y + r)
+        if not len(edges):
+            return None
+
+        t = ((x - self.ax[edges]) * self.dx[edges] + (y - self.ay[edges]) * self.dy[edges]) / self.len2[edges]
+        t = np.clip(t, 0.0, 1.0)
+        cx = self.ax[edges] + t * self.dx[edges]
+        cy = self.ay[edges] + t * self.dy[edges]
+        dist = np.hypot(cx - x, cy - y)
+
+        near = dist <= r
+        if not near.any():
+            return None
+        edges, t, cx, cy, dist = edges[near], t[near], cx[near], cy[near], dist[near]
+
+        # Closest edge per segment, then the nearest MAX_CANDIDATES segments
+        by_dist = np.argsort(dist, kind="stable")
+        _, first = np.unique(self.edge_segment[edges[by_dist]], return_index=True)
+        keep = by_dist[np.sort(first)][:MAX_CANDIDATES]
+
+        e = edges[keep]
+        return _Candidates(
+            segment=self.edge_segment[e],
+            offset=self.edge_start[e] + t[keep] * np.sqrt(self.len2[e]),
+            x=cx[keep],
+            y=cy[keep],
+            log_emission=-0.5 * (dist[keep] / SIGMA_M) ** 2,
+        )
+
+    def match(self, lat, lng, times) -> list[SegmentTraversal]:
+        """
+        Match one track.  lat/lng/times are equal-length sequences; times are
+        seconds.  Fixes with no candidate break the track into independent
+        chains, each decoded separately.
+        """
+        x, y = to_local_metres(lat, lng)
+        times = np.asarray(times, dtype=np.float64)
+
+        traversals: list[SegmentTraversal] = []
+        chain: list[tuple[int, _Candidates]] = []
+        last_kept = None
+        for i in range(len(x)):
+            if last_kept is not None and np.hypot(x[i] - x[last_kept], y[i] - y[last_kept]) < MIN_STEP_M:
+                continue
+            cands = self.candidates(x[i], y[i])
+            if cands is None:
+                traversals.extend(self._decode(chain, x, y, times))
+                chain, last_kept = [], None
+                continue
+            chain.append((i, cands))
+            last_kept = i
+        traversals.extend(self._decode(chain, x, y, times))
+        return traversals
+
+    def _decode(self, chain, x, y, times) -> list[SegmentTraversal]:
+        """Viterbi over one unbroken chain of fixes, then collapse into runs."""
+        if len(chain) < 2:
+            return []
+
+        score = chain[0][1].log_emission
+        back = []
+        for (i_prev, prev), (i, cur) in zip(chain, chain[1:]):
+            gps_step = np.hypot(x[i] - x[i_prev], y[i] - y[i_prev])
+            same = prev.segment[:, None] == cur.segment[None, :]
+            net_step = np.where(
+                same,
+                np.abs(cur.offset[None, :] - prev.offset[:, None]),
+                np.hypot(cur.x[None, :] - prev.x[:, None], cur.y[None, :] - prev.y[:, None]),
+            )
+            log_trans = -np.abs(gps_step - net_step) / BETA_M - SWITCH_PENALTY * ~same
+            total = score[:, None] + log_trans
+            best = np.argmax(total, axis=0)
+            back.append(best)
+            score = total[best, np.arange(len(best))] + cur.log_emission
+
+        state = int(np.argmax(score))
+        path = [state]
+        for best in reversed(back):
+            state = int(best[state])
+            path.append(state)
+        path.reverse()
+
+        return self._runs([
+            (int(c.segment[s]), float(c.offset[s]), float(times[i]))
+            for (i, c), s in zip(chain, path)
+        ])
+
+    def _runs(self, states: list[tuple[int, float, float]]) -> list[SegmentTraversal]:
+        runs = []
+        start = 0
+        for k in range(1, len(states) + 1):
+            if k < len(states) and states[k][0] == states[start][0]:
+                continue
+            seg, first_offset, first_time = states[start]
+            _, last_offset, last_time = states[k - 1]
+            covered = abs(last_offset - first_offset)
+            needed = min(MIN_COVERED_M, MIN_COVERED_FRACTION * self.segment_length[seg])
+            if covered >= needed and covered > 0:
+                runs.append(SegmentTraversal(
+                    segment_id=str(self.store.ids[seg]),
+                    distance_m=covered,
+                    seconds=max(last_time - first_time, 0.0),
+                ))
+            start = k
+        return runs
@@ -0,0 +1,28 @@
+"""
+Micro2Move Sydney - Static Network Datasets
+
+Veloways, planned projects and POIs exported by the ETL
+(app/scripts/export-datasets.js) into NETWORK_DATA_DIR.  Each dataset is
+versioned by a digest of its file; services.network_loader keeps the loaded
+set current.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, NamedTuple
+
+DATASET_FILES = {
+    "veloways": "veloways.json",
+    "planned": "planned.json",
+    "pois": "pois.json",
+}
+
+
+class Dataset(NamedTuple):
+    version: str
+    data: Any
+
+
+def load_dataset(path: Path) -> Dataset:
+    raw = path.read_bytes()
+    return Dataset(version=hashlib.sha1(raw).hexdigest()[:12], data=json.loads(raw))
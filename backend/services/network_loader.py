@@ -0,0 +1,214 @@
+"""
+Micro2Move Sydney - Versioned Network Data Loader
+
+Everything built from NETWORK_DATA_DIR (segment store + spatial index,
+routing graph, veloway / planned / POI datasets) lives in one immutable
+NetworkSnapshot.
+Reloads build a complete new snapshot off the event loop and then swap the
+module-level reference in a single assignment:
+
+- requests grab the snapshot once and finish on whatever version they saw;
+- new requests see the new version as soon as the swap happens;
+- an old snapshot is freed when its last request drops it, which is logged.
+
+A reload is triggered by the file watcher (NETWORK_RELOAD_POLL_SECONDS) or
+by POST /api/v1/admin/network/reload.
+
+With NETWORK_SHARED_MEMORY the segment store and the routing graph's arrays
+are memory-mapped from SHARED_DIR, so every worker on the host shares one
+copy of them.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import resource
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from config import settings
+from services.ai_cache import publish_network
+from services.network_data import DATASET_FILES, Dataset, load_dataset
+from services.response_cache import response_cache
+from services.routing import RoutingGraph, load_routing_graph, places_from_datasets
+from services.segment_store import SEGMENTS_FILE, USAGE_FILE, SegmentStore, load_segment_store
+
+logger = logging.getLogger(__name__)
+
+WATCHED_FILES = (SEGMENTS_FILE, USAGE_FILE, *DATASET_FILES.values())
+SHARED_DIR = ".mmap"
+
+
+@dataclass(frozen=True)
+class NetworkSnapshot:
+    """One consistent version of all in-memory network data."""
+
+    version: str
+    segments: SegmentStore | None = None
+    routing: RoutingGraph | None = None
+    datasets: dict[str, Dataset] = field(default_factory=dict)
+
+
+def _fingerprint(data_dir: Path) -> tuple:
+    """Cheap change detector: (name, mtime, size) of every watched file."""
+    entries = []
+    for name in WATCHED_FILES:
+        try:
+            stat = (data_dir / name).stat()
+        except FileNotFoundError:
+            continue
+        entries.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_snapshot(data_dir: Path) -> NetworkSnapshot:
+    """Load every artefact present in data_dir into a new snapshot."""
+    segments = None
+    shared_dir = data_dir / SHARED_DIR if settings.NETWORK_SHARED_MEMORY else None
+    if (data_dir / SEGMENTS_FILE).exists():
+        segments = load_segment_store(data_dir / SEGMENTS_FILE, shared_dir=shared_dir)
+    else:
+        logger.warning("No segment data at %s — /api/v1/segments disabled", data_dir / SEGMENTS_FILE)
+
+    datasets = {}
+    for name, filename in DATASET_FILES.items():
+        if (data_dir / filename).exists():
+            datasets[name] = load_dataset(data_dir / filename)
+
+    versions = [f"segments={segments.version}" if segments else "segments=-"]
+    versions += [f"{name}={d.version}" for name, d in sorted(datasets.items())]
+    version = hashlib.sha1("|".join(versions).encode()).hexdigest()[:12]
+
+    routing = load_routing_graph(segments, places_from_datasets(datasets), shared_dir) if segments else None
+    return NetworkSnapshot(version=version, segments=segments, routing=routing, datasets=datasets)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide current snapshot
+# ---------------------------------------------------------------------------
+
+_snapshot = NetworkSnapshot(version="empty")
+_loaded_fingerprint: tuple = ()
+_reload_lock = asyncio.Lock()
+_watcher: asyncio.Task | None = None
+
+
+def get_network() -> NetworkSnapshot:
+    """The current snapshot.  Hold on to it for the whole request."""
+    return _snapshot
+
+
+def get_segment_store() -> SegmentStore | None:
+    return _snapshot.segments
+
+
+def get_dataset(name: str) -> Dataset | None:
+    return _snapshot.datasets.get(name)
+
+
+def get_routing_graph() -> RoutingGraph | None:
+    return _snapshot.routing
+
+
+def _released(version: str) -> None:
+    logger.info("Network version %s released (RSS now %.1f MiB)", version, _rss_bytes() / 2**20)
+
+
+def _install(snapshot: NetworkSnapshot) -> None:
+    """Swap in a snapshot, then move the response and AI caches onto its versions."""
+    global _snapshot
+    _snapshot = snapshot
+    weakref.finalize(snapshot, _released, snapshot.version)
+
+    if snapshot.segments is not None:
+        response_cache.publish("segments", snapshot.segments.version)
+    for name, dataset in snapshot.datasets.items():
+        response_cache.publish(name, dataset.version)
+    publish_network(snapshot.version)
+
+
+def load_network() -> NetworkSnapshot:
+    """Blocking initial load, for startup."""
+    global _loaded_fingerprint
+    data_dir = Path(settings.NETWORK_DATA_DIR)
+    _loaded_fingerprint = _fingerprint(data_dir)
+    snapshot = build_snapshot(data_dir)
+    _install(snapshot)
+    logger.info(
+        "Network version %s loaded (%d segments, datasets: %s)",
+        snapshot.version,
+        len(snapshot.segments) if snapshot.segments else 0,
+        ", ".join(sorted(snapshot.datasets)) or "none",
+    )
+    return snapshot
+
+
+async def reload_network(force: bool = False) -> tuple[NetworkSnapshot, bool]:
+    """
+    Rebuild the snapshot in a worker thread and swap it in.
+
+    Skips the rebuild when the watched files are unchanged, unless force.
+    Returns (current snapshot, whether a new version was installed).
+    """
+    global _loaded_fingerprint
+    data_dir = Path(settings.NETWORK_DATA_DIR)
+    async with _reload_lock:
+        fingerprint = _fingerprint(data_dir)
+        if not force and fingerprint == _loaded_fingerprint:
+            return _snapshot, False
+
+        old = _snapshot
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        snapshot = await asyncio.to_thread(build_snapshot, data_dir)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _loaded_fingerprint = fingerprint
+
+        if snapshot.version == old.version:
+            # Files were touched but their content is identical
+            return old, False
+
+        _install(snapshot)
+        logger.info(
+            "Network reloaded %s → %s in %.0f ms (RSS %+.1f MiB while both versions live)",
+            old.version, snapshot.version, elapsed_ms,
+            (_rss_bytes() - rss_before) / 2**20,
+        )
+        return snapshot, True
+
+
+async def _watch(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reload_network()
+        except Exception:
+            logger.exception("Network reload failed; keeping version %s", _snapshot.version)
+
+
+def start_network_watcher() -> None:
+    global _watcher
+    if settings.NETWORK_RELOAD_POLL_SECONDS > 0 and _watcher is None:
+        _watcher = asyncio.create_task(_watch(settings.NETWORK_RELOAD_POLL_SECONDS))
+
+
+async def stop_network_watcher() -> None:
+    global _watcher
+    if _watcher is not None:
+        _watcher.cancel()
+        try:
+            await _watcher
+        except asyncio.CancelledError:
+            pass
+        _watcher = None
@@ -0,0 +1,98 @@
+"""
+Micro2Move Sydney - Encoded Polyline Codec
+
+Google encoded-polyline format, as stored in Route.polyline and
+RouteHistory.actual_polyline (precision 5).  Encoding and decoding run on
+NumPy arrays; decode_many() decodes a whole batch of tracks in one pass and
+returns them as a flat (N, 2) array plus per-track offsets.
+"""
+import numpy as np
+
+_MAX_CHUNKS = 7   # 5-bit chunks in a zig-zagged int32 delta
+
+
+def decode_many(encoded: list[str], precision: int = 5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a batch of polylines.
+
+    Returns (coords, offsets): coords is a float64 (N, 2) array of
+    [lat, lng] for every track back to back, and track i is
+    coords[offsets[i]:offsets[i + 1]].  Raises ValueError on malformed input.
+    """
+    lengths = np.fromiter((len(s) for s in encoded), dtype=np.intp, count=len(encoded))
+    try:
+        blob = "".join(encoded).encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("polyline contains non-ASCII characters")
+
+    if not blob:
+        return np.empty((0, 2), dtype=np.float64), np.zeros(len(encoded) + 1, dtype=np.intp)
+
+    chars = np.frombuffer(blob, dtype=np.uint8).astype(np.int64) - 63
+    if chars.min() < 0 or chars.max() > 0x3F:
+        raise ValueError("polyline contains characters outside the encoding range")
+
+    # Every varint ends on a chunk without the 0x20 continuation bit
+    is_last = chars < 0x20
+    char_ends = np.cumsum(lengths)
+    if not is_last[char_ends[lengths > 0] - 1].all():
+        raise ValueError("polyline ends mid-value")
+
+    value_id = np.cumsum(is_last) - is_last
+    value_start = np.flatnonzero(np.concatenate([[True], is_last[:-1]]))
+    shift = 5 * (np.arange(len(chars)) - value_start[value_id])
+    values = np.bincount(
+        value_id, weights=(chars & 0x1F) << shift, minlength=len(value_start)
+    ).astype(np.int64)
+    deltas = (values >> 1) ^ -(values & 1)
+
+    values_seen = np.concatenate([[0], np.cumsum(is_last)])
+    values_per_track = np.diff(values_seen[np.concatenate([[0], char_ends])])
+    if (values_per_track % 2).any():
+        raise ValueError("polyline has an odd number of values")
+
+    points_per_track = values_per_track // 2
+    offsets = np.concatenate([[0], np.cumsum(points_per_track)]).astype(np.intp)
+
+    # Running sum of deltas, restarted at the first point of every track
+    coords = np.cumsum(deltas.reshape(-1, 2), axis=0)
+    starts = offsets[:-1][points_per_track > 0]
+    if len(starts):
+        base = np.vstack([np.zeros((1, 2), dtype=np.int64), coords[starts[1:] - 1]])
+        coords -= np.repeat(base, points_per_track[points_per_track > 0], axis=0)
+
+    return coords / float(10 ** precision), offsets
+
+
+def decode_array(encoded: str, precision: int = 5) -> np.ndarray:
+    """Decode one polyline into a float64 (n, 2) array of [lat, lng]."""
+    coords, _ = decode_many([encoded], precision)
+    return coords
+
+
+def decode(encoded: str, precision: int = 5) -> list[tuple[float, float]]:
+    """Decode an encoded polyline into [(lat, lng), ...]."""
+    return [tuple(p) for p in decode_array(encoded, precision).tolist()]
+
+
+def encode_array(coords: np.ndarray, precision: int = 5) -> str:
+    """Encode a (n, 2) array of [lat, lng] as a polyline string."""
+    ints = np.round(np.asarray(coords, dtype=np.float64).reshape(-1, 2) * 10 ** precision).astype(np.int64)
+    if not len(ints):
+        return ""
+
+    deltas = np.diff(ints, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    n_chunks = 1 + (zigzag[:, None] >= (1 << (5 * np.arange(1, _MAX_CHUNKS)))).sum(axis=1)
+    k = np.arange(_MAX_CHUNKS)
+    chunks = (zigzag[:, None] >> (5 * k)) & 0x1F
+    chunks |= np.where(k < n_chunks[:, None] - 1, 0x20, 0)
+    chunks += 63
+
+    return chunks[k < n_chunks[:, None]].astype(np.uint8).tobytes().decode("ascii")
+
+
+def encode(points: list[tuple[float, float]], precision: int = 5) -> str:
+    """Encode [(lat, lng), ...] as a polyline string."""
+    return encode_array(np.asarray(points, dtype=np.float64), precision)
@@ -0,0 +1,186 @@
+"""
+Micro2Move Sydney - User Profile Cache
+
+GET /api/v1/users/me is called on every app launch and screen refresh, so
+profile rows (name, credits, verified_id) are cached for
+PROFILE_CACHE_TTL_SECONDS after being read from Supabase.
+
+Writes go through the cache: the profile update endpoint stores the row it
+got back, and any path that changes credits outside it must call
+profile_cache.invalidate().  Every entry carries the time it was written,
+and a read-through fill stamped with the time its query started never
+replaces a newer write, so a slow read racing a user's own update cannot
+put the old credits back.
+
+The cache is per worker by default.  With more than one worker, set
+PROFILE_CACHE_PATH to a SQLite file all workers share, so a write on one
+worker is seen by the next read on any other.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from config import settings
+from services.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+hits = counter("profile_cache_hits_total", "Profile reads answered from the cache")
+misses = counter("profile_cache_misses_total", "Profile reads that went to Supabase")
+not_modified = counter("profile_not_modified_total", "Profile reads answered with 304 Not Modified")
+
+# (expires_at, written_at, row); row is None for an invalidated profile
+Entry = tuple[float, float, dict | None]
+
+
+def profile_etag(row: dict) -> str:
+    """Strong ETag stem for a profile row's content."""
+    digest = hashlib.blake2b(json.dumps(row, sort_keys=True).encode("utf-8"), digest_size=8)
+    return f"profile.{digest.hexdigest()}"
+
+
+class _MemoryStore:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Entry | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            return entry
+
+    def set(self, user_id: str, entry: Entry) -> None:
+        """Store entry unless a newer write is already there."""
+        with self._lock:
+            current = self._entries.get(user_id)
+            if current is not None and current[1] > entry[1]:
+                return
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _SQLiteStore:
+    """Same interface, in a WAL-mode SQLite file shared by every worker."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profile_cache ("
+                " user_id TEXT PRIMARY KEY,"
+                " value TEXT,"
+                " expires_at REAL NOT NULL,"
+                " written_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, user_id: str) -> Entry | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT expires_at, written_at, value FROM profile_cache WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]) if row[2] is not None else None
+
+    def set(self, user_id: str, entry: Entry) -> None:
+        expires_at, written_at, value = entry
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO profile_cache (user_id, value, expires_at, written_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (user_id) DO UPDATE SET"
+                " value = excluded.value, expires_at = excluded.expires_at, written_at = excluded.written_at"
+                " WHERE profile_cache.written_at <= excluded.written_at",
+                (user_id, json.dumps(value) if value is not None else None, expires_at, written_at),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM profile_cache WHERE expires_at <= ?", (time.time(),))
+        db.execute(
+            "DELETE FROM profile_cache WHERE user_id IN ("
+            " SELECT user_id FROM profile_cache ORDER BY written_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM profile_cache")
+
+
+class ProfileCache:
+    """Short-TTL read-through cache of profile rows, keyed by user_id."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, path: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._store = _SQLiteStore(path, max_entries) if path else _MemoryStore(max_entries)
+
+    def get(self, user_id: str) -> dict | None:
+        try:
+            entry = self._store.get(user_id)
+        except sqlite3.Error:
+            logger.exception("Profile cache read failed")
+            entry = None
+        if entry is None or entry[2] is None or entry[0] <= time.time():
+            misses.inc()
+            return None
+        hits.inc()
+        return entry[2]
+
+    def fill(self, user_id: str, row: dict, read_started: float) -> None:
+        """Cache a row read from Supabase by a query that began at read_started."""
+        self._set(user_id, (read_started + self.ttl_seconds, read_started, row))
+
+    def put(self, user_id: str, row: dict) -> None:
+        """Write-through: the row as it stands after the caller's own write."""
+        now = time.time()
+        self._set(user_id, (now + self.ttl_seconds, now, row))
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a profile changed elsewhere (credits, bookings, admin edits)."""
+        now = time.time()
+        self._set(user_id, (now + self.ttl_seconds, now, None))
+
+    def _set(self, user_id: str, entry: Entry) -> None:
+        try:
+            self._store.set(user_id, entry)
+        except sqlite3.Error:
+            logger.exception("Profile cache write failed")
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+profile_cache = ProfileCache(
+    ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS,
+    max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+    path=settings.PROFILE_CACHE_PATH,
+)
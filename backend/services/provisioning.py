@@ -0,0 +1,114 @@
+"""
+Micro2Move Sydney - Profile Provisioning
+
+register() returns as soon as Supabase Auth has created the account.  The
+users row (with WELCOME_CREDITS) is written afterwards by a background task
+that retries with exponential backoff.  Provisioning is idempotent: the
+provision_profiles() RPC (migration 005) inserts the row unless it exists
+and, only when it created it, records the welcome credits in the
+credit_transactions ledger in the same transaction, so credits are granted
+and recorded once however many times it runs.  Anything that finds a profile
+missing can therefore just run it again:
+
+- GET /users/me waits for this worker's task, or provisions inline, when the
+  row isn't there yet, so a client reading its profile straight after
+  registering never gets a 404.  Inline provisioning is limited to accounts
+  created in the last PROVISION_INLINE_MAX_AGE_SECONDS, so a deleted profile
+  is not recreated, with fresh credits, for any valid token;
+- jobs.reconcile_profiles sweeps Auth users that still have no row.
+"""
+import asyncio
+import logging
+
+from config import settings
+from services.metrics import counter
+from services.supabase_clients import service_client
+
+logger = logging.getLogger(__name__)
+
+outcomes = counter("profile_provisioning_total", "Profile provisioning attempts by outcome", ["outcome"])
+
+_pending: dict[str, asyncio.Task] = {}
+
+
+def profile_row(user_id: str, email: str, full_name: str | None) -> dict:
+    """The users row created for a new account."""
+    row = {
+        "user_id": user_id,
+        "full_name": full_name or email.split("@")[0],
+        "email": email,
+        "hashed_password": "supabase_auth",   # managed by Supabase Auth
+        "tnc_accepted": True,
+    }
+    if settings.WELCOME_CREDITS:
+        row["credits"] = settings.WELCOME_CREDITS
+    return row
+
+
+async def provision(
+    user_id: str, email: str, full_name: str | None, max_age_seconds: float | None = None,
+) -> bool:
+    """
+    Create the profile row unless it already exists; safe to repeat.  With
+    max_age_seconds, only if the Auth account is at most that old.  True if
+    this call created it.
+    """
+    result = await service_client().rpc("provision_profiles", {
+        "p_rows": [profile_row(user_id, email, full_name)],
+        "p_max_age_seconds": max_age_seconds,
+    }).execute()
+    return bool(result.data)
+
+
+async def _provision_with_retry(user_id: str, email: str, full_name: str | None) -> bool:
+    attempts = settings.PROVISION_RETRY_ATTEMPTS
+    for attempt in range(attempts):
+        try:
+            await provision(user_id, email, full_name)
+        except Exception:
+            if attempt == attempts - 1:
+                outcomes.inc(outcome="failed")
+                logger.exception(
+                    "Provisioning profile %s failed %d times; left for jobs.reconcile_profiles", user_id, attempts
+                )
+                return False
+            outcomes.inc(outcome="retry")
+            await asyncio.sleep(settings.PROVISION_RETRY_BASE_SECONDS * 2 ** attempt)
+        else:
+            outcomes.inc(outcome="ok")
+            return True
+    return False
+
+
+def schedule(user_id: str, email: str, full_name: str | None) -> None:
+    """Provision in the background; the caller does not wait."""
+    task = asyncio.create_task(_provision_with_retry(user_id, email, full_name))
+    _pending[user_id] = task
+    task.add_done_callback(lambda t: _pending.pop(user_id, None) if _pending.get(user_id) is t else None)
+
+
+async def ensure_profile(user_id: str, email: str | None, full_name: str | None) -> bool:
+    """
+    Make sure a missing profile gets created: wait for this worker's pending
+    task, or provision inline if the account was created recently.  False if
+    that could not be done; True does not mean a row was created (it may have
+    existed already, or the account is too old), so read it again.
+    """
+    task = _pending.get(user_id)
+    if task is not None:
+        return await asyncio.shield(task)
+    if not email:
+        return False
+    try:
+        created = await provision(user_id, email, full_name, settings.PROVISION_INLINE_MAX_AGE_SECONDS)
+    except Exception:
+        logger.exception("Inline provisioning of profile %s failed", user_id)
+        return False
+    outcomes.inc(outcome="ok" if created else "skipped")
+    return True
+
+
+async def drain_provisioning(timeout: float = 10.0) -> None:
+    """On shutdown, give pending tasks a moment to finish."""
+    if _pending:
+        await asyncio.wait(list(_pending.values()), timeout=timeout)
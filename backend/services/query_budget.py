@@ -0,0 +1,62 @@
+"""
+Micro2Move Sydney - Query Counting
+
+Counts the SQL statements an engine executes, so tests can hold an
+endpoint or a loader profile to a query budget and catch N+1 regressions
+(one query per row) before they reach production.
+
+QueryCounter counts every statement on the engine while it is active, from
+any thread: TestClient runs the app on its own thread.  Don't run other
+database work alongside a counted block.
+
+Usage:
+    with query_budget(2):                # QueryBudgetExceeded if more run
+        client.get("/api/v1/users/me")
+
+    with QueryCounter() as counter:
+        ...
+    print(counter.count, counter.statements)
+"""
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """More statements ran than the budget allows."""
+
+
+class QueryCounter:
+    def __init__(self, engine=None):
+        if engine is None:
+            from database import engine
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        with self._lock:
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@contextmanager
+def query_budget(limit: int, engine=None):
+    """Fail if the block executes more than limit statements; yields the counter."""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i}. {' '.join(s.split())[:200]}" for i, s in enumerate(counter.statements, 1))
+        raise QueryBudgetExceeded(f"{counter.count} queries, budget {limit}:\n{listing}")
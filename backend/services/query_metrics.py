@@ -0,0 +1,234 @@
+"""
+Micro2Move Sydney - Database and Supabase Latency Metrics
+
+Splits a slow request into its three usual suspects, all exported at
+GET /metrics:
+
+- pool waits: db_pool_checkout_seconds is how long a checkout from
+  database.engine's pool took (including opening a connection when the pool
+  grows); db_pool_checked_out, db_pool_waiting and db_pool_saturation show
+  how close the pool is to DB_POOL_SIZE + DB_MAX_OVERFLOW;
+- slow SQL: db_query_seconds per statement fingerprint (the statement with
+  literals and bind parameters blanked out, hashed), labelled with its
+  operation and first table;
+- Supabase REST: supabase_request_seconds per service (rest, auth), table
+  and operation, for every call the shared clients make.
+
+Statements and Supabase calls slower than DB_SLOW_QUERY_SECONDS are logged
+at WARNING with their fingerprint or table, never their parameters.  Each
+new fingerprint is logged once at INFO with its normalised SQL, so a
+fingerprint on a dashboard can be traced back to a statement.
+
+Usage:
+    engine = create_async_engine(url, poolclass=TimedQueuePool)
+    instrument_engine(engine)
+
+    class _Client(TimedHTTPClient, httpx.AsyncClient): ...
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import settings
+from services.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+MAX_FINGERPRINTS = 200        # distinct statements labelled per worker; later ones share "other"
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+checkout_seconds = histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, including any wait", [],
+    CHECKOUT_BUCKETS,
+)
+checkout_timeouts = counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS")
+query_seconds = histogram(
+    "db_query_seconds", "SQL statement duration by fingerprint", ["operation", "table", "fingerprint"], QUERY_BUCKETS,
+)
+query_errors = counter("db_query_errors_total", "SQL statements that raised", ["operation", "error"])
+slow_queries = counter("db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_SECONDS", ["fingerprint"])
+supabase_seconds = histogram(
+    "supabase_request_seconds", "Supabase REST and Auth call latency, body included",
+    ["service", "table", "operation", "status"], QUERY_BUCKETS,
+)
+
+_engine = None                # the engine whose pool the gauges report
+_waiting = 0
+_waiting_lock = threading.Lock()
+
+
+def _pool_stat(read) -> float:
+    pool = _engine.pool if _engine is not None else None
+    return float(read(pool)) if isinstance(pool, QueuePool) else 0.0
+
+
+def _saturation(pool: QueuePool) -> float:
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return pool.checkedout() / capacity if capacity else 0.0
+
+
+gauge("db_pool_checked_out", "Connections currently checked out", lambda: _pool_stat(QueuePool.checkedout))
+gauge("db_pool_idle", "Idle connections held by the pool", lambda: _pool_stat(QueuePool.checkedin))
+gauge("db_pool_waiting", "Checkouts waiting for a free connection", lambda: float(_waiting))
+gauge("db_pool_saturation", "Checked-out connections / (DB_POOL_SIZE + DB_MAX_OVERFLOW)", lambda: _pool_stat(_saturation))
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout into db_pool_checkout_seconds."""
+
+    def _do_get(self):
+        global _waiting
+        with _waiting_lock:
+            _waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            checkout_timeouts.inc()
+            raise
+        finally:
+            checkout_seconds.observe(time.perf_counter() - started)
+            with _waiting_lock:
+                _waiting -= 1
+
+
+# SQLAlchemy keeps its own pool loggers at WARNING; this subclass logs under services.*
+logging.getLogger(f"{__name__}.{TimedQueuePool.__name__}").setLevel(logging.WARNING)
+
+
+# ---------------------------------------------------------------------------
+# Statement fingerprints
+# ---------------------------------------------------------------------------
+
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"                      # string literals
+    r"|\$\d+(?:::[\w\[\]]+)?"              # asyncpg $1 / $1::UUID
+    r"|%\(\w+\)s|%s"                       # psycopg / pyformat
+    r"|(?<![:\w]):\w+"                     # named binds, not ::casts
+    r"|\?"                                 # qmark (SQLite)
+    r"|\b\d+(?:\.\d+)?\b"                  # numbers
+)
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")   # IN lists of any length
+_OPERATION = re.compile(r"^\s*(\w+)")
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([\w.\"]+)", re.IGNORECASE)
+
+_seen: set[str] = set()
+_seen_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple[str, str, str, str]:
+    """(operation, table, fingerprint, normalised SQL) for a statement."""
+    normalised = _LISTS.sub("(?)", _LITERALS.sub("?", " ".join(statement.split())))
+    operation = _OPERATION.match(normalised)
+    table = _TABLE.search(normalised)
+    digest = hashlib.sha1(normalised.encode()).hexdigest()[:12]
+    return (
+        operation.group(1).lower() if operation else "other",
+        table.group(1).replace('"', "").split(".")[-1] if table else "",
+        digest,
+        normalised,
+    )
+
+
+def _label(digest: str, normalised: str) -> str:
+    """The fingerprint label, or "other" once MAX_FINGERPRINTS are in use."""
+    if digest in _seen:
+        return digest
+    with _seen_lock:
+        if digest not in _seen:
+            if len(_seen) >= MAX_FINGERPRINTS:
+                return "other"
+            _seen.add(digest)
+            logger.info("SQL fingerprint %s: %s", digest, normalised[:500])
+    return digest
+
+
+def _is_slow(seconds: float) -> bool:
+    return 0 < settings.DB_SLOW_QUERY_SECONDS <= seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation, table, digest, normalised = fingerprint(statement)
+    label = _label(digest, normalised)
+    query_seconds.observe(elapsed, operation=operation, table=table, fingerprint=label)
+    if _is_slow(elapsed):
+        slow_queries.inc(fingerprint=label)
+        logger.warning("slow query %.0f ms [%s] %s", elapsed * 1000, digest, normalised[:500])
+
+
+def _handle_error(context) -> None:
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+    operation = fingerprint(context.statement)[0] if context.statement else "other"
+    query_errors.inc(operation=operation, error=type(context.original_exception).__name__)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on engine and report its pool in the db_pool_* gauges."""
+    global _engine
+    _engine = engine
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+# ---------------------------------------------------------------------------
+# Supabase HTTP calls
+# ---------------------------------------------------------------------------
+
+_REST_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F-]{32,36}$")
+
+
+def describe(request: httpx.Request) -> tuple[str, str, str]:
+    """(service, table, operation) of a Supabase REST or Auth request."""
+    parts = [p for p in request.url.path.split("/") if p]
+    if "rest" in parts:
+        rest = parts[parts.index("rest") + 2:]           # after /rest/v1/
+        if rest[:1] == ["rpc"]:
+            return "rest", rest[1] if len(rest) > 1 else "", "rpc"
+        operation = _REST_OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "merge-duplicates" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        return "rest", rest[0] if rest else "", operation
+    if "auth" in parts:
+        endpoint = "/".join(p for p in parts[parts.index("auth") + 2:] if not _ID_SEGMENT.match(p))
+        grant = request.url.params.get("grant_type")
+        return "auth", endpoint, f"{request.method.lower()} {grant}" if grant else request.method.lower()
+    return "other", "", request.method.lower()
+
+
+class TimedHTTPClient:
+    """httpx.AsyncClient mixin recording every call in supabase_request_seconds."""
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await super().send(request, **kwargs)
+            status = f"{response.status_code // 100}xx"
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            service, table, operation = describe(request)
+            supabase_seconds.observe(elapsed, service=service, table=table, operation=operation, status=status)
+            if _is_slow(elapsed):
+                logger.warning("slow Supabase call %.0f ms %s %s %s (%s)",
+                               elapsed * 1000, service, operation, table, status)
@@ -0,0 +1,248 @@
+"""
+Micro2Move Sydney - Rate Limiting
+
+Token buckets per client IP and per user (account email before sign-in,
+user id after) for endpoints that are expensive or abusable: login and
+register, which would pass credential-stuffing bursts straight on to
+Supabase Auth, and event reports.  A request takes one token from each of
+its buckets; an empty bucket answers 429 with Retry-After.
+
+Login is the exception: its per-account bucket is only checked up front and
+charged by charge_failure() after a wrong password.  Burst traffic naming an
+email is held back by the sender's IP bucket alone, and a correct sign-in
+never spends the account's tokens; only repeated wrong passwords do.
+
+The IP is request.client.host.  Behind a load balancer or reverse proxy that
+is the proxy's address, so every client would share one bucket: run uvicorn
+with --proxy-headers and --forwarded-allow-ips set to the proxy addresses
+(FORWARDED_ALLOW_IPS in the environment, or forwarded_allow_ips in a
+gunicorn config) so it is taken from X-Forwarded-For.  Never allow "*" when
+clients can reach the app directly, or they can pick their own IP.
+
+Buckets refill lazily: a bucket stores its token count and when it was last
+touched, and the refill since then is added on the next request, so there
+are no timers.  Storage is pluggable:
+
+- MemoryBucketStore (default) keeps buckets in a per-worker LRU capped at
+  RATE_LIMIT_MAX_BUCKETS; an evicted bucket comes back full, which is what
+  an idle bucket would have refilled to anyway.
+- RedisBucketStore (RATE_LIMIT_REDIS_URL, needs the redis package) shares
+  buckets across workers and hosts through any Redis-compatible server,
+  updating each one atomically in a Lua script and letting it expire once it
+  would be full again.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Protocol
+
+from fastapi import HTTPException, Request, status
+
+from config import settings
+from services.metrics import counter
+
+try:
+    import redis.asyncio as aioredis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+limited = counter("rate_limited_total", "Requests refused by the rate limiter", ["policy", "scope"])
+
+
+class Policy(NamedTuple):
+    rate: float        # tokens added per second
+    burst: int         # bucket capacity
+
+
+def per_minute(requests: float, burst: int) -> Policy:
+    return Policy(requests / 60.0, burst)
+
+
+POLICIES = {
+    "login": per_minute(settings.RATE_LIMIT_LOGIN_PER_MINUTE, settings.RATE_LIMIT_LOGIN_BURST),
+    "register": per_minute(settings.RATE_LIMIT_REGISTER_PER_MINUTE, settings.RATE_LIMIT_REGISTER_BURST),
+    "events": per_minute(settings.RATE_LIMIT_EVENTS_PER_MINUTE, settings.RATE_LIMIT_EVENTS_BURST),
+}
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        """Take cost tokens; 0.0 if allowed, else seconds until they would be."""
+
+    async def peek(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        """Like take(), without taking anything."""
+
+
+class MemoryBucketStore:
+    def __init__(self, max_buckets: int, clock=time.monotonic):
+        self.max_buckets = max_buckets
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()   # key → (tokens, updated)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def peek(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        tokens = min(policy.burst, bucket[0] + (self._clock() - bucket[1]) * policy.rate)
+        return 0.0 if tokens >= cost else (cost - tokens) / policy.rate
+
+    async def take(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(policy.burst)
+            else:
+                tokens = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / policy.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# KEYS[1] bucket; ARGV rate, burst, cost, now.  Returns seconds to wait as a string.
+_TAKE_SCRIPT = """
+local rate, burst, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = burst
+if state[1] then
+  tokens = math.min(burst, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+end
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    def __init__(self, client, prefix: str = "m2m:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._loaded = False
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        if not HAS_REDIS:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        return cls(aioredis.from_url(url))
+
+    async def take(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        if not self._loaded:
+            # Load once so calls are a single EVALSHA, not NOSCRIPT then EVAL
+            await self.client.script_load(_TAKE_SCRIPT)
+            self._loaded = True
+        # Wall clock: buckets are shared between processes
+        wait = await self._take(keys=[self.prefix + key], args=[policy.rate, policy.burst, cost, time.time()])
+        return float(wait)
+
+    async def peek(self, key: str, policy: Policy, cost: float = 1.0) -> float:
+        tokens, updated = await self.client.hmget(self.prefix + key, "tokens", "updated")
+        if tokens is None:
+            return 0.0
+        tokens = min(policy.burst, float(tokens) + max(0.0, time.time() - float(updated)) * policy.rate)
+        return 0.0 if tokens >= cost else (cost - tokens) / policy.rate
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    def __init__(self, store: BucketStore, policies: dict[str, Policy]):
+        self.store = store
+        self.policies = policies
+
+    async def check(
+        self, policy_name: str, ip: str | None, user: str | None = None, charge_user: bool = True,
+    ) -> float:
+        """
+        Take a token from the IP and user buckets; seconds to wait if either is
+        empty.  With charge_user=False the user bucket is only checked.
+        """
+        policy = self.policies[policy_name]
+        wait = 0.0
+        for scope, subject in (("ip", ip), ("user", user)):
+            if not subject:
+                continue
+            key = f"{policy_name}:{scope}:{subject}"
+            if scope == "user" and not charge_user:
+                scope_wait = await self.store.peek(key, policy)
+            else:
+                scope_wait = await self.store.take(key, policy)
+            if scope_wait:
+                limited.inc(policy=policy_name, scope=scope)
+                wait = max(wait, scope_wait)
+        return wait
+
+
+def _create_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_REDIS_URL:
+        store = RedisBucketStore.from_url(settings.RATE_LIMIT_REDIS_URL)
+    else:
+        store = MemoryBucketStore(settings.RATE_LIMIT_MAX_BUCKETS)
+    return RateLimiter(store, POLICIES)
+
+
+rate_limiter = _create_limiter()
+
+
+async def close_rate_limiter() -> None:
+    if isinstance(rate_limiter.store, RedisBucketStore):
+        await rate_limiter.store.close()
+
+
+async def enforce(request: Request, policy_name: str, user: str | None = None, charge_user: bool = True) -> None:
+    """
+    Raise 429 with Retry-After once the caller's IP or user bucket is empty.
+    With charge_user=False the user bucket is checked but not charged; see
+    charge_failure().
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    # The proxy's address unless uvicorn runs with --proxy-headers (see above)
+    ip = request.client.host if request.client else None
+    try:
+        wait = await rate_limiter.check(policy_name, ip, user.lower() if user else None, charge_user)
+    except Exception:
+        # A shared store outage must not take login down with it
+        logger.exception("Rate limiter unavailable; allowing request")
+        return
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests; try again later",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+async def charge_failure(policy_name: str, user: str) -> None:
+    """Take a token from user's bucket after a failed attempt (enforce(..., charge_user=False))."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    policy = rate_limiter.policies[policy_name]
+    try:
+        await rate_limiter.store.take(f"{policy_name}:user:{user.lower()}", policy)
+    except Exception:
+        logger.exception("Rate limiter unavailable; failed attempt not counted")
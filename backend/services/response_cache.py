@@ -0,0 +1,200 @@
+"""
+Micro2Move Sydney - Pre-serialized Response Cache
+
+Read-mostly network payloads (segments, veloways, planned projects, POIs) are
+serialized once per data version and served as bytes with a strong ETag.
+Each content-coding (gzip, br) is compressed the first time a client that
+accepts it asks, then kept with the entry.  Each dataset's entries live in
+one generation that is swapped out wholesale when the ETL publishes a new
+version.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Request, Response
+
+from config import settings
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class CachedResponse:
+    """One payload and its encodings so far, sharing one ETag stem."""
+
+    __slots__ = ("etag", "body", "_encoded")
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self._encoded: dict[str, bytes] = {}
+
+    def encoded(self, coding: str) -> bytes:
+        """body in `coding` ("br", "gzip" or "identity"), compressed on first use."""
+        if coding == "identity":
+            return self.body
+        data = self._encoded.get(coding)
+        if data is None:
+            # Two racing requests may both compress; the results are identical
+            data = brotli.compress(self.body, quality=5) if coding == "br" else gzip.compress(self.body, compresslevel=6)
+            self._encoded[coding] = data
+        return data
+
+
+class _Generation:
+    """All cached entries for a single version of a dataset."""
+
+    __slots__ = ("version", "entries")
+
+    def __init__(self, version: str):
+        self.version = version
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+
+class ResponseCache:
+    """Per-dataset LRU of pre-encoded responses, invalidated by version."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._generations: dict[str, _Generation] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, dataset: str, version: str) -> None:
+        """
+        Make `version` current for `dataset`.  Every entry cached for the
+        previous version is dropped in the same step.
+        """
+        with self._lock:
+            current = self._generations.get(dataset)
+            if current is None or current.version != version:
+                self._generations[dataset] = _Generation(version)
+
+    def version(self, dataset: str) -> str | None:
+        generation = self._generations.get(dataset)
+        return generation.version if generation else None
+
+    @staticmethod
+    def etag(dataset: str, version: str, key: str) -> str:
+        """Strong ETag stem for `key` under a given dataset version."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+        return f"{dataset}.{version}.{digest}"
+
+    def get_or_build(
+        self,
+        dataset: str,
+        version: str,
+        key: str,
+        build: Callable[[], Any],
+    ) -> CachedResponse:
+        """
+        Return the cached response for key, serializing build() on a miss.
+
+        `version` is the data version the caller built from.  Only the
+        published version is cached; a request still running on an older (or
+        not yet published) version gets a one-off encoding.
+        """
+        generation = self._generations.get(dataset)
+        current = generation is not None and generation.version == version
+
+        if current:
+            with self._lock:
+                entry = generation.entries.get(key)
+                if entry is not None:
+                    generation.entries.move_to_end(key)
+                    return entry
+
+        entry = CachedResponse(self.etag(dataset, version, key), dumps(build()))
+
+        if current:
+            with self._lock:
+                generation.entries[key] = entry
+                while len(generation.entries) > self.max_entries:
+                    generation.entries.popitem(last=False)
+        return entry
+
+
+def is_not_modified(request: Request, etag: str | None) -> bool:
+    """True if If-None-Match names this ETag stem in any content-coding."""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag == "*" or tag == etag or tag.startswith(etag + "-"):
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": f'"{etag}"', "Cache-Control": settings.NETWORK_CACHE_CONTROL,
+                 "Vary": "Accept-Encoding"},
+    )
+
+
+def preferred_encoding(accept_encoding: str) -> str:
+    """
+    The coding to send for an Accept-Encoding header: "br", "gzip" or
+    "identity".  Honours q-values (br;q=0 refuses br) and "*"; on equal
+    q, br beats gzip beats identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ("br", "gzip") if HAS_BROTLI else ("gzip",)
+    best, best_q = "identity", 0.0
+    for coding in candidates:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    # identity is always acceptable, but only competes when the client ranks it
+    return best if best_q > 0 and best_q >= weights.get("identity", 0.0) else "identity"
+
+
+def cached_json_response(request: Request, entry: CachedResponse) -> Response:
+    """Serve the best encoding the client accepts, with a per-coding ETag."""
+    coding = preferred_encoding(request.headers.get("accept-encoding", ""))
+    headers = {"Cache-Control": settings.NETWORK_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    suffix = ""
+    if coding != "identity":
+        headers["Content-Encoding"], suffix = coding, f"-{coding}"
+    headers["ETag"] = f'"{entry.etag}{suffix}"'
+    return Response(content=entry.encoded(coding), media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
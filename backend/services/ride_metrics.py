@@ -0,0 +1,147 @@
+"""
+Micro2Move Sydney - Ride Metrics Engine
+
+Computes RouteHistory ride metrics (distance_km, duration_minutes,
+avg_speed, max_speed, elevation_gain, co2_saved, calories_burned) for a
+whole batch of decoded tracks at once.  Tracks are laid out as in
+polyline.decode_many(): one flat [lat, lng] array plus per-track offsets.
+
+Filtering, applied per GPS step:
+- jitter: steps shorter than JITTER_M are treated as standing still;
+- outliers: steps implying more than MAX_SPEED_KMH are GPS spikes and are
+  dropped from distance and speed; a cluster of up to MAX_SPIKE_FIXES
+  spiked fixes is skipped, with one bridging step from the last good fix to
+  the next good one in its place.
+"""
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+JITTER_M = 2.0
+MAX_SPEED_KMH = 60.0
+MAX_SPIKE_FIXES = 5              # longest cluster of bad fixes bridged over
+
+CO2_KG_PER_KM = 0.18             # average Australian passenger car, tailpipe
+RIDER_WEIGHT_KG = 75.0
+
+# Cycling MET values by average speed (Compendium of Physical Activities)
+_MET_SPEED_KMH = np.array([16.0, 19.0, 22.0, 25.0])
+_MET_VALUES = np.array([4.0, 6.8, 8.0, 10.0, 12.0])
+
+
+def haversine_m(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in metres, elementwise over arrays."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) * 0.5) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) * 0.5) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def compute_ride_metrics(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    durations_s: np.ndarray,
+    elevations: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Compute metrics for every track in one vectorized pass.
+
+    durations_s holds each ride's end_time - start_time; fixes are assumed
+    evenly spaced in time across it.  elevations, if given, is aligned with
+    coords; without it elevation_gain is NaN so callers can leave the stored
+    value alone.
+
+    Returns a dict of per-track arrays keyed by RouteHistory column name.
+    """
+    n_tracks = len(offsets) - 1
+    counts = np.diff(offsets)
+    durations_s = np.asarray(durations_s, dtype=np.float64)
+
+    # One step between each pair of consecutive fixes within a track
+    step_track = np.repeat(np.arange(n_tracks), np.maximum(counts - 1, 0))
+    boundaries = offsets[1:-1]
+    boundaries = boundaries[(boundaries > 0) & (boundaries < len(coords))]
+    within = np.ones(max(len(coords) - 1, 0), dtype=bool)
+    within[boundaries - 1] = False
+    step_from = np.flatnonzero(within)
+    step_to = step_from + 1
+
+    step_m = haversine_m(
+        coords[step_from, 0], coords[step_from, 1],
+        coords[step_to, 0], coords[step_to, 1],
+    )
+    step_s = np.divide(
+        durations_s, np.maximum(counts - 1, 1), where=counts > 1,
+        out=np.zeros(n_tracks),
+    )[step_track]
+    step_kmh = np.divide(step_m, step_s, where=step_s > 0, out=np.zeros_like(step_m)) * 3.6
+
+    # Rides without an end_time have no timing, so only jitter can be filtered
+    moving = (step_m >= JITTER_M) & ((step_s == 0) | (step_kmh <= MAX_SPEED_KMH))
+
+    # Spiked fixes poison the step out to them and the step back.  Pair each
+    # outlier step with a later one in the same track, at most
+    # MAX_SPIKE_FIXES fixes on, whose bridge (last good fix to the next good
+    # one, over the steps' combined time) is within MAX_SPEED_KMH; the fixes
+    # in between are dropped and the bridge counted once in their place
+    # (as standing still if it's under JITTER_M).  Outliers that pair with
+    # nothing, e.g. on a track too fast throughout, just drop out.  Only
+    # outlier steps are looped over, and they are rare.
+    outliers = np.flatnonzero((step_m >= JITTER_M) & ~moving).tolist()
+    bridge_track, bridge_m, bridge_s = [], [], []
+    k = 0
+    while k < len(outliers):
+        first = outliers[k]
+        for back in range(k + 1, len(outliers)):
+            last = outliers[back]
+            if last - first > MAX_SPIKE_FIXES or step_track[last] != step_track[first]:
+                break
+            metres = float(haversine_m(
+                coords[step_from[first], 0], coords[step_from[first], 1],
+                coords[step_to[last], 0], coords[step_to[last], 1],
+            ))
+            seconds = float(step_s[first]) * (last - first + 1)
+            if metres / seconds * 3.6 <= MAX_SPEED_KMH:
+                moving[first:last + 1] = False
+                bridge_track.append(step_track[first])
+                bridge_m.append(metres if metres >= JITTER_M else 0.0)
+                bridge_s.append(seconds if metres >= JITTER_M else 0.0)
+                k = back
+                break
+        k += 1
+    bridge_track = np.array(bridge_track, dtype=np.int64)
+    bridge_m, bridge_s = np.array(bridge_m), np.array(bridge_s)
+    bridge_kmh = np.divide(bridge_m, bridge_s, where=bridge_s > 0, out=np.zeros_like(bridge_m)) * 3.6
+
+    distance_m = np.bincount(step_track, weights=step_m * moving, minlength=n_tracks)
+    distance_m += np.bincount(bridge_track, weights=bridge_m, minlength=n_tracks)
+    moving_s = np.bincount(step_track, weights=step_s * moving, minlength=n_tracks)
+    moving_s += np.bincount(bridge_track, weights=bridge_s, minlength=n_tracks)
+
+    avg_kmh = np.divide(distance_m, moving_s, where=moving_s > 0, out=np.zeros(n_tracks)) * 3.6
+    max_kmh = np.zeros(n_tracks)
+    np.maximum.at(max_kmh, step_track, np.where(moving, step_kmh, 0.0))
+    np.maximum.at(max_kmh, bridge_track, bridge_kmh)
+
+    if elevations is not None:
+        climb = np.diff(np.asarray(elevations, dtype=np.float64))[step_from] if len(coords) > 1 else np.empty(0)
+        climb = np.where(moving & (climb > 0), climb, 0.0)
+        elevation_gain = np.bincount(step_track, weights=climb, minlength=n_tracks)
+    else:
+        elevation_gain = np.full(n_tracks, np.nan)
+
+    met = _MET_VALUES[np.searchsorted(_MET_SPEED_KMH, avg_kmh, side="right")]
+    calories = met * RIDER_WEIGHT_KG * (moving_s / 3600.0)
+
+    distance_km = distance_m / 1000.0
+    return {
+        "distance_km": np.round(distance_km, 3),
+        "duration_minutes": np.round(durations_s / 60.0).astype(np.int64),
+        "avg_speed": np.round(avg_kmh, 2),
+        "max_speed": np.round(max_kmh, 2),
+        "elevation_gain": np.round(elevation_gain, 1),
+        "co2_saved": np.round(distance_km * CO2_KG_PER_KM, 3),
+        "calories_burned": np.round(calories).astype(np.int64),
+    }
@@ -0,0 +1,592 @@
+"""
+Micro2Move Sydney - Local Route Engine
+
+Routes are computed from the segment data, not by the model:
+
+- RoutingGraph turns every segment into an undirected edge between its
+  endpoints (snapped to a SNAP_M grid so touching segments share a node);
+- edge costs are segment length scaled by crash risk, comfort, shade and
+  gradient, weighted by the rider's sliders (RouteWeights);
+- plan_loop() builds round trips of a target distance: Dijkstra out to a
+  turnaround in each compass sector, then back with already-ridden edges
+  penalised, and the candidate with the best cost/distance fit wins;
+- describe() reports real distance, time, climbing, safety and the street
+  sequence in the /routes/generate response shape;
+- refine_plan() re-plans a route with new slider weights, so slider moves
+  and simple requests ("flatter", "shorter") need no model call.
+
+There is no tree canopy layer yet, so segments tagged green_space stand in
+for shade, and climbing is estimated from gradient_class.
+"""
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from services.ai_cache import normalise_location, normalise_text
+from services.geo import ORIGIN_LAT, ORIGIN_LNG, to_latlng, to_local_metres
+from services.polyline import encode
+from services.segment_store import META_FILE, SegmentStore, build_shared
+
+ROUTING_DIR = "routing"       # graph arrays, inside the store's shared version dir
+SNAP_M = 5.0                  # endpoints closer than this share a node
+SECTORS = 8                   # turnaround candidates, one per compass sector
+TURNAROUND_RANGE = (0.4, 0.6)   # outbound leg as a share of the target distance
+REUSE_PENALTY = 4.0           # cost multiplier for riding an outbound edge home
+DISTANCE_FIT = 2.0            # weight of |length - target| / target in candidate score
+
+# Cost multipliers at full slider weight
+RISK_COST = 4.0
+DISCOMFORT_COST = 1.5
+NO_SHADE_COST = 1.0
+GRADIENT_COST = 3.0
+
+GRADIENT_PENALTY = {"flat": 0.0, "rolling": 0.5, "steep": 1.0}
+CLIMB_M_PER_KM = {"flat": 0.0, "rolling": 8.0, "steep": 25.0}
+RIDE_SPEED_KMH = {"commute": 18.0, "leisure": 14.0, "family": 12.0, "training": 25.0}
+DEFAULT_SPEED_KMH = 16.0
+SEGMENT_TYPE = {
+    "separated_cycleway": "protected",
+    "shared_path": "shared",
+    "painted_lane": "mixed",
+    "mixed_traffic": "mixed",
+}
+
+# Landmarks riders start from that aren't in the veloway or POI datasets
+LANDMARKS = {
+    "Circular Quay": (-33.8614, 151.2108),
+    "Town Hall": (-33.8732, 151.2067),
+    "Hyde Park": (-33.8731, 151.2111),
+    "Darling Harbour": (-33.8749, 151.1987),
+    "Barangaroo": (-33.8614, 151.2017),
+    "The Rocks": (-33.8599, 151.2090),
+    "Royal Botanic Garden": (-33.8642, 151.2166),
+    "Central": (-33.8832, 151.2055),
+    "Surry Hills": (-33.8860, 151.2110),
+    "Redfern": (-33.8930, 151.2040),
+    "Newtown": (-33.8975, 151.1790),
+    "Glebe": (-33.8790, 151.1850),
+    "Pyrmont": (-33.8690, 151.1940),
+    "Moore Park": (-33.8930, 151.2230),
+    "Centennial Park": (-33.8990, 151.2330),
+    "Sydney Park": (-33.9100, 151.1850),
+    "Green Square": (-33.9065, 151.2030),
+}
+
+# Refinement requests the weights can express on their own (see parse_refinement)
+REFINE_PHRASES = [
+    (re.compile(rf"\b(?:{pattern})\b"), change)
+    for pattern, change in [
+        (r"safer|safest|less traffic|avoid traffic|away from traffic|quieter|protected", {"safety": 100}),
+        (r"more direct|most direct|direct", {"safety": 25}),
+        (r"faster|quicker|quickest", {"shade": 0}),
+        (r"more shade|shadier|shady|shaded|greener|more green|through parks|parks", {"shade": 100}),
+        (r"flatter|flat|avoid hills|fewer hills|no hills|less climbing|avoid climbing", {"hills": 100}),
+        (r"hillier|more hills|more climbing", {"hills": 0}),
+        (r"shorter", {"distance": 0.75}),
+        (r"longer", {"distance": 1.25}),
+    ]
+]
+REFINE_FILLER = {
+    "a", "an", "and", "as", "be", "bit", "can", "could", "even", "i", "it", "like",
+    "little", "loop", "lot", "make", "much", "please", "possible", "ride", "route",
+    "slightly", "something", "the", "to", "want", "way", "with", "would", "you",
+}
+# Left over after the phrases above, these flip or scale the change ('less shady',
+# 'not so flat'), so the prompt goes to the model instead
+REFINE_NEGATORS = {"dont", "fewer", "less", "more", "no", "not", "t", "without"}
+
+
+@dataclass(frozen=True)
+class RouteWeights:
+    """Slider preferences as 0-1 weights."""
+
+    safety: float = 0.9
+    shade: float = 0.5
+    hills: float = 0.2
+
+    @classmethod
+    def from_sliders(cls, safety_priority: int, shade_priority: int, hills_avoid: int) -> "RouteWeights":
+        def unit(value: float) -> float:
+            return min(max(value / 100.0, 0.0), 1.0)
+
+        return cls(safety=unit(safety_priority), shade=unit(shade_priority), hills=unit(hills_avoid))
+
+    def as_sliders(self) -> dict[str, int]:
+        return {
+            "safety_priority": round(self.safety * 100),
+            "shade_priority": round(self.shade * 100),
+            "hills_avoid": round(self.hills * 100),
+        }
+
+
+@dataclass
+class PlannedRoute:
+    nodes: list[int]              # node sequence, start ... start
+    edges: list[int]              # edge (= segment index) per step
+    length_m: float
+    cost: float
+    score: float = field(default=0.0)
+
+
+class RoutingGraph:
+    """
+    Undirected segment graph for one SegmentStore version.
+
+    Every per-segment and per-node array, including the CSR adjacency, is a
+    NumPy array, so save() can write it next to the shared segment store and
+    attach() can map it read-only in each worker (load_routing_graph()).
+    Dijkstra reads the adjacency through memoryviews, which index at nearly
+    list speed without a per-worker copy.
+    """
+
+    _ARRAYS = (
+        "length_m", "shade", "gradient", "climb_m", "risk", "comfort", "names",
+        "node_x", "node_y", "edge_u", "edge_v", "indptr", "adj_node", "adj_edge", "component_m",
+    )
+
+    def __init__(self, store: SegmentStore, places: dict[str, tuple[float, float]] | None = None):
+        self.store = store
+        n = len(store)
+
+        first_lat, first_lng, last_lat, last_lng = (np.full(n, np.nan) for _ in range(4))
+        self.length_m = np.zeros(n)
+        names, gradients, shade = [], [], np.zeros(n)
+        for i, record in enumerate(store.records):
+            names.append(record.get("road_name") or "Unnamed street")
+            gradients.append(record.get("gradient_class") or "flat")
+            shade[i] = "green_space" in (record.get("tags") or [])
+            points = record.get("coordinates") or []
+            if len(points) < 2:
+                continue
+            x, y = to_local_metres([p["lat"] for p in points], [p["lng"] for p in points])
+            self.length_m[i] = float(np.hypot(np.diff(x), np.diff(y)).sum())
+            first_lat[i], first_lng[i] = points[0]["lat"], points[0]["lng"]
+            last_lat[i], last_lng[i] = points[-1]["lat"], points[-1]["lng"]
+
+        self.names = np.array(names, dtype=str)
+        self.shade = shade
+        self.gradient = np.array([GRADIENT_PENALTY.get(g, 0.0) for g in gradients])
+        self.climb_m = np.array([CLIMB_M_PER_KM.get(g, 0.0) for g in gradients]) * self.length_m / 1000
+        self.risk = np.nan_to_num(np.asarray(store.risk, dtype=np.float64), nan=1.0)
+        self.comfort = np.nan_to_num(np.asarray(store.comfort, dtype=np.float64), nan=0.0)
+
+        # Snap endpoints to a grid so segments that meet share a node
+        routable = np.flatnonzero(~np.isnan(first_lat) & (self.length_m > 0))
+        ux, uy = to_local_metres(first_lat[routable], first_lng[routable])
+        vx, vy = to_local_metres(last_lat[routable], last_lng[routable])
+        cells = np.round(np.column_stack([
+            np.concatenate([ux, vx]), np.concatenate([uy, vy])
+        ]) / SNAP_M).astype(np.int64)
+        _, first_seen, node_of = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+        node_of = node_of.ravel()
+        self.node_x = np.concatenate([ux, vx])[first_seen]
+        self.node_y = np.concatenate([uy, vy])[first_seen]
+
+        self.edge_u = np.full(n, -1, dtype=np.int64)
+        self.edge_v = np.full(n, -1, dtype=np.int64)
+        self.edge_u[routable] = node_of[:len(routable)]
+        self.edge_v[routable] = node_of[len(routable):]
+
+        # CSR adjacency (both directions)
+        edges = self._edges()
+        src = np.concatenate([self.edge_u[edges], self.edge_v[edges]])
+        dst = np.concatenate([self.edge_v[edges], self.edge_u[edges]])
+        via = np.concatenate([edges, edges])
+        order = np.argsort(src, kind="stable")
+        self.indptr = np.searchsorted(src[order], np.arange(len(self.node_x) + 1)).astype(np.int64)
+        self.adj_node = dst[order].astype(np.int64)
+        self.adj_edge = via[order].astype(np.int64)
+        self.n_nodes = len(self.node_x)
+        self.component_m = self._component_lengths(edges)
+        self._finish(places)
+
+    def _edges(self) -> np.ndarray:
+        """Segments that join two distinct nodes."""
+        return np.flatnonzero((self.edge_u >= 0) & (self.edge_u != self.edge_v))
+
+    def _finish(self, places: dict[str, tuple[float, float]] | None) -> None:
+        """Per-worker lookups derived from the arrays: small, so not shared."""
+        self.n_nodes = len(self.node_x)
+        self._isolated = np.diff(self.indptr) == 0
+        self._csr = tuple(memoryview(np.ascontiguousarray(a)) for a in (self.indptr, self.adj_node, self.adj_edge))
+        self._length = memoryview(np.ascontiguousarray(self.length_m))
+
+        self.places = {normalise_location(name): latlng for name, latlng in (places or {}).items()}
+        self.streets: dict[str, int] = {}
+        for edge in self._edges().tolist():
+            self.streets.setdefault(normalise_text(str(self.names[edge])), int(self.edge_u[edge]))
+        self.streets.pop("", None)
+
+    def save(self, directory: Path) -> None:
+        """Write every array to directory as .npy files; see SegmentStore.save."""
+        tmp = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in self._ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)), allow_pickle=False)
+        (tmp / META_FILE).write_text(json.dumps({"version": self.store.version, "n_nodes": self.n_nodes}))
+        try:
+            tmp.rename(directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / META_FILE).exists():
+                raise
+
+    @classmethod
+    def attach(
+        cls, directory: Path, store: SegmentStore, places: dict[str, tuple[float, float]] | None = None
+    ) -> "RoutingGraph":
+        """Map a saved graph read-only over store; only places and streets are built."""
+        graph = cls.__new__(cls)
+        graph.store = store
+        for name in cls._ARRAYS:
+            setattr(graph, name, np.load(directory / f"{name}.npy", mmap_mode="r", allow_pickle=False))
+        graph._finish(places)
+        return graph
+
+    def _component_lengths(self, edges: np.ndarray) -> np.ndarray:
+        """Total segment length of the connected component each node is in."""
+        parent = list(range(self.n_nodes))
+
+        def find(a: int) -> int:
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        for u, v in zip(self.edge_u[edges].tolist(), self.edge_v[edges].tolist()):
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                parent[ru] = rv
+        roots = np.array([find(a) for a in range(self.n_nodes)], dtype=np.int64)
+        totals = np.bincount(roots[self.edge_u[edges]], weights=self.length_m[edges], minlength=self.n_nodes)
+        return totals[roots]
+
+    # -- locations ---------------------------------------------------------
+
+    def nearest_node(self, lat: float, lng: float, min_component_m: float = 0.0) -> int | None:
+        """
+        Closest node with at least one edge, preferring nodes whose connected
+        network is at least min_component_m long so a loop can reach its
+        target distance.
+        """
+        if not self.n_nodes:
+            return None
+        x, y = to_local_metres(lat, lng)
+        d2 = (self.node_x - x) ** 2 + (self.node_y - y) ** 2
+        d2[self._isolated] = np.inf
+        large = np.where(self.component_m >= min_component_m, d2, np.inf)
+        node = int(np.argmin(large)) if np.isfinite(large).any() else int(np.argmin(d2))
+        return node if np.isfinite(d2[node]) else None
+
+    def resolve(self, text: str) -> tuple[str, float, float]:
+        """
+        Best-effort place lookup for a free-text start: known places first,
+        then street names; otherwise the CBD.  Returns (name, lat, lng).
+        """
+        query = normalise_location(text)
+        padded = f" {query} "
+        matches = [name for name in self.places if name and (f" {name} " in padded or query in name)]
+        if query and matches:
+            name = max(matches, key=len)
+            lat, lng = self.places[name]
+            return name.title(), lat, lng
+
+        streets = [street for street in self.streets if f" {street} " in padded]
+        if query and streets:
+            street = max(streets, key=len)
+            lat, lng = to_latlng(self.node_x[self.streets[street]], self.node_y[self.streets[street]])
+            return street.title(), float(lat), float(lng)
+        return "Sydney CBD", ORIGIN_LAT, ORIGIN_LNG
+
+    # -- costs and search --------------------------------------------------
+
+    def costs(self, weights: RouteWeights) -> np.ndarray:
+        """Per-edge cost in weighted metres."""
+        factor = (
+            1.0
+            + RISK_COST * weights.safety * self.risk
+            + DISCOMFORT_COST * weights.safety * (1.0 - self.comfort)
+            + NO_SHADE_COST * weights.shade * (1.0 - self.shade)
+            + GRADIENT_COST * weights.hills * self.gradient
+        )
+        return self.length_m * factor
+
+    def _other_end(self, edge: int, node: int) -> int:
+        u = int(self.edge_u[edge])
+        return int(self.edge_v[edge]) if u == node else u
+
+    def shortest_paths(self, source: int, cost: list[float], target: int | None = None):
+        """Dijkstra from source; returns (cost, metres, previous edge) per node."""
+        inf = math.inf
+        dist = [inf] * self.n_nodes
+        metres = [0.0] * self.n_nodes
+        prev = [-1] * self.n_nodes
+        dist[source] = 0.0
+        (indptr, adj_node, adj_edge), length = self._csr, self._length
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if u == target:
+                break
+            for k in range(indptr[u], indptr[u + 1]):
+                v, e = adj_node[k], adj_edge[k]
+                nd = d + cost[e]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    metres[v] = metres[u] + length[e]
+                    prev[v] = e
+                    heapq.heappush(heap, (nd, v))
+        return dist, metres, prev
+
+    def _path(self, prev: list[int], source: int, target: int) -> tuple[list[int], list[int]]:
+        nodes, edges = [target], []
+        node = target
+        while node != source:
+            edge = prev[node]
+            if edge < 0:
+                return [], []
+            edges.append(edge)
+            node = self._other_end(edge, node)
+            nodes.append(node)
+        return nodes[::-1], edges[::-1]
+
+    def plan_loop(self, start: int, target_m: float, weights: RouteWeights) -> list[PlannedRoute]:
+        """Candidate round trips from start, best first."""
+        cost = self.costs(weights)
+        cost_list = cost.tolist()
+        dist, metres, prev = self.shortest_paths(start, cost_list)
+        dist, metres = np.array(dist), np.array(metres)
+
+        lo, hi = (share * target_m for share in TURNAROUND_RANGE)
+        reachable = np.isfinite(dist) & (metres > 0)
+        in_range = np.flatnonzero(reachable & (metres >= lo) & (metres <= hi))
+        if not len(in_range):
+            # Small or sparse network: turn at the farthest node within half the target
+            short = np.flatnonzero(reachable & (metres <= target_m / 2))
+            in_range = short[np.argsort(-metres[short])[:SECTORS]] if len(short) else short
+
+        angle = np.arctan2(self.node_y[in_range] - self.node_y[start], self.node_x[in_range] - self.node_x[start])
+        sector = ((angle + math.pi) / (2 * math.pi) * SECTORS).astype(int) % SECTORS
+        per_metre = dist[in_range] / metres[in_range]
+        turnarounds = []
+        for s in range(SECTORS):
+            members = np.flatnonzero(sector == s)
+            if len(members):
+                turnarounds.append(int(in_range[members[np.argmin(per_metre[members])]]))
+
+        candidates = []
+        for via in turnarounds:
+            out_nodes, out_edges = self._path(prev, start, via)
+            back_cost = cost.copy()
+            back_cost[out_edges] *= REUSE_PENALTY
+            _, _, back_prev = self.shortest_paths(via, back_cost.tolist(), target=start)
+            back_nodes, back_edges = self._path(back_prev, via, start)
+            if not out_edges or not back_edges:
+                continue
+            edges = out_edges + back_edges
+            length = float(self.length_m[edges].sum())
+            route_cost = float(cost[edges].sum())
+            candidates.append(PlannedRoute(
+                nodes=out_nodes + back_nodes[1:],
+                edges=edges,
+                length_m=length,
+                cost=route_cost,
+                score=route_cost / length + DISTANCE_FIT * abs(length - target_m) / target_m,
+            ))
+        return sorted(candidates, key=lambda r: r.score)
+
+    # -- reporting ---------------------------------------------------------
+
+    def describe(self, route: PlannedRoute, ride_type: str = "commute") -> dict:
+        """Route facts in the /routes/generate response shape."""
+        edges = np.array(route.edges)
+        lengths = self.length_m[edges]
+        km = route.length_m / 1000
+        facility_codes = np.asarray(self.store.facility_codes)[edges]
+        facility = [self.store.facility_types[c] for c in facility_codes.tolist()]
+        protected = sum(l for l, f in zip(lengths.tolist(), facility) if SEGMENT_TYPE.get(f) == "protected")
+        mixed_traffic = sum(l for l, f in zip(lengths.tolist(), facility) if f == "mixed_traffic")
+
+        segments: list[dict] = []
+        for edge, length, fac in zip(route.edges, lengths.tolist(), facility):
+            name, kind = str(self.names[edge]), SEGMENT_TYPE.get(fac, "mixed")
+            note = "steep" if self.gradient[edge] >= 1.0 else ("green space" if self.shade[edge] else "")
+            if segments and segments[-1]["name"] == name and segments[-1]["type"] == kind:
+                segments[-1]["distance_km"] += length / 1000
+                if note and note not in segments[-1]["note"]:
+                    segments[-1]["note"] = ", ".join(filter(None, [segments[-1]["note"], note]))
+            else:
+                segments.append({"name": name, "distance_km": length / 1000, "type": kind, "note": note})
+        for segment in segments:
+            segment["distance_km"] = round(segment["distance_km"], 2)
+
+        points: list[tuple[float, float]] = []
+        records = self.store.records
+        for node, edge in zip(route.nodes, route.edges):
+            coords = [(p["lat"], p["lng"]) for p in records[edge]["coordinates"]]
+            if int(self.edge_u[edge]) != node:
+                coords.reverse()
+            points.extend(coords if not points else coords[1:])
+
+        speed = RIDE_SPEED_KMH.get(ride_type, DEFAULT_SPEED_KMH)
+        return {
+            "distance_km": round(km, 1),
+            "estimated_minutes": max(1, round(km / speed * 60)),
+            "elevation_gain_m": round(float(self.climb_m[edges].sum())),
+            "safety_score": round(100 * (1 - float((self.risk[edges] * lengths).sum() / route.length_m))),
+            "segments": segments,
+            "segment_ids": [str(self.store.ids[e]) for e in route.edges],
+            "polyline": encode(points),
+            "stats": {
+                "protected_share": round(protected / route.length_m, 2),
+                "mixed_traffic_share": round(mixed_traffic / route.length_m, 2),
+                "shade_share": round(float((self.shade[edges] * lengths).sum() / route.length_m), 2),
+                "steep_km": round(float(lengths[self.gradient[edges] >= 1.0].sum()) / 1000, 2),
+            },
+        }
+
+
+def load_routing_graph(
+    store: SegmentStore,
+    places: dict[str, tuple[float, float]] | None = None,
+    shared_dir: Path | None = None,
+) -> RoutingGraph:
+    """
+    The routing graph for store.  With shared_dir, it is built once per
+    version into <shared_dir>/<version>/routing/ and mapped by every worker.
+    """
+    if shared_dir is None:
+        return RoutingGraph(store, places)
+    directory = shared_dir / store.version / ROUTING_DIR
+    build_shared(shared_dir, directory, lambda: RoutingGraph(store).save(directory))
+    return RoutingGraph.attach(directory, store, places)
+
+
+def places_from_datasets(datasets: dict) -> dict[str, tuple[float, float]]:
+    """Named places (veloway hubs and destinations, POIs) plus LANDMARKS."""
+    places = dict(LANDMARKS)
+    veloways = datasets.get("veloways")
+    items = []
+    if veloways is not None:
+        items += veloways.data.get("hubs", []) + veloways.data.get("destinations", [])
+    if datasets.get("pois") is not None:
+        items += datasets["pois"].data
+    for item in items:
+        location = item.get("location") or {}
+        if item.get("name") and "lat" in location and "lng" in location:
+            places.setdefault(item["name"], (location["lat"], location["lng"]))
+    return places
+
+
+def local_badges(route: dict) -> list[str]:
+    stats = route["stats"]
+    badges = []
+    if stats["protected_share"] >= 0.6:
+        badges.append("Mostly Protected")
+    if route["safety_score"] >= 80:
+        badges.append("Low Risk")
+    if stats["shade_share"] >= 0.3:
+        badges.append("Green & Shady")
+    if route["elevation_gain_m"] <= 10:
+        badges.append("Flat")
+    return badges
+
+
+def local_warnings(route: dict) -> list[str]:
+    stats = route["stats"]
+    warnings = []
+    if stats["steep_km"] > 0:
+        warnings.append(f"{stats['steep_km']:.1f} km of steep climbing")
+    if stats["mixed_traffic_share"] >= 0.3:
+        warnings.append(f"{round(stats['mixed_traffic_share'] * 100)}% of the route is in mixed traffic")
+    return warnings
+
+
+def local_insight(route: dict) -> str:
+    streets = []
+    for segment in route["segments"]:
+        if segment["name"] not in streets:
+            streets.append(segment["name"])
+    return (
+        f"A {route['distance_km']} km loop from {route['start']} via {', '.join(streets[:3])}, "
+        f"about {route['estimated_minutes']} minutes with {route['elevation_gain_m']} m of climbing."
+    )
+
+
+def plan_route(
+    graph: RoutingGraph,
+    start_location: str,
+    distance_km: float,
+    ride_type: str,
+    weights: RouteWeights,
+) -> dict | None:
+    """
+    Best loop of distance_km from start_location, described; None when no
+    routable network is reachable from the start.
+    """
+    start, lat, lng = graph.resolve(start_location)
+    target_m = max(float(distance_km), 1.0) * 1000
+    node = graph.nearest_node(lat, lng, min_component_m=target_m / 2)
+    if node is None:
+        return None
+    candidates = graph.plan_loop(node, target_m, weights)
+    if not candidates:
+        return None
+    return {
+        "start": start,
+        "ride_type": ride_type,
+        "preferences": weights.as_sliders(),
+        **graph.describe(candidates[0], ride_type),
+    }
+
+
+def parse_refinement(text: str) -> tuple[dict[str, float], bool]:
+    """
+    Slider changes a refinement prompt asks for, e.g. 'flatter and shadier'
+    → {"hills": 100, "shade": 100}.  The flag is False when the prompt says
+    anything REFINE_PHRASES cannot express, in which case the caller should
+    hand it to the model.
+    """
+    rest = f" {normalise_text(text)} "
+    changes: dict[str, float] = {}
+    for pattern, change in REFINE_PHRASES:
+        if pattern.search(rest):
+            changes.update(change)
+            rest = pattern.sub(" ", rest)
+    words = rest.split()
+    understood = all(word in REFINE_FILLER for word in words) and not REFINE_NEGATORS.intersection(words)
+    return changes, understood
+
+
+def refine_plan(
+    graph: RoutingGraph,
+    current_route: dict,
+    changes: dict[str, float],
+    safety_vs_direct: int,
+    shade_vs_speed: int,
+) -> dict | None:
+    """
+    Re-plan a locally computed route with new weights; None if current_route
+    did not come from plan_route().
+    """
+    if "start" not in current_route or "distance_km" not in current_route:
+        return None
+    preferences = current_route.get("preferences") or {}
+    weights = RouteWeights.from_sliders(
+        changes.get("safety", safety_vs_direct),
+        changes.get("shade", shade_vs_speed),
+        changes.get("hills", preferences.get("hills_avoid", RouteWeights.hills * 100)),
+    )
+    distance_km = float(current_route["distance_km"]) * changes.get("distance", 1.0)
+    ride_type = current_route.get("ride_type", "commute")
+    return plan_route(graph, current_route["start"], distance_km, ride_type, weights)
@@ -0,0 +1,373 @@
+"""
+Micro2Move Sydney - In-memory Segment Store
+
+Holds the cycle network segments produced by the ETL
+(app/scripts/fetch_data.py → app/data/segments.json) as NumPy columns with a
+packed STR-tree over the segment bounding boxes, so bbox + attribute queries
+never touch the segment dicts until the response is built.
+
+With a shared directory (NETWORK_SHARED_MEMORY), the first process to load a
+version writes those columns, the tree levels and the segment JSON to .npy
+files under <shared_dir>/<version>/; every worker then maps them read-only,
+so the page cache holds one copy per node instead of one per worker.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+SEGMENTS_FILE = "segments.json"
+USAGE_FILE = "segment_usage.json"   # written by jobs/map_match_routes.py
+
+META_FILE = "meta.json"           # last file written to a shared version dir
+SHARED_VERSIONS_KEPT = 2
+
+FACILITY_TYPES = (
+    "separated_cycleway",
+    "shared_path",
+    "painted_lane",
+    "mixed_traffic",
+)
+
+
+class STRTree:
+    """
+    Static Sort-Tile-Recursive R-tree over axis-aligned bounding boxes.
+
+    Items are STR-sorted once and packed into fixed-capacity nodes; every
+    level is a contiguous (n, 4) array of [minx, miny, maxx, maxy], and the
+    children of node i live at [i * capacity, (i + 1) * capacity) on the level
+    below.  Queries walk the levels with vectorized intersection tests.
+    """
+
+    def __init__(self, bounds: np.ndarray, node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        self._child_offsets = np.arange(node_capacity)
+
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.order = self._str_order(bounds, node_capacity)
+        self.levels = [bounds[self.order]]
+
+        while len(self.levels[-1]) > node_capacity:
+            below = self.levels[-1]
+            starts = np.arange(0, len(below), node_capacity)
+            self.levels.append(np.column_stack([
+                np.minimum.reduceat(below[:, 0], starts),
+                np.minimum.reduceat(below[:, 1], starts),
+                np.maximum.reduceat(below[:, 2], starts),
+                np.maximum.reduceat(below[:, 3], starts),
+            ]))
+
+    @classmethod
+    def from_levels(cls, order: np.ndarray, levels: list[np.ndarray], node_capacity: int) -> "STRTree":
+        """Rebuild a tree from its saved order and level arrays."""
+        tree = cls.__new__(cls)
+        tree.node_capacity = node_capacity
+        tree._child_offsets = np.arange(node_capacity)
+        tree.order = order
+        tree.levels = levels
+        return tree
+
+    @staticmethod
+    def _str_order(bounds: np.ndarray, capacity: int) -> np.ndarray:
+        """Slice by centre-x into √P vertical strips, then sort each by centre-y."""
+        n = len(bounds)
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+
+        cx = (bounds[:, 0] + bounds[:, 2]) * 0.5
+        cy = (bounds[:, 1] + bounds[:, 3]) * 0.5
+        leaves = -(-n // capacity)
+        strip = int(np.ceil(np.sqrt(leaves))) * capacity
+
+        by_x = np.argsort(cx, kind="stable")
+        strip_id = np.empty(n, dtype=np.intp)
+        strip_id[by_x] = np.arange(n) // strip
+        return np.lexsort((cy, strip_id))
+
+    def query(self, minx: float, miny: float, maxx: float, maxy: float) -> np.ndarray:
+        """Return the indices of all items whose bbox intersects the query bbox."""
+        if not len(self.order):
+            return np.empty(0, dtype=np.intp)
+
+        top = self.levels[-1]
+        hits = np.flatnonzero(
+            (top[:, 0] <= maxx) & (top[:, 2] >= minx)
+            & (top[:, 1] <= maxy) & (top[:, 3] >= miny)
+        )
+        for level in reversed(self.levels[:-1]):
+            if not len(hits):
+                break
+            children = (hits[:, None] * self.node_capacity + self._child_offsets).ravel()
+            children = children[children < len(level)]
+            b = level[children]
+            hits = children[
+                (b[:, 0] <= maxx) & (b[:, 2] >= minx)
+                & (b[:, 1] <= maxy) & (b[:, 3] >= miny)
+            ]
+        return self.order[hits]
+
+
+class SegmentRecords(Sequence):
+    """
+    Segment dicts kept as one concatenated UTF-8 JSON buffer plus offsets,
+    decoded on access.  The buffer can be a read-only memory map.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def encode(cls, segments: list[dict]) -> "SegmentRecords":
+        parts = [json.dumps(s, ensure_ascii=False, separators=(",", ":")).encode() for s in segments]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in parts])
+        return cls(np.frombuffer(b"".join(parts), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> dict:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return json.loads(self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes())
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _categorical(values: list[str]) -> tuple[tuple[str, ...], np.ndarray]:
+    """Dictionary-encode a string column into (categories, int32 codes)."""
+    categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return tuple(categories.tolist()), codes.astype(np.int32)
+
+
+def _segment_bounds(segment: dict) -> tuple[float, float, float, float]:
+    points = segment.get("coordinates") or []
+    if not points and segment.get("center"):
+        points = [segment["center"]]
+    if not points:
+        return (np.nan, np.nan, np.nan, np.nan)
+    lngs = [p["lng"] for p in points]
+    lats = [p["lat"] for p in points]
+    return (min(lngs), min(lats), max(lngs), max(lats))
+
+
+class SegmentStore:
+    """Columnar, read-only view of the segment set for one data version."""
+
+    _ARRAYS = ("ids", "facility_codes", "local_area_codes", "comfort", "risk", "bounds", "_tree_items")
+
+    def __init__(self, segments: list[dict], version: str = ""):
+        self.version = version
+        self.records: Sequence[dict] = segments
+
+        self.ids = np.array([str(s["id"]) for s in segments], dtype=str)
+        self.facility_types, self.facility_codes = _categorical(
+            [s.get("facility_type") or "mixed_traffic" for s in segments]
+        )
+        self.local_areas, self.local_area_codes = _categorical(
+            [s.get("local_area") or "City of Sydney" for s in segments]
+        )
+        self.comfort = np.array(
+            [s.get("comfort_score", 0.0) for s in segments], dtype=np.float64
+        )
+        self.risk = np.array(
+            [s.get("crash_risk_score", 1.0) for s in segments], dtype=np.float64
+        )
+        self.bounds = np.array(
+            [_segment_bounds(s) for s in segments], dtype=np.float64
+        ).reshape(-1, 4)
+
+        # Segments with no geometry can never match a bbox query
+        located = np.flatnonzero(~np.isnan(self.bounds).any(axis=1))
+        self._tree_items = located
+        self.tree = STRTree(self.bounds[located])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def save(self, directory: Path) -> None:
+        """
+        Write every array (and the records as JSON) to directory as .npy
+        files.  The directory appears atomically; if another process got there
+        first, its copy wins.
+        """
+        tmp = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        records = self.records
+        if not isinstance(records, SegmentRecords):
+            records = SegmentRecords.encode(list(records))
+        arrays = {name.lstrip("_"): getattr(self, name) for name in self._ARRAYS}
+        arrays["records"] = records.blob
+        arrays["record_offsets"] = records.offsets
+        arrays["tree_order"] = self.tree.order
+        for level, bounds in enumerate(self.tree.levels):
+            arrays[f"tree_level_{level}"] = bounds
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+
+        (tmp / META_FILE).write_text(json.dumps({
+            "version": self.version,
+            "facility_types": self.facility_types,
+            "local_areas": self.local_areas,
+            "node_capacity": self.tree.node_capacity,
+            "tree_levels": len(self.tree.levels),
+        }))
+        try:
+            tmp.rename(directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / META_FILE).exists():
+                raise
+
+    @classmethod
+    def attach(cls, directory: Path) -> "SegmentStore":
+        """Map a saved store read-only; nothing but the metadata is copied."""
+        meta = json.loads((directory / META_FILE).read_text())
+
+        def load(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+
+        store = cls.__new__(cls)
+        store.version = meta["version"]
+        store.facility_types = tuple(meta["facility_types"])
+        store.local_areas = tuple(meta["local_areas"])
+        for name in cls._ARRAYS:
+            setattr(store, name, load(name.lstrip("_")))
+        store.records = SegmentRecords(load("records"), load("record_offsets"))
+        store.tree = STRTree.from_levels(
+            load("tree_order"),
+            [load(f"tree_level_{level}") for level in range(meta["tree_levels"])],
+            meta["node_capacity"],
+        )
+        return store
+
+    def query(
+        self,
+        bbox: tuple[float, float, float, float],
+        facility_type: str | None = None,
+        local_area: str | None = None,
+        min_comfort: float | None = None,
+        max_risk: float | None = None,
+    ) -> np.ndarray:
+        """
+        Return sorted segment indices intersecting bbox (west, south, east,
+        north) and passing every supplied attribute filter.
+        """
+        idx = self._tree_items[self.tree.query(*bbox)]
+        if not len(idx):
+            return idx
+
+        mask = np.ones(len(idx), dtype=bool)
+        if facility_type is not None:
+            if facility_type not in self.facility_types:
+                return idx[:0]
+            mask &= self.facility_codes[idx] == self.facility_types.index(facility_type)
+        if local_area is not None:
+            if local_area not in self.local_areas:
+                return idx[:0]
+            mask &= self.local_area_codes[idx] == self.local_areas.index(local_area)
+        if min_comfort is not None:
+            mask &= self.comfort[idx] >= min_comfort
+        if max_risk is not None:
+            mask &= self.risk[idx] <= max_risk
+
+        return np.sort(idx[mask])
+
+    def rows(self, idx: np.ndarray) -> list[dict]:
+        """Materialise segment dicts for the given indices."""
+        records = self.records
+        return [records[i] for i in idx.tolist()]
+
+
+def prune_shared(shared_dir: Path, keep: int = SHARED_VERSIONS_KEPT) -> None:
+    """
+    Delete all but the newest `keep` version directories.  Workers still
+    mapping a deleted version keep their pages until they unmap them.
+    """
+    versions = sorted(
+        (d for d in shared_dir.iterdir() if d.is_dir() and (d / META_FILE).exists()),
+        key=lambda d: d.stat().st_mtime,
+        reverse=True,
+    )
+    for stale in versions[keep:]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def build_shared(shared_dir: Path, directory: Path, build: Callable[[], None]) -> None:
+    """
+    Run build() (which writes directory) unless directory is already
+    complete.  Builds are serialised across processes by shared_dir's lock,
+    so only the first process does the work; older versions are pruned.
+    """
+    if (directory / META_FILE).exists():
+        return
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    with open(shared_dir / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not (directory / META_FILE).exists():
+            build()
+            prune_shared(shared_dir)
+
+
+def apply_usage(segments: list[dict], usage: dict[str, dict]) -> None:
+    """
+    Fold map-matched ride aggregates into segment scoring.
+
+    popularity_score becomes the segment's percentile rank by observed daily
+    trips; daily_bike_trips is filled from rides only where there are no
+    official bike counts.
+    """
+    observed = [s for s in segments if s["id"] in usage]
+    if not observed:
+        return
+
+    trips = np.array([usage[s["id"]]["daily_trips"] for s in observed], dtype=np.float64)
+    ranks = np.searchsorted(np.sort(trips), trips, side="right") / len(trips)
+    for segment, daily, rank in zip(observed, trips.tolist(), ranks.tolist()):
+        segment["popularity_score"] = round(rank, 3)
+        segment["observed_speed_kmh"] = usage[segment["id"]].get("avg_speed_kmh")
+        if not segment.get("has_bike_counts"):
+            segment["daily_bike_trips"] = round(daily)
+
+
+def load_segment_store(path: Path, shared_dir: Path | None = None) -> SegmentStore:
+    """
+    Load an ETL segments.json file, plus segment_usage.json beside it if
+    present.  The version is a digest of both files' bytes.
+
+    With shared_dir, the store is mapped from <shared_dir>/<version>/.  The
+    first process to get there builds it under a lock; the rest wait, then
+    map it without ever parsing the JSON.
+    """
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw)
+    usage_path = path.with_name(USAGE_FILE)
+    usage_raw = usage_path.read_bytes() if usage_path.exists() else None
+    if usage_raw is not None:
+        digest.update(usage_raw)
+    version = digest.hexdigest()[:12]
+
+    def build() -> SegmentStore:
+        segments = json.loads(raw)
+        if usage_raw is not None:
+            apply_usage(segments, json.loads(usage_raw)["segments"])
+        return SegmentStore(segments, version=version)
+
+    if shared_dir is None:
+        return build()
+
+    directory = shared_dir / version
+    build_shared(shared_dir, directory, lambda: build().save(directory))
+    return SegmentStore.attach(directory)
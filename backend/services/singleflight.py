@@ -0,0 +1,46 @@
+"""
+Micro2Move Sydney - Single-flight Request Coalescing
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller starts it, later callers await the same task, and everyone gets
+the same result or the same exception.  The call runs as its own task, so a
+caller disconnecting does not cancel it for the others.
+"""
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from services.metrics import counter
+
+T = TypeVar("T")
+
+calls = counter("singleflight_calls_total", "Calls started upstream", ["group"])
+coalesced = counter(
+    "singleflight_coalesced_total", "Callers that joined an in-flight call (upstream calls saved)", ["group"]
+)
+
+
+class SingleFlight:
+    def __init__(self, group: str):
+        self.group = group
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()   # retrieved here so an unawaited failure isn't logged as lost
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            calls.inc(group=self.group)
+        else:
+            coalesced.inc(group=self.group)
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,140 @@
+"""
+Micro2Move Sydney - Shared Supabase Clients
+
+One anon-key client (Supabase Auth sign-up / sign-in) and one service-role
+client (privileged table access) per worker, instead of a new client, HTTP
+session and TLS handshake on every request.  Their PostgREST and Auth HTTP
+clients keep up to SUPABASE_POOL_MAX_KEEPALIVE idle keep-alive connections
+and open at most SUPABASE_POOL_MAX_CONNECTIONS.
+
+The clients are supabase-py's async flavour: routers await every query and
+auth call, so a slow Supabase round trip never blocks the event loop.
+Offline jobs keep using the synchronous create_client().
+
+Both clients are shared across requests, so they never hold a user session:
+persist_session and auto_refresh_token are off, and the anon client is only
+used for stateless auth calls whose result is read from the return value.
+
+Every call is timed into supabase_request_seconds by table and operation
+(services.query_metrics).
+"""
+import logging
+
+import httpx
+from gotrue import AsyncMemoryStorage
+from gotrue.http_clients import AsyncClient as AuthHTTPClient
+from postgrest import AsyncPostgrestClient
+from postgrest.utils import AsyncClient as PostgrestHTTPClient
+from supabase import ClientOptions
+from supabase._async.auth_client import AsyncSupabaseAuthClient
+from supabase._async.client import AsyncClient
+
+from config import settings
+from services.query_metrics import TimedHTTPClient
+
+logger = logging.getLogger(__name__)
+
+_anon: AsyncClient | None = None
+_service: AsyncClient | None = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_SECONDS,
+    )
+
+
+class _TimedPostgrestHTTPClient(TimedHTTPClient, PostgrestHTTPClient):
+    pass
+
+
+class _TimedAuthHTTPClient(TimedHTTPClient, AuthHTTPClient):
+    pass
+
+
+class _PooledPostgrest(AsyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout, verify=True) -> PostgrestHTTPClient:
+        return _TimedPostgrestHTTPClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            follow_redirects=True,
+            http2=True,
+            limits=_limits(),
+        )
+
+
+class _PooledClient(AsyncClient):
+    """supabase AsyncClient whose PostgREST and Auth sessions use a bounded keep-alive pool."""
+
+    @staticmethod
+    def _init_supabase_auth_client(auth_url: str, client_options: ClientOptions) -> AsyncSupabaseAuthClient:
+        return AsyncSupabaseAuthClient(
+            url=auth_url,
+            auto_refresh_token=client_options.auto_refresh_token,
+            persist_session=client_options.persist_session,
+            storage=client_options.storage,
+            headers=client_options.headers,
+            flow_type=client_options.flow_type,
+            http_client=_TimedAuthHTTPClient(
+                timeout=settings.SUPABASE_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                http2=True,
+                limits=_limits(),
+            ),
+        )
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=None) -> AsyncPostgrestClient:
+        return _PooledPostgrest(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+    async def close(self) -> None:
+        if self._postgrest is not None:
+            await self._postgrest.aclose()
+        await self.auth.close()
+
+
+def _create(key: str) -> AsyncClient:
+    options = ClientOptions(
+        auto_refresh_token=False,
+        persist_session=False,
+        storage=AsyncMemoryStorage(),
+        postgrest_client_timeout=settings.SUPABASE_TIMEOUT_SECONDS,
+    )
+    return _PooledClient(settings.SUPABASE_URL, key, options)
+
+
+def anon_client() -> AsyncClient:
+    """Shared client with the anon key, for Supabase Auth operations."""
+    global _anon
+    if _anon is None:
+        _anon = _create(settings.SUPABASE_ANON_KEY)
+    return _anon
+
+
+def service_client() -> AsyncClient:
+    """Shared client with the service-role key, for privileged DB access."""
+    global _service
+    if _service is None:
+        _service = _create(settings.SUPABASE_SERVICE_KEY)
+    return _service
+
+
+def init_supabase() -> None:
+    """Create both clients up front; a misconfigured project is logged, not fatal."""
+    try:
+        anon_client()
+        service_client().postgrest   # opens the PostgREST session now rather than on first request
+    except Exception:
+        logger.exception("Supabase clients not initialised; check SUPABASE_URL and keys")
+
+
+async def close_supabase() -> None:
+    global _anon, _service
+    for client in (_anon, _service):
+        if client is not None:
+            await client.close()
+    _anon = _service = None
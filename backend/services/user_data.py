@@ -0,0 +1,170 @@
+"""
+Micro2Move Sydney - Hot Read Paths
+
+The reads behind the busiest account screens (profile and credit balance,
+the rider's bookings, bikes available for a date range), each implemented
+twice:
+
+- over Supabase REST (PostgREST) with the shared service client;
+- directly against Postgres through the SQLAlchemy engine in database.py,
+  which skips the HTTP hop, JSON encoding in PostgREST and the per-request
+  role switch, and reuses prepared statements on pooled connections.
+
+DB_DIRECT_READS picks the path.  Both return dicts with the same keys (the
+direct path with native date and Decimal values where REST has strings and
+numbers; the routers' response models accept either).  Credits are read
+with the profile row.  scripts.bench_db_paths compares the two paths query
+by query.
+"""
+from datetime import date
+
+from sqlalchemy import Uuid, column, desc, or_, select, table
+
+from config import settings
+from database import engine
+from services.supabase_clients import service_client
+
+PROFILE_COLUMNS = ("user_id", "full_name", "email", "profile_image_link", "credits", "verified_id")
+BOOKING_COLUMNS = (
+    "booking_id", "booking_date_time", "start_date", "end_date", "booking_status_name",
+    "total_amount", "e_bike_id", "e_bike_name",
+)
+BIKE_COLUMNS = (
+    "e_bike_id", "e_bike_name", "price_per_week", "available_from_date", "available_to_date",
+    "e_bike_category_name", "pick_up_geo_location_id",
+)
+
+# uuid columns bind as ::UUID and come back as strings, like over REST
+UUID_COLUMNS = {"user_id", "booking_id", "e_bike_id", "renter_user_id", "pick_up_geo_location_id"}
+
+
+def _table(name: str, columns: tuple[str, ...]):
+    return table(
+        name,
+        *(column(c, Uuid(as_uuid=False)) if c in UUID_COLUMNS else column(c) for c in columns),
+        schema=settings.DB_SCHEMA,
+    )
+
+
+# Lightweight table clauses: credits and verified_id are Supabase-managed
+# columns the ORM models don't declare, and the other two are views.  They
+# name their schema, so they resolve whatever a pooler does to search_path.
+users = _table("users", PROFILE_COLUMNS)
+booking_summary = _table("v_booking_summary", (*BOOKING_COLUMNS, "renter_user_id"))
+available_bikes = _table("v_available_bikes", BIKE_COLUMNS)
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+
+def profile_query(user_id: str):
+    return select(users).where(users.c.user_id == user_id)
+
+
+def bookings_query(user_id: str, limit: int):
+    return (
+        select(*(booking_summary.c[c] for c in BOOKING_COLUMNS))
+        .where(booking_summary.c.renter_user_id == user_id)
+        .order_by(desc(booking_summary.c.start_date))
+        .limit(limit)
+    )
+
+
+def available_bikes_query(start: date, end: date, limit: int):
+    """Listed bikes whose availability window covers start..end."""
+    return (
+        select(available_bikes)
+        .where(available_bikes.c.available_from_date <= start)
+        .where(or_(available_bikes.c.available_to_date.is_(None), available_bikes.c.available_to_date >= end))
+        .order_by(available_bikes.c.price_per_week)
+        .limit(limit)
+    )
+
+
+async def _direct(query) -> list[dict]:
+    async with engine.connect() as conn:
+        result = await conn.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+
+# ---------------------------------------------------------------------------
+# REST (PostgREST) path
+# ---------------------------------------------------------------------------
+
+
+async def rest_profile(user_id: str) -> dict | None:
+    result = await service_client().table("users").select(
+        ", ".join(PROFILE_COLUMNS)
+    ).eq("user_id", user_id).maybe_single().execute()
+    return result.data if result is not None else None
+
+
+async def rest_bookings(user_id: str, limit: int = 20) -> list[dict]:
+    result = await (
+        service_client().table("v_booking_summary")
+        .select(", ".join(BOOKING_COLUMNS))
+        .eq("renter_user_id", user_id)
+        .order("start_date", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return result.data
+
+
+async def rest_available_bikes(start: date, end: date, limit: int = 50) -> list[dict]:
+    result = await (
+        service_client().table("v_available_bikes")
+        .select(", ".join(BIKE_COLUMNS))
+        .lte("available_from_date", start.isoformat())
+        .or_(f"available_to_date.is.null,available_to_date.gte.{end.isoformat()}")
+        .order("price_per_week")
+        .limit(limit)
+        .execute()
+    )
+    return result.data
+
+
+# ---------------------------------------------------------------------------
+# Direct (asyncpg) path
+# ---------------------------------------------------------------------------
+
+
+async def direct_profile(user_id: str) -> dict | None:
+    rows = await _direct(profile_query(user_id))
+    return rows[0] if rows else None
+
+
+async def direct_bookings(user_id: str, limit: int = 20) -> list[dict]:
+    return await _direct(bookings_query(user_id, limit))
+
+
+async def direct_available_bikes(start: date, end: date, limit: int = 50) -> list[dict]:
+    return await _direct(available_bikes_query(start, end, limit))
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+async def get_profile(user_id: str) -> dict | None:
+    """Profile row, including the credit balance; None if there is none."""
+    if settings.DB_DIRECT_READS:
+        return await direct_profile(user_id)
+    return await rest_profile(user_id)
+
+
+async def get_bookings(user_id: str, limit: int = 20) -> list[dict]:
+    """The user's bookings, most recent start date first."""
+    if settings.DB_DIRECT_READS:
+        return await direct_bookings(user_id, limit)
+    return await rest_bookings(user_id, limit)
+
+
+async def get_available_bikes(start: date, end: date, limit: int = 50) -> list[dict]:
+    """Listed bikes available for the whole of start..end, cheapest first."""
+    if settings.DB_DIRECT_READS:
+        return await direct_available_bikes(start, end, limit)
+    return await rest_available_bikes(start, end, limit)
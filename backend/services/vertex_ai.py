@@ -1,11 +1,70 @@
 """
 Micro2Move Sydney - Gemini AI Route Planning Service
+
+Routes are computed locally (services.routing) from the segment graph;
+Gemini only narrates the chosen route from a compact summary.  Without
+network data it falls back to proposing the whole route itself.
+
+Model calls go through the SDK's async client (client.aio), so a generation
+never blocks the event loop; stream_route_insight() streams the answer.  At
+most GEMINI_MAX_CONCURRENCY calls are in flight per process; each call,
+including its wait for a slot, is bounded by GEMINI_TIMEOUT_SECONDS.
+
+Every call records latency, slot wait, prompt/response size and tokens,
+errors by class, and whether the answer parsed as JSON (gemini_* metrics
+at GET /metrics).
 """
-from google import genai
+import asyncio
 import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from google import genai
+
 from config import settings
+from services.json_stream import JSONStreamParser
+from services.metrics import counter, gauge, histogram
+from services.network_loader import get_routing_graph
+from services.routing import (
+    RouteWeights,
+    local_badges,
+    local_insight,
+    local_warnings,
+    parse_refinement,
+    plan_route,
+    refine_plan,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_NARRATED_STREETS = 8      # street list sent to the model for narration
+SIZE_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
 
 client = None
+_model_slots = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+_in_flight = 0                # calls holding a _model_slots slot
+
+tokens = counter("gemini_tokens_total", "Gemini tokens used", ["direction"])
+call_seconds = histogram(
+    "gemini_call_seconds", "Gemini call latency, including the wait for a slot", ["operation", "mode", "outcome"]
+)
+slot_wait_seconds = histogram("gemini_slot_wait_seconds", "Time spent waiting for a GEMINI_MAX_CONCURRENCY slot")
+message_chars = histogram("gemini_message_chars", "Prompt and response sizes in characters", ["direction"], SIZE_BUCKETS)
+message_tokens = histogram("gemini_message_tokens", "Prompt and response sizes in tokens", ["direction"], SIZE_BUCKETS)
+errors = counter("gemini_errors_total", "Failed Gemini calls by error class", ["operation", "error"])
+parses = counter(
+    "gemini_parse_total", "Model answers by whether they parsed as JSON or hit the fallback", ["operation", "result"]
+)
+gauge(
+    "gemini_in_flight", "Gemini calls holding a slot",
+    lambda: float(_in_flight),
+)
+
+
+class ModelTimeoutError(Exception):
+    """The model did not answer within GEMINI_TIMEOUT_SECONDS."""
 
 
 def init_gemini():
@@ -22,22 +81,136 @@ def get_client():
     return client
 
 
-async def generate_route_insight(
-    start_location: str,
-    description: str = "",
-    scenery: str = "",
-    utilities: str = "",
-    distance_km: int = 25,
-    ride_type: str = "commute",
-    safety_priority: int = 90,
-    shade_priority: int = 50,
-    hills_avoid: int = 20,
-) -> dict:
-    """Generate an AI-powered route insight using Gemini."""
+async def _acquire_slot() -> None:
+    global _in_flight
+    waited = time.perf_counter()
+    await _model_slots.acquire()
+    _in_flight += 1
+    slot_wait_seconds.observe(time.perf_counter() - waited)
+
+
+def _release_slot() -> None:
+    global _in_flight
+    _in_flight -= 1
+    _model_slots.release()
+
 
+async def _generate(prompt: str, operation: str) -> str:
+    """Send one prompt to Gemini and return the response text."""
     c = get_client()
+    started = time.perf_counter()
 
-    prompt = f"""You are a Sydney cycling route AI for the Micro2Move app.
+    async def call():
+        await _acquire_slot()
+        try:
+            return await c.aio.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=prompt,
+            )
+        finally:
+            _release_slot()
+
+    try:
+        response = await asyncio.wait_for(call(), timeout=settings.GEMINI_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        _record(operation, "generate", started, prompt, "", None, ModelTimeoutError.__name__)
+        raise _timeout() from None
+    except Exception as exc:
+        _record(operation, "generate", started, prompt, "", None, type(exc).__name__)
+        raise
+    text = response.text or ""
+    _record(operation, "generate", started, prompt, text, response.usage_metadata)
+    return text
+
+
+async def _generate_stream(prompt: str, operation: str) -> AsyncIterator[str]:
+    """Send one prompt to Gemini and yield the response text as it arrives."""
+    c = get_client()
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    deadline = loop.time() + settings.GEMINI_TIMEOUT_SECONDS
+    text, usage = "", None
+
+    try:
+        await asyncio.wait_for(_acquire_slot(), timeout=deadline - loop.time())
+        try:
+            stream = await asyncio.wait_for(
+                c.aio.models.generate_content_stream(model="gemini-2.0-flash", contents=prompt),
+                timeout=deadline - loop.time(),
+            )
+            chunks = aiter(stream)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), timeout=deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if chunk.text:
+                    text += chunk.text
+                    yield chunk.text
+        finally:
+            _release_slot()
+    except asyncio.TimeoutError:
+        _record(operation, "stream", started, prompt, text, usage, ModelTimeoutError.__name__)
+        raise _timeout() from None
+    except Exception as exc:
+        _record(operation, "stream", started, prompt, text, usage, type(exc).__name__)
+        raise
+    _record(operation, "stream", started, prompt, text, usage)
+
+
+def _record(
+    operation: str,
+    mode: str,
+    started: float,
+    prompt: str,
+    text: str,
+    usage,
+    error: str | None = None,
+) -> None:
+    """
+    Metrics for one model call.  Sizes and tokens are recorded for completed
+    calls only; token counts come from the SDK's usage_metadata, estimated at
+    ~4 characters a token when it reports none.
+    """
+    elapsed = time.perf_counter() - started
+    call_seconds.observe(elapsed, operation=operation, mode=mode, outcome="error" if error else "ok")
+    if error:
+        errors.inc(operation=operation, error=error)
+        logger.debug("Gemini %s (%s) failed after %.2fs: %s", operation, mode, elapsed, error)
+        return
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or len(prompt) // 4
+    response_tokens = getattr(usage, "candidates_token_count", None) or len(text) // 4
+    for direction, chars, n in (("prompt", len(prompt), prompt_tokens), ("response", len(text), response_tokens)):
+        message_chars.observe(chars, direction=direction)
+        message_tokens.observe(n, direction=direction)
+        tokens.inc(n, direction=direction)
+    logger.debug(
+        "Gemini %s (%s) in %.2fs: %d prompt / %d response tokens",
+        operation, mode, elapsed, prompt_tokens, response_tokens,
+    )
+
+
+def tokens_used() -> float:
+    return tokens.value(direction="prompt") + tokens.value(direction="response")
+
+
+def _timeout() -> ModelTimeoutError:
+    return ModelTimeoutError(f"Gemini did not respond within {settings.GEMINI_TIMEOUT_SECONDS:g}s")
+
+
+def _route_prompt(
+    start_location: str,
+    description: str,
+    scenery: str,
+    utilities: str,
+    distance_km: int,
+    ride_type: str,
+    safety_priority: int,
+    shade_priority: int,
+    hills_avoid: int,
+) -> str:
+    return f"""You are a Sydney cycling route AI for the Micro2Move app.
 Generate a cycling route recommendation based on these preferences:
 
 - Start: {start_location}
@@ -70,32 +243,213 @@ Respond in JSON format:
   "warnings": ["optional warnings"]
 }}"""
 
-    response = c.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=prompt,
-    )
-    text = response.text
 
-    # Parse JSON from response
+def _fallback_route(text: str, start_location: str, distance_km: int, safety_priority: int) -> dict:
+    """Route to return when the model's answer isn't parseable JSON."""
+    return {
+        "insight": text,
+        "route_name": f"{start_location} Loop",
+        "distance_km": distance_km,
+        "estimated_minutes": int(distance_km * 3),
+        "elevation_gain_m": 40,
+        "safety_score": safety_priority,
+        "segments": [],
+        "badges": ["AI Generated"],
+        "warnings": [],
+    }
+
+
+def _parse_json(text: str, operation: str) -> dict | None:
+    """JSON object from a model answer, tolerating markdown code fences."""
+    parsed = _decode_json(text)
+    _count_parse(operation, parsed)
+    return parsed
+
+
+def _count_parse(operation: str, parsed: dict | None) -> None:
+    parses.inc(operation=operation, result="fallback" if parsed is None else "ok")
+
+
+def _decode_json(text: str) -> dict | None:
     try:
-        # Handle markdown code blocks in response
         if "```json" in text:
             text = text.split("```json")[1].split("```")[0]
         elif "```" in text:
             text = text.split("```")[1].split("```")[0]
-        return json.loads(text.strip())
+        parsed = json.loads(text.strip())
     except (json.JSONDecodeError, IndexError):
-        return {
-            "insight": text,
-            "route_name": f"{start_location} Loop",
-            "distance_km": distance_km,
-            "estimated_minutes": int(distance_km * 3),
-            "elevation_gain_m": 40,
-            "safety_score": safety_priority,
-            "segments": [],
-            "badges": ["AI Generated"],
-            "warnings": [],
-        }
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _narration_prompt(route: dict, ride_type: str, scenery: str, utilities: str, description: str) -> str:
+    stats = route["stats"]
+    streets = "; ".join(
+        f"{s['name']} ({s['distance_km']} km, {s['type']}{', ' + s['note'] if s['note'] else ''})"
+        for s in route["segments"][:MAX_NARRATED_STREETS]
+    )
+    return f"""You are a Sydney cycling route AI for the Micro2Move app.
+Describe this {ride_type} loop from {route['start']}. The route is fixed: do not change streets or numbers.
+{route['distance_km']} km, ~{route['estimated_minutes']} min, {route['elevation_gain_m']} m climbing, safety {route['safety_score']}/100, {round(stats['protected_share'] * 100)}% protected, {round(stats['shade_share'] * 100)}% green space.
+Streets in order: {streets}
+Rider wants: {description or 'none'}; scenery {scenery or 'any'}; utilities {utilities or 'none'}.
+Respond in JSON: {{"insight": "2-3 sentences naming the streets", "route_name": "Short name", "badges": ["..."], "warnings": ["..."]}}"""
+
+
+def _narrated(route: dict, narration: dict | None) -> dict:
+    """Merge the model's narration into the locally computed route."""
+    narration = narration or {}
+    warnings = local_warnings(route)
+    warnings += [w for w in narration.get("warnings") or [] if isinstance(w, str) and w not in warnings]
+    return {
+        "insight": narration.get("insight") or local_insight(route),
+        "route_name": narration.get("route_name") or f"{route['start']} Loop",
+        **route,
+        "badges": narration.get("badges") or local_badges(route),
+        "warnings": warnings,
+        "route_source": "local",
+    }
+
+
+async def _plan(
+    start_location: str,
+    distance_km: int,
+    ride_type: str,
+    safety_priority: int,
+    shade_priority: int,
+    hills_avoid: int,
+) -> dict | None:
+    """Compute the route from the segment graph, off the event loop."""
+    graph = get_routing_graph()
+    if graph is None:
+        return None
+    weights = RouteWeights.from_sliders(safety_priority, shade_priority, hills_avoid)
+    return await asyncio.to_thread(plan_route, graph, start_location, distance_km, ride_type, weights)
+
+
+async def generate_route_insight(
+    start_location: str,
+    description: str = "",
+    scenery: str = "",
+    utilities: str = "",
+    distance_km: int = 25,
+    ride_type: str = "commute",
+    safety_priority: int = 90,
+    shade_priority: int = 50,
+    hills_avoid: int = 20,
+) -> dict:
+    """
+    Route recommendation.  The route itself is computed locally from the
+    segment graph and Gemini only writes the insight, name and badges; if no
+    network data is loaded, Gemini proposes the whole route as before.
+    """
+    route = await _plan(start_location, distance_km, ride_type, safety_priority, shade_priority, hills_avoid)
+    if route is not None:
+        text = await _generate(_narration_prompt(route, ride_type, scenery, utilities, description), "narrate")
+        return _narrated(route, _parse_json(text, "narrate"))
+
+    text = await _generate(_route_prompt(
+        start_location, description, scenery, utilities, distance_km,
+        ride_type, safety_priority, shade_priority, hills_avoid,
+    ), "route")
+    parsed = _parse_json(text, "route")
+    return parsed or _fallback_route(text, start_location, distance_km, safety_priority)
+
+
+async def stream_route_insight(
+    start_location: str,
+    description: str = "",
+    scenery: str = "",
+    utilities: str = "",
+    distance_km: int = 25,
+    ride_type: str = "commute",
+    safety_priority: int = 90,
+    shade_priority: int = 50,
+    hills_avoid: int = 20,
+) -> AsyncIterator[tuple[tuple, Any]]:
+    """
+    Streaming generate_route_insight: yields (path, value) for each part of
+    the route as soon as it is known (see services.json_stream), ending with
+    ((), complete route).  Locally computed segments come first, then the
+    model's insight and name as it writes them.
+    """
+    route = await _plan(start_location, distance_km, ride_type, safety_priority, shade_priority, hills_avoid)
+    if route is not None:
+        for i, segment in enumerate(route["segments"]):
+            yield ("segments", i), segment
+        prompt = _narration_prompt(route, ride_type, scenery, utilities, description)
+    else:
+        prompt = _route_prompt(
+            start_location, description, scenery, utilities, distance_km,
+            ride_type, safety_priority, shade_priority, hills_avoid,
+        )
+
+    parser = JSONStreamParser()
+    text = ""
+    parsed = None
+    parsing = True
+    operation = "route" if route is None else "narrate"
+    async for chunk in _generate_stream(prompt, operation):
+        text += chunk
+        if not parsing:
+            continue
+        try:
+            for path, value in parser.feed(chunk):
+                if path == ():
+                    parsed = value
+                elif route is None or path in (("insight",), ("route_name",)):
+                    yield path, value
+        except ValueError:
+            parsing = False
+
+    _count_parse(operation, parsed)
+    if route is not None:
+        yield (), _narrated(route, parsed)
+    else:
+        yield (), parsed or _fallback_route(text, start_location, distance_km, safety_priority)
+
+
+async def generate_route_locally(
+    start_location: str,
+    description: str = "",
+    scenery: str = "",
+    utilities: str = "",
+    distance_km: int = 25,
+    ride_type: str = "commute",
+    safety_priority: int = 90,
+    shade_priority: int = 50,
+    hills_avoid: int = 20,
+) -> dict | None:
+    """generate_route_insight() without the model: local route, template insight."""
+    route = await _plan(start_location, distance_km, ride_type, safety_priority, shade_priority, hills_avoid)
+    return None if route is None else _narrated(route, None)
+
+
+async def refine_locally(
+    current_route: dict,
+    refinement_prompt: str,
+    safety_vs_direct: int = 75,
+    shade_vs_speed: int = 30,
+) -> dict | None:
+    """
+    Refine a locally computed route by re-planning it with the new slider
+    weights, without calling the model.  Returns None when the route did not
+    come from the local engine or the prompt asks for something the weights
+    cannot express; use refine_route() then.
+    """
+    graph = get_routing_graph()
+    if graph is None:
+        return None
+    changes, understood = parse_refinement(refinement_prompt)
+    if not understood:
+        return None
+    route = await asyncio.to_thread(
+        refine_plan, graph, current_route, changes, safety_vs_direct, shade_vs_speed
+    )
+    if route is None:
+        return None
+    name = current_route.get("route_name")
+    return {**_narrated(route, {"route_name": name} if name else None), "refine_path": "local"}
 
 
 async def refine_route(
@@ -104,9 +458,7 @@ async def refine_route(
     safety_vs_direct: int = 75,
     shade_vs_speed: int = 30,
 ) -> dict:
-    """Refine an existing route based on user feedback."""
-
-    c = get_client()
+    """Refine an existing route based on user feedback, via the model."""
 
     prompt = f"""You are a Sydney cycling route AI for the Micro2Move app.
 The user wants to refine their current route.
@@ -122,27 +474,20 @@ Shade vs Speed preference: {shade_vs_speed}/100 (higher = more shade)
 
 Respond in the same JSON format as route generation, with updated values reflecting the refinement."""
 
-    response = c.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=prompt,
-    )
-    text = response.text
+    text = await _generate(prompt, "refine")
 
-    try:
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-        return json.loads(text.strip())
-    except (json.JSONDecodeError, IndexError):
-        return {
-            "insight": text,
-            "route_name": "Refined Route",
-            "distance_km": current_route.get("distance_km", 25),
-            "estimated_minutes": current_route.get("estimated_minutes", 75),
-            "elevation_gain_m": current_route.get("elevation_gain_m", 40),
-            "safety_score": min(current_route.get("safety_score", 90) + 5, 100),
-            "segments": current_route.get("segments", []),
-            "badges": ["AI Refined"],
-            "warnings": [],
-        }
+    parsed = _parse_json(text, "refine")
+    if parsed is not None:
+        return {**parsed, "refine_path": "llm"}
+    return {
+        "insight": text,
+        "route_name": "Refined Route",
+        "distance_km": current_route.get("distance_km", 25),
+        "estimated_minutes": current_route.get("estimated_minutes", 75),
+        "elevation_gain_m": current_route.get("elevation_gain_m", 40),
+        "safety_score": min(current_route.get("safety_score", 90) + 5, 100),
+        "segments": current_route.get("segments", []),
+        "badges": ["AI Refined"],
+        "warnings": [],
+        "refine_path": "llm",
+    }
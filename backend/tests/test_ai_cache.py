@@ -0,0 +1,34 @@
+"""
+services.ai_cache key normalisation and network versioning.
+"""
+import pytest
+
+from services import ai_cache
+from services.ai_cache import generate_key, publish_network, veloway_key
+
+PARAMS = dict(
+    start_location="Circular Quay", description="", scenery="harbour", utilities="",
+    distance_km=10, ride_type="leisure", safety_priority=70, shade_priority=50, hills_avoid=50,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_network_version():
+    version = ai_cache._network_version
+    yield
+    publish_network(version)
+
+
+def test_near_duplicate_requests_share_a_key():
+    same = dict(PARAMS, start_location="circular quay, Sydney NSW 2000", safety_priority=72)
+    assert generate_key(**same) == generate_key(**PARAMS)
+
+
+def test_keys_change_with_the_network_version():
+    publish_network("aaa")
+    before = generate_key(**PARAMS), veloway_key("v1")
+    publish_network("bbb")
+    assert generate_key(**PARAMS) != before[0]
+    assert veloway_key("v1") != before[1]
+    publish_network("aaa")
+    assert (generate_key(**PARAMS), veloway_key("v1")) == before
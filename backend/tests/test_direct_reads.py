@@ -0,0 +1,68 @@
+"""
+DB_DIRECT_READS paths of services.user_data: query budgets, and the schema they read.
+"""
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import database
+from config import settings
+from services.user_data import BOOKING_COLUMNS, available_bikes_query, bookings_query, profile_query
+
+PASSWORD = "supersecret123"
+
+
+def booking(renter: uuid.UUID, n: int) -> tuple:
+    # Uuid columns are stored as 32-digit hex on SQLite
+    row = {
+        "booking_id": uuid.uuid4().hex,
+        "booking_date_time": f"2025-03-{n + 1:02d}T08:00:00",
+        "start_date": f"2025-03-{n + 2:02d}",
+        "end_date": f"2025-03-{n + 9:02d}",
+        "booking_status_name": "confirmed",
+        "total_amount": 40.0 + n,
+        "e_bike_id": uuid.uuid4().hex,
+        "e_bike_name": f"Bike {n}",
+    }
+    return (*(row[c] for c in BOOKING_COLUMNS), renter.hex)
+
+
+def test_bookings_take_one_query(api, fake_supabase, direct_db, query_budget):
+    user = fake_supabase.create_user("alex@example.com", PASSWORD)
+    renter, other = uuid.UUID(user["id"]), uuid.uuid4()
+    placeholders = ", ".join("?" * (len(BOOKING_COLUMNS) + 1))
+    direct_db.executemany(
+        f"INSERT INTO micro2move.v_booking_summary VALUES ({placeholders})",
+        [booking(renter, n) for n in range(12)] + [booking(other, n) for n in range(3)],
+    )
+    headers = {"Authorization": f"Bearer {fake_supabase.access_token(user)}"}
+
+    with query_budget(1):
+        reply = api.get("/api/v1/users/me/bookings", headers=headers, params={"limit": 10})
+
+    assert reply.status_code == 200
+    bookings = reply.json()
+    assert len(bookings) == 10
+    assert [b["start_date"] for b in bookings] == sorted((b["start_date"] for b in bookings), reverse=True)
+    assert fake_supabase.calls["GET /rest/v1/v_booking_summary"] == 0
+
+
+@pytest.mark.parametrize("query, relation", [
+    (profile_query(str(uuid.uuid4())), "users"),
+    (bookings_query(str(uuid.uuid4()), 20), "v_booking_summary"),
+    (available_bikes_query(date(2025, 3, 1), date(2025, 3, 8), 50), "v_available_bikes"),
+])
+def test_direct_reads_name_the_app_schema(query, relation):
+    sql = str(query.compile(dialect=postgresql.asyncpg.dialect()))
+    assert f"FROM micro2move.{relation}" in sql
+
+
+def test_postgres_connections_start_on_the_app_schema(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://app@db.example.com/postgres")
+    connect_args = database._engine_options()["connect_args"]
+    assert connect_args["server_settings"] == {"search_path": "micro2move, public"}
+
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+psycopg://app@db.example.com/postgres")
+    assert database._engine_options()["connect_args"] == {"options": "-csearch_path=micro2move,public"}
@@ -0,0 +1,47 @@
+"""
+services.eager_loading profiles, each held to its query budget, and the
+model metadata they load from.
+"""
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from scripts.bench_loader_profiles import seed
+from services.eager_loading import LOADER_PROFILES, loader_query
+from services.query_budget import query_budget
+
+
+def test_model_tables_resolve_through_the_search_path():
+    # Qualified and unqualified tables cannot reference each other, and
+    # database.engine's search_path is what puts them in DB_SCHEMA
+    assert {table.schema for table in Base.metadata.sorted_tables} == {None}
+
+
+@pytest.mark.parametrize("name", sorted(LOADER_PROFILES))
+def test_profile_stays_within_its_budget(name):
+    profile = LOADER_PROFILES[name]
+
+    async def load():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = async_sessionmaker(engine, expire_on_commit=False)
+            async with sessions() as session:
+                await seed(session, 20, 3, random.Random(1))
+            pk = inspect(profile.entity).primary_key[0]
+            async with sessions() as session:
+                ids = (await session.execute(select(pk).limit(10))).scalars().all()
+                with query_budget(profile.queries, engine):
+                    parents = (await session.execute(loader_query(name, pk.in_(ids)))).unique().scalars().all()
+            return ids, parents
+        finally:
+            await engine.dispose()
+
+    ids, parents = asyncio.run(load())
+    assert ids and len(parents) == len(ids)
@@ -0,0 +1,52 @@
+"""
+services.provisioning through register, GET /users/me and jobs.reconcile_profiles.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import settings
+from jobs import reconcile_profiles
+
+EMAIL = "alex@example.com"
+PASSWORD = "supersecret123"
+
+
+@pytest.fixture(autouse=True)
+def welcome_credits(monkeypatch):
+    monkeypatch.setattr(settings, "WELCOME_CREDITS", 50)
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_welcome_credits_are_granted_and_recorded_once(api, fake_supabase):
+    reply = api.post("/api/v1/auth/register", json={"full_name": "Alex Smith", "email": EMAIL, "password": PASSWORD})
+    assert reply.status_code == 201
+    body = reply.json()
+
+    assert api.get("/api/v1/users/me", headers=auth(body["access_token"])).json()["credits"] == 50
+    reconcile_profiles.run(dry_run=False)
+
+    assert [row["credits"] for row in fake_supabase.rows("users", user_id=body["user_id"])] == [50]
+    ledger = fake_supabase.rows("credit_transactions", user_id=body["user_id"])
+    assert [(row["amount"], row["reason"]) for row in ledger] == [(50, "welcome credits")]
+
+
+def test_new_account_without_profile_is_provisioned_inline(api, fake_supabase):
+    user = fake_supabase.create_user(EMAIL, PASSWORD, {"full_name": "Alex Smith"})
+    reply = api.get("/api/v1/users/me", headers=auth(fake_supabase.access_token(user)))
+    assert reply.status_code == 200
+    assert reply.json()["credits"] == 50
+
+
+def test_deleted_profile_of_an_old_account_is_not_recreated(api, fake_supabase):
+    user = fake_supabase.create_user(EMAIL, PASSWORD, {"full_name": "Alex Smith"})
+    created = datetime.now(timezone.utc) - timedelta(seconds=settings.PROVISION_INLINE_MAX_AGE_SECONDS + 60)
+    fake_supabase.seed("auth.users", [{**user, "created_at": created.isoformat()}])
+
+    reply = api.get("/api/v1/users/me", headers=auth(fake_supabase.access_token(user)))
+    assert reply.status_code == 404
+    assert fake_supabase.rows("users", user_id=user["id"]) == []
+    assert fake_supabase.rows("credit_transactions", user_id=user["id"]) == []
@@ -0,0 +1,65 @@
+"""
+services.rate_limit: login buckets, and routers.auth charging them.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from services import rate_limit
+from services.rate_limit import MemoryBucketStore, Policy, RateLimiter, charge_failure, enforce
+
+EMAIL = "rider@example.com"
+PASSWORD = "correct-horse"
+
+
+def request_from(ip: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (ip, 50000)})
+
+
+@pytest.fixture
+def limiter(monkeypatch) -> RateLimiter:
+    limiter = RateLimiter(MemoryBucketStore(1000), {"login": Policy(rate=1 / 60, burst=3)})
+    monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+    return limiter
+
+
+def test_attempts_naming_an_account_do_not_spend_its_bucket(limiter):
+    async def attempts():
+        for n in range(10):
+            await enforce(request_from(f"10.0.0.{n}"), "login", user=EMAIL, charge_user=False)
+
+    asyncio.run(attempts())
+
+
+def test_failed_sign_ins_lock_the_account_from_any_ip(limiter):
+    async def attempts():
+        for _ in range(3):
+            await charge_failure("login", EMAIL.upper())
+        await enforce(request_from("10.0.0.99"), "login", user=EMAIL, charge_user=False)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(attempts())
+    assert raised.value.status_code == 429
+    assert int(raised.value.headers["Retry-After"]) > 0
+
+
+def test_ip_bucket_still_limits_bursts(limiter):
+    async def attempts():
+        for n in range(4):
+            await enforce(request_from("10.0.0.1"), "login", user=f"rider{n}@example.com", charge_user=False)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(attempts())
+
+
+def test_login_charges_the_account_only_on_failure(api, fake_supabase):
+    fake_supabase.create_user(EMAIL, PASSWORD)
+    store = rate_limit.rate_limiter.store
+    for _ in range(3):
+        assert api.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
+    assert f"login:user:{EMAIL}" not in store._buckets
+
+    assert api.post("/api/v1/auth/login", json={"email": EMAIL, "password": "wrong-pass"}).status_code == 401
+    assert f"login:user:{EMAIL}" in store._buckets
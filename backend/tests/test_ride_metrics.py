@@ -0,0 +1,84 @@
+"""
+services.ride_metrics.compute_ride_metrics and the backfill job's row updates.
+"""
+import numpy as np
+import pytest
+
+from jobs.backfill_ride_metrics import metrics_for_page
+from services.polyline import encode_array
+from services.ride_metrics import MAX_SPEED_KMH, compute_ride_metrics, haversine_m
+
+LAT = -33.87
+DEG_LNG_PER_KM = 1 / (111.320 * np.cos(np.radians(LAT)))
+
+
+def straight(n: int = 11, km: float = 1.0) -> np.ndarray:
+    """n evenly spaced fixes along a km-long east-west line in the CBD."""
+    return np.column_stack([np.full(n, LAT), 151.20 + np.linspace(0, km * DEG_LNG_PER_KM, n)])
+
+
+def spiked(track: np.ndarray, *fixes: int, offset: float = 0.02) -> np.ndarray:
+    """track with the given fixes thrown ~2 km north, as a GPS glitch does."""
+    track = track.copy()
+    track[list(fixes), 0] += offset
+    return track
+
+
+def measure(tracks: list[np.ndarray], durations_s: list[float]) -> dict[str, np.ndarray]:
+    offsets = np.concatenate([[0], np.cumsum([len(t) for t in tracks])])
+    return compute_ride_metrics(np.vstack(tracks), offsets, np.array(durations_s, dtype=np.float64))
+
+
+def test_straight_line_at_riding_speed():
+    metrics = measure([straight()], [240])
+    assert metrics["distance_km"][0] == pytest.approx(1.0, abs=0.005)
+    assert metrics["avg_speed"][0] == pytest.approx(15.0, abs=0.1)
+    assert metrics["max_speed"][0] == pytest.approx(15.0, abs=0.1)
+
+
+def test_straight_line_too_fast_is_not_double_counted():
+    # 1 km in 30 s: every step is an outlier; none may be bridged twice
+    metrics = measure([straight()], [30])
+    assert metrics["distance_km"][0] <= 1.0
+    assert metrics["avg_speed"][0] <= MAX_SPEED_KMH
+    assert metrics["max_speed"][0] <= MAX_SPEED_KMH
+
+
+@pytest.mark.parametrize("fixes", [(4,), (4, 5), (3, 4, 5)])
+def test_spike_cluster_is_bridged(fixes):
+    metrics = measure([spiked(straight(), *fixes)], [240])
+    assert metrics["distance_km"][0] == pytest.approx(1.0, abs=0.005)
+    assert metrics["max_speed"][0] <= MAX_SPEED_KMH
+
+
+def test_multiple_spikes_across_a_batch():
+    tracks = [spiked(straight(), 2, 6, 7), straight(), spiked(straight(), 4, 5), straight(2, km=0.05)]
+    metrics = measure(tracks, [240, 240, 240, 12])
+    assert metrics["distance_km"].tolist() == pytest.approx([1.0, 1.0, 1.0, 0.05], abs=0.005)
+    assert metrics["avg_speed"].tolist() == pytest.approx([15.0, 15.0, 15.0, 15.0], abs=0.1)
+
+
+def test_spike_on_last_fix_is_dropped():
+    track = spiked(straight(), 10)
+    metrics = measure([track], [240])
+    lost = haversine_m(*straight()[9], *straight()[10]) / 1000
+    assert metrics["distance_km"][0] == pytest.approx(1.0 - lost, abs=0.005)
+
+
+def test_untimed_ride_counts_distance_only():
+    metrics = measure([straight()], [0])
+    assert metrics["distance_km"][0] == pytest.approx(1.0, abs=0.005)
+    assert metrics["avg_speed"][0] == 0
+
+
+def test_backfill_keeps_duration_of_untimed_rides():
+    polyline = encode_array(straight())
+    rows = [
+        {"id": 1, "actual_polyline": polyline, "start_time": "2025-03-01T08:00:00+00:00",
+         "end_time": "2025-03-01T08:04:00+00:00"},
+        {"id": 2, "actual_polyline": polyline, "start_time": "2025-03-01T09:00:00+00:00", "end_time": None},
+    ]
+    timed, untimed = metrics_for_page(rows)
+    assert timed["duration_minutes"] == 4
+    assert "duration_minutes" not in untimed
+    assert untimed["distance_km"] == pytest.approx(1.0, abs=0.005)
@@ -0,0 +1,34 @@
+"""
+services.routing.parse_refinement: which prompts are answered locally.
+"""
+import pytest
+
+from services.routing import parse_refinement
+
+
+@pytest.mark.parametrize("prompt, changes", [
+    ("flatter and shadier", {"hills": 100, "shade": 100}),
+    ("make it a bit safer please", {"safety": 100}),
+    ("less traffic", {"safety": 100}),
+    ("more direct", {"safety": 25}),
+    ("more shade and fewer hills", {"shade": 100, "hills": 100}),
+    ("shorter", {"distance": 0.75}),
+])
+def test_understood(prompt, changes):
+    assert parse_refinement(prompt) == (changes, True)
+
+
+@pytest.mark.parametrize("prompt", [
+    "less shady",
+    "less flat",
+    "less protected",
+    "less direct",
+    "not so flat",
+    "no parks",
+    "without parks",
+    "don't make it hillier",
+    "more shady",
+    "safer but past the opera house",
+])
+def test_negated_or_unknown_goes_to_the_model(prompt):
+    assert parse_refinement(prompt)[1] is False
@@ -0,0 +1,53 @@
+"""
+/api/v1/auth and /api/v1/users/me against the local Supabase stand-in.
+"""
+EMAIL = "alex@example.com"
+PASSWORD = "supersecret123"
+
+
+def register(api) -> dict:
+    reply = api.post("/api/v1/auth/register", json={"full_name": "Alex Smith", "email": EMAIL, "password": PASSWORD})
+    assert reply.status_code == 201
+    return {"Authorization": f"Bearer {reply.json()['access_token']}"}
+
+
+def test_register_read_revalidate_update(api, fake_supabase):
+    headers = register(api)
+
+    profile = api.get("/api/v1/users/me", headers=headers)
+    assert profile.status_code == 200
+    assert profile.json()["full_name"] == "Alex Smith"
+    etag = profile.headers["ETag"]
+
+    reads = fake_supabase.calls["GET /rest/v1/users"]
+    unchanged = api.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert fake_supabase.calls["GET /rest/v1/users"] == reads     # answered from the profile cache
+
+    updated = api.put("/api/v1/users/me", headers=headers, json={"full_name": "Alex Jones"})
+    assert updated.status_code == 200
+    assert updated.json()["full_name"] == "Alex Jones"
+    assert updated.headers["ETag"] != etag
+
+    changed = api.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["full_name"] == "Alex Jones"
+    assert changed.headers["ETag"] == updated.headers["ETag"]
+
+
+def test_login_after_register(api, fake_supabase):
+    register(api)
+    reply = api.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    assert reply.status_code == 200
+    assert reply.json()["full_name"] == "Alex Smith"
+    assert api.post("/api/v1/auth/login", json={"email": EMAIL, "password": "not-it"}).status_code == 401
+
+
+def test_profile_needs_a_token(api):
+    assert api.get("/api/v1/users/me").status_code == 401
+    assert api.put("/api/v1/users/me", json={"full_name": "Nobody"}).status_code == 401
+
+
+def test_update_without_fields_is_rejected(api, fake_supabase):
+    assert api.put("/api/v1/users/me", headers=register(api), json={}).status_code == 422
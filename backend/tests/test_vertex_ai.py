@@ -0,0 +1,54 @@
+"""
+services.vertex_ai concurrency slots and the gemini_in_flight gauge.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from services import vertex_ai
+from services.metrics import registry
+
+
+def in_flight() -> str:
+    return registry._metrics["gemini_in_flight"].render().splitlines()[-1]
+
+
+class SlowModels:
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def generate_content(self, model, contents):
+        self.started.set()
+        await self.finish.wait()
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+@pytest.fixture
+def models(monkeypatch):
+    models = SlowModels()
+    monkeypatch.setattr(vertex_ai, "client", SimpleNamespace(aio=SimpleNamespace(models=models)))
+    monkeypatch.setattr(vertex_ai, "_model_slots", asyncio.Semaphore(2))
+    return models
+
+
+def test_gauge_counts_calls_holding_a_slot(models):
+    async def scenario():
+        call = asyncio.create_task(vertex_ai._generate("prompt", "test"))
+        await models.started.wait()
+        during = in_flight()
+        models.finish.set()
+        assert await call == "ok"
+        return during
+
+    assert asyncio.run(scenario()) == "gemini_in_flight 1"
+    assert in_flight() == "gemini_in_flight 0"
+
+
+def test_timed_out_call_gives_its_slot_back(models, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_TIMEOUT_SECONDS", 0.05)
+    with pytest.raises(vertex_ai.ModelTimeoutError):
+        asyncio.run(vertex_ai._generate("prompt", "test"))
+    assert in_flight() == "gemini_in_flight 0"
@@ -0,0 +1,34 @@
+/* ============================================================
+   Micro2Move — Migration 003
+   Adds: segment_usage (map-matched ride aggregates per segment)
+   Written by backend/jobs/map_match_routes.py
+   ============================================================ */
+
+BEGIN;
+
+SET search_path = micro2move, public;
+
+-- ---- Per-segment usage learned from RouteHistory GPS tracks
+-- One row per segment for the most recent matching window.  The job
+-- recomputes the window and swaps it in whole through replace_segment_usage()
+-- (migration 004), so re-runs are idempotent and segments no longer
+-- traversed drop out.
+CREATE TABLE IF NOT EXISTS segment_usage (
+  segment_id     text        PRIMARY KEY
+    CHECK (length(trim(segment_id)) >= 2),
+  traversals     int         NOT NULL DEFAULT 0
+    CHECK (traversals >= 0),
+  daily_trips    double precision NOT NULL DEFAULT 0
+    CHECK (daily_trips >= 0),
+  avg_speed_kmh  double precision
+    CHECK (avg_speed_kmh IS NULL OR avg_speed_kmh >= 0),
+  window_start   timestamptz NOT NULL,
+  window_end     timestamptz NOT NULL,
+  updated_at     timestamptz NOT NULL DEFAULT now(),
+  CONSTRAINT chk_su_window CHECK (window_end > window_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_su_daily_trips
+  ON segment_usage (daily_trips DESC);
+
+COMMIT;
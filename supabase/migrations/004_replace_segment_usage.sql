@@ -0,0 +1,43 @@
+/* ============================================================
+   Micro2Move — Migration 004
+   Adds: replace_segment_usage() (atomic segment_usage refresh)
+   Called by backend/jobs/map_match_routes.py
+   ============================================================ */
+
+BEGIN;
+
+SET search_path = micro2move, public;
+
+-- ---- Replace every segment_usage row with one matching window's aggregates
+-- Upserting left rows behind for segments no longer traversed in the window
+-- (tracks deleted or re-matched).  The delete and insert run in the one
+-- transaction of the call, so readers see the old window or the new one.
+CREATE OR REPLACE FUNCTION replace_segment_usage(p_rows jsonb)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = micro2move, public
+AS $$
+DECLARE
+  n int;
+BEGIN
+  DELETE FROM segment_usage WHERE true;
+  INSERT INTO segment_usage
+    (segment_id, traversals, daily_trips, avg_speed_kmh, window_start, window_end, updated_at)
+  SELECT segment_id, traversals, daily_trips, avg_speed_kmh, window_start, window_end, now()
+  FROM jsonb_to_recordset(p_rows) AS r(
+    segment_id    text,
+    traversals    int,
+    daily_trips   double precision,
+    avg_speed_kmh double precision,
+    window_start  timestamptz,
+    window_end    timestamptz
+  );
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION replace_segment_usage(jsonb) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
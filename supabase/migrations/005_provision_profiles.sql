@@ -0,0 +1,68 @@
+/* ============================================================
+   Micro2Move — Migration 005
+   Adds: provision_profiles() (users row + welcome-credit ledger entry)
+   Called by backend/services/provisioning.py and
+   backend/jobs/reconcile_profiles.py
+   ============================================================ */
+
+BEGIN;
+
+SET search_path = micro2move, public;
+
+-- ---- Create missing profile rows, granting welcome credits through the ledger
+-- Each row is inserted unless its user_id already has one; only a row created
+-- here gets its credits recorded in credit_transactions, in the same
+-- transaction, so repeated calls never grant or record them twice.
+-- With p_max_age_seconds, rows are only created for Auth accounts at most
+-- that old: GET /users/me provisions inline for accounts registered moments
+-- ago, never to recreate the profile of an older, deleted one.
+-- Returns how many profiles were created.
+CREATE OR REPLACE FUNCTION provision_profiles(p_rows jsonb, p_max_age_seconds double precision DEFAULT NULL)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = micro2move, public
+AS $$
+DECLARE
+  r record;
+  n int := 0;
+BEGIN
+  FOR r IN
+    SELECT * FROM jsonb_to_recordset(p_rows) AS x(
+      user_id         uuid,
+      full_name       text,
+      email           text,
+      hashed_password text,
+      tnc_accepted    boolean,
+      credits         int
+    )
+  LOOP
+    IF p_max_age_seconds IS NOT NULL AND NOT EXISTS (
+      SELECT 1 FROM auth.users u
+      WHERE u.id = r.user_id AND u.created_at > now() - make_interval(secs => p_max_age_seconds)
+    ) THEN
+      CONTINUE;
+    END IF;
+
+    INSERT INTO users (user_id, full_name, email, hashed_password, tnc_accepted, credits)
+    VALUES (r.user_id, r.full_name, r.email, r.hashed_password, coalesce(r.tnc_accepted, false),
+            coalesce(r.credits, 0))
+    ON CONFLICT (user_id) DO NOTHING;
+    IF NOT FOUND THEN
+      CONTINUE;
+    END IF;
+
+    IF coalesce(r.credits, 0) > 0 THEN
+      INSERT INTO credit_transactions (user_id, amount, reason)
+      VALUES (r.user_id, r.credits, 'welcome credits');
+    END IF;
+    n := n + 1;
+  END LOOP;
+  RETURN n;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION provision_profiles(jsonb, double precision) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION provision_profiles(jsonb, double precision) TO service_role;
+
+COMMIT;